@@ -28,6 +28,7 @@ from sahara_plugins.plugins.ambari import deploy
 from sahara_plugins.plugins.ambari import edp_engine
 from sahara_plugins.plugins.ambari import health
 from sahara_plugins.plugins.ambari import validation
+from sahara_plugins.utils import images as image_utils
 
 
 class AmbariPluginProvider(p.ProvisioningPluginBase):
@@ -282,11 +283,6 @@ class AmbariPluginProvider(p.ProvisioningPluginBase):
 
     def validate_images(self, cluster, test_only=False, image_arguments=None):
         image_arguments = self.get_image_arguments(cluster['hadoop_version'])
-        if not test_only:
-            instances = plugin_utils.get_instances(cluster)
-        else:
-            instances = plugin_utils.get_instances(cluster)[0]
-        for instance in instances:
-            with instance.remote() as r:
-                self.validator.validate(r, test_only=test_only,
-                                        image_arguments=image_arguments)
+        image_utils.validate_cluster_images(self.validator, cluster,
+                                            test_only=test_only,
+                                            image_arguments=image_arguments)
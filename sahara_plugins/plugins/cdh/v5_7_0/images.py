@@ -14,7 +14,7 @@
 # limitations under the License.
 
 from sahara.plugins import images
-from sahara.plugins import utils as plugin_utils
+from sahara_plugins.utils import images as image_utils
 
 
 _validator = images.SaharaImageValidator.from_yaml(
@@ -34,11 +34,6 @@ def pack_image(remote, test_only=False, image_arguments=None):
 
 def validate_images(cluster, test_only=False, image_arguments=None):
     image_arguments = get_image_arguments()
-    if not test_only:
-        instances = plugin_utils.get_instances(cluster)
-    else:
-        instances = plugin_utils.get_instances(cluster)[0]
-    for instance in instances:
-        with instance.remote() as r:
-            _validator.validate(r, test_only=test_only,
-                                image_arguments=image_arguments)
+    image_utils.validate_cluster_images(_validator, cluster,
+                                        test_only=test_only,
+                                        image_arguments=image_arguments)
@@ -33,6 +33,8 @@ import sahara_plugins.plugins.mapr.services.yarn.yarn as yarn
 from sahara_plugins.plugins.mapr.util import event_log as el
 import sahara_plugins.plugins.mapr.util.general as util
 import sahara_plugins.plugins.mapr.util.password_utils as pu
+from sahara_plugins.utils import threads
+from sahara_plugins.utils import topology
 
 LOG = logging.getLogger(__name__)
 
@@ -163,14 +165,21 @@ class BaseConfigurer(ac.AbstractConfigurer):
 
         util.execute_on_instances(instances, install_java)
 
-    @el.provision_step(_("Configure cluster topology"))
     def _configure_topology(self, cluster_context, instances):
         LOG.debug("Configuring cluster topology")
 
-        topology_map = cluster_context.topology_map
-        topology_map = ("%s %s" % item for item in six.iteritems(topology_map))
-        topology_map = "\n".join(topology_map) + "\n"
+        cluster = cluster_context.cluster
+        topology_map = topology.render_topology_map(
+            cluster_context.topology_map)
+        stale = topology.get_stale_instances(cluster, instances, topology_map)
+        if stale:
+            self._write_topology(cluster_context, stale, topology_map)
+            topology.store_digests(cluster, stale, topology_map)
+
+        LOG.info('Cluster topology successfully configured')
 
+    @el.provision_step(_("Configure cluster topology"))
+    def _write_topology(self, cluster_context, instances, topology_map):
         data_path = "%s/topology.data" % cluster_context.mapr_home
         script = utils.get_file_text(_TOPO_SCRIPT, 'sahara_plugins')
         script_path = '%s/topology.sh' % cluster_context.mapr_home
@@ -181,9 +190,10 @@ class BaseConfigurer(ac.AbstractConfigurer):
             util.write_file(instance, script_path, script,
                             mode="+x", owner="root")
 
-        util.execute_on_instances(instances, write_topology_data)
-
-        LOG.info('Cluster topology successfully configured')
+        with threads.BoundedThreadGroup(topology.TOPOLOGY_POOL_SIZE) as tg:
+            for instance in instances:
+                tg.spawn('write-topology-data-%s' % instance.instance_name,
+                         write_topology_data, instance)
 
     @el.provision_step(_("Write config files to instances"))
     def _write_config_files(self, cluster_context, instances):
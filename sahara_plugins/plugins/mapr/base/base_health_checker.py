@@ -14,13 +14,21 @@
 
 
 import functools
+import threading
+
+from oslo_log import log as logging
+import six
 
 from sahara.plugins import health_check_base
 from sahara_plugins.i18n import _
 import sahara_plugins.plugins.mapr.abstract.health_checker as hc
 from sahara_plugins.plugins.mapr.domain import node_process as np
 from sahara_plugins.plugins.mapr.services.management import management
+from sahara_plugins.plugins.mapr.services.maprfs import maprfs
 from sahara_plugins.plugins.mapr.services.spark import spark
+import sahara_plugins.plugins.mapr.util.general as util
+
+LOG = logging.getLogger(__name__)
 
 
 class BaseHealthChecker(hc.AbstractHealthChecker):
@@ -29,22 +37,112 @@ class BaseHealthChecker(hc.AbstractHealthChecker):
             node_processes
 
     def get_checks(self, cluster_context, instances=None):
+        provider = ServicesStatusProvider(cluster_context)
         checks = [
-            functools.partial(ZookeeperCheck, cluster_context=cluster_context)]
+            functools.partial(ZookeeperCheck, cluster_context=cluster_context,
+                              provider=provider)]
         for node_process in cluster_context.get_node_processes():
             if self._is_available(
                     node_process) and node_process.ui_name != 'ZooKeeper':
                 checks.append(functools.partial
                               (MapRNodeProcessCheck,
                                cluster_context=cluster_context,
-                               process=node_process))
+                               process=node_process,
+                               provider=provider))
         return checks
 
 
+class ServicesStatusProvider(object):
+    """Collects node process statuses once per health check cycle.
+
+    Warden managed services of all nodes are fetched with a single
+    'maprcli node list' on a CLDB node, ZooKeeper statuses are fetched
+    concurrently. The result, or the error getting it, is shared by every
+    check of the cycle.
+    """
+
+    def __init__(self, cluster_context):
+        self.cluster_context = cluster_context
+        self._lock = threading.Lock()
+        self._services = None
+        self._zookeepers = None
+        self._exception_store = {}
+
+    def _check_exception(self, key):
+        if key in self._exception_store:
+            raise health_check_base.RedHealthError(
+                self._exception_store[key])
+
+    def _store_exception(self, key, prefix, e):
+        LOG.exception(prefix)
+        self._exception_store[key] = _(
+            "%(problem)s: %(description)s") % {
+            'problem': prefix, 'description': six.text_type(e)}
+
+    def get_services(self):
+        with self._lock:
+            if (self._services is None and
+                    'services' not in self._exception_store):
+                try:
+                    cldb = self.cluster_context.get_instance(maprfs.CLDB)
+                    with cldb.remote() as r:
+                        self._services = np.get_node_services(r)
+                except Exception as e:
+                    self._store_exception(
+                        'services', _("Can't get node services from CLDB"),
+                        e)
+        self._check_exception('services')
+        return self._services
+
+    def get_statuses(self, process, instances):
+        """Returns the status of the process on the instances by IP.
+
+        Instances which do not list the process in their warden services
+        are not running it and are reported as STOPPED without being
+        queried. The others are asked for their exact status, which may
+        be e.g. STAND_BY or FAILED.
+        """
+        services = self.get_services()
+        listed = [i for i in instances
+                  if process.name in services.get(i.internal_ip, ())]
+        statuses = dict((i.internal_ip, np.Status.STOPPED)
+                        for i in instances)
+        statuses.update(process.get_statuses(listed))
+        return statuses
+
+    def get_zookeepers_status(self):
+        with self._lock:
+            if (self._zookeepers is None and
+                    'zookeepers' not in self._exception_store):
+                statuses = {}
+                try:
+                    instances = self.cluster_context.get_instances(
+                        node_process=management.ZOOKEEPER)
+                    util.execute_on_instances(
+                        instances, self._collect_zookeeper_status, statuses)
+                    self._zookeepers = statuses
+                except Exception as e:
+                    self._store_exception(
+                        'zookeepers', _("Can't get ZooKeeper statuses"), e)
+        self._check_exception('zookeepers')
+        return self._zookeepers
+
+    @staticmethod
+    def _collect_zookeeper_status(instance, statuses):
+        cmd = 'service mapr-zookeeper status'
+        with instance.remote() as r:
+            __, out = r.execute_command(cmd, run_as_root=True,
+                                        raise_when_error=False)
+        statuses[instance.id] = (
+            'zookeeper running as process' in out or
+            'active (running)' in out)
+
+
 class ZookeeperCheck(health_check_base.BasicHealthCheck):
-    def __init__(self, cluster, cluster_context):
+    def __init__(self, cluster, cluster_context, provider):
         super(ZookeeperCheck, self).__init__(cluster)
         self.cluster_context = cluster_context
+        self.provider = provider
 
     def get_health_check_name(self):
         return 'MapR ZooKeeper check'
@@ -52,19 +150,13 @@ class ZookeeperCheck(health_check_base.BasicHealthCheck):
     def is_available(self):
         return self.cluster_context.cluster.plugin_name == 'mapr'
 
-    def _is_zookeeper_running(self, instance):
-        cmd = 'service mapr-zookeeper status'
-        with instance.remote() as r:
-            __, out = r.execute_command(cmd, run_as_root=True)
-            return 'zookeeper running as process' in out \
-                   or 'active (running)' in out
-
     def check_health(self):
         instances = self.cluster_context.get_instances(
             node_process=management.ZOOKEEPER)
+        statuses = self.provider.get_zookeepers_status()
         active_count = 0
         for instance in instances:
-            if self._is_zookeeper_running(instance):
+            if statuses.get(instance.id):
                 active_count += 1
 
         if active_count == 0:
@@ -85,10 +177,11 @@ class MapRNodeProcessCheck(health_check_base.BasicHealthCheck):
         'ResourceManager'
     ]
 
-    def __init__(self, cluster, cluster_context, process):
+    def __init__(self, cluster, cluster_context, process, provider):
         super(MapRNodeProcessCheck, self).__init__(cluster)
         self.process = process
         self.cluster_context = cluster_context
+        self.provider = provider
 
     def get_health_check_name(self):
         return 'MapR %s check' % self.process.ui_name
@@ -99,11 +192,9 @@ class MapRNodeProcessCheck(health_check_base.BasicHealthCheck):
     def check_health(self):
         instances = self.cluster_context.get_instances(
             node_process=self.process)
-        active_count = 0
-        for instance in instances:
-            status = self.process.status(instance)
-            if status == np.Status.RUNNING:
-                active_count += 1
+        statuses = self.provider.get_statuses(self.process, instances)
+        active_count = len([status for status in statuses.values()
+                            if status == np.Status.RUNNING])
 
         if active_count == 0:
             if self.process.ui_name in self.IMPORTANT_PROCESSES:
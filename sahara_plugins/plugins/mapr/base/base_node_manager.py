@@ -30,19 +30,17 @@ import sahara_plugins.plugins.mapr.util.event_log as el
 
 LOG = logging.getLogger(__name__)
 
-GET_SERVER_ID_CMD = ('maprcli node list -json -filter [ip==%s] -columns id'
-                     ' | grep id | grep -o \'[0-9]*\'')
+NODE_IDS_CMD = 'maprcli node list -json -columns id,ip'
 NODE_LIST_CMD = 'maprcli node list -json'
 MOVE_NODE_CMD = 'maprcli node move -serverids %s -topology /decommissioned'
-REMOVE_NODE_CMD = ('maprcli node remove -filter [ip==%(ip)s] -nodes %(nodes)s'
+REMOVE_NODE_CMD = ('maprcli node remove -nodes "%(nodes)s"'
                    ' -zkconnect %(zookeepers)s')
 WAIT_NODE_ALARM_NO_HEARTBEAT = 360
 
 WARDEN_SERVICE = 'warden'
 START = 'start'
 STOP = 'stop'
-DELAY = 5
-DEFAULT_RETRY_COUNT = 10
+MAX_DELAY = 30
 
 
 class BaseNodeManager(s.AbstractNodeManager):
@@ -50,29 +48,41 @@ class BaseNodeManager(s.AbstractNodeManager):
         LOG.debug("Moving the nodes to /decommissioned topology")
         cldb_instances = self._get_cldb_instances(cluster_context, instances)
         with random.choice(cldb_instances).remote() as cldb_remote:
-            for instance in instances:
-                with instance.remote() as r:
-                    command = GET_SERVER_ID_CMD % instance.internal_ip
-                    ec, out = r.execute_command(command, run_as_root=True)
-                    command = MOVE_NODE_CMD % out.strip()
-                    cldb_remote.execute_command(command, run_as_root=True)
+            server_ids = self._get_server_ids(cldb_remote, instances)
+            command = MOVE_NODE_CMD % ','.join(server_ids)
+            cldb_remote.execute_command(command, run_as_root=True)
         LOG.info("Nodes successfully moved")
 
     def remove_nodes(self, cluster_context, instances):
         LOG.debug("Removing nodes from cluster")
         cldb_instances = self._get_cldb_instances(cluster_context, instances)
         with random.choice(cldb_instances).remote() as cldb_remote:
-            for instance in instances:
-                args = {
-                    'ip': instance.internal_ip,
-                    'nodes': instance.fqdn(),
-                    'zookeepers':
-                        cluster_context.get_zookeeper_nodes_ip_with_port(),
-                }
-                command = REMOVE_NODE_CMD % args
-                cldb_remote.execute_command(command, run_as_root=True)
+            # the nodes are named by FQDN; move_nodes, which runs first,
+            # already checked that every instance IP is registered in CLDB
+            args = {
+                'nodes': ' '.join(i.fqdn() for i in instances),
+                'zookeepers':
+                    cluster_context.get_zookeeper_nodes_ip_with_port(),
+            }
+            command = REMOVE_NODE_CMD % args
+            cldb_remote.execute_command(command, run_as_root=True)
         LOG.info("Nodes successfully removed")
 
+    @staticmethod
+    def _get_server_ids(cldb_remote, instances):
+        ec, out = cldb_remote.execute_command(NODE_IDS_CMD, run_as_root=True)
+        ids = {}
+        for node in json.loads(out)['data']:
+            for ip in node['ip'].split(','):
+                ids[ip.strip()] = str(node['id'])
+        missing = [i.internal_ip for i in instances
+                   if i.internal_ip not in ids]
+        if missing:
+            msg = _("Nodes are not registered in CLDB: %s") % ', '.join(
+                missing)
+            raise ex.HadoopProvisionError(msg)
+        return [ids[i.internal_ip] for i in instances]
+
     def start(self, cluster_context, instances=None):
         instances = instances or cluster_context.get_instances()
         zookeepers = cluster_context.filter_instances(instances, mng.ZOOKEEPER)
@@ -109,30 +119,38 @@ class BaseNodeManager(s.AbstractNodeManager):
         instances = instances or cluster_context.get_instances()
         cldb_node = cluster_context.get_instance(mfs.CLDB)
         start_time = timeutils.utcnow()
-        retry_count = 0
+        delay = 1
+        cldb_started = False
+        missing = [i.internal_ip for i in instances]
         with cldb_node.remote() as r:
             LOG.debug("Waiting {count} seconds for CLDB initialization".format(
                 count=timeout))
-            while timeutils.delta_seconds(start_time,
-                                          timeutils.utcnow()) < timeout:
+            while True:
                 ec, out = r.execute_command(NODE_LIST_CMD,
                                             raise_when_error=False)
-                resp = json.loads(out)
-                status = resp['status']
-                if str(status).lower() == 'ok':
-                    ips = [n['ip'] for n in resp['data']]
-                    retry_count += 1
-                    for i in instances:
-                        if (i.internal_ip not in ips and
-                                (retry_count > DEFAULT_RETRY_COUNT)):
-                            msg = _("Node failed to connect to CLDB: %s"
-                                    ) % i.internal_ip
-                            raise ex.HadoopProvisionError(msg)
+                try:
+                    resp = json.loads(out)
+                except ValueError:
+                    resp = {}
+                if str(resp.get('status')).lower() == 'ok':
+                    cldb_started = True
+                    ips = set()
+                    for node in resp['data']:
+                        ips.update(ip.strip() for ip in node['ip'].split(','))
+                    missing = [ip for ip in missing if ip not in ips]
+                    if not missing:
+                        return
+                consumed = timeutils.delta_seconds(start_time,
+                                                   timeutils.utcnow())
+                if consumed >= timeout:
                     break
-                else:
-                    context.sleep(DELAY)
-            else:
-                raise ex.HadoopProvisionError(_("CLDB failed to start"))
+                context.sleep(min(delay, timeout - consumed))
+                delay = min(delay * 2, MAX_DELAY)
+
+        if not cldb_started:
+            raise ex.HadoopProvisionError(_("CLDB failed to start"))
+        msg = _("Node failed to connect to CLDB: %s") % ', '.join(missing)
+        raise ex.HadoopProvisionError(msg)
 
     def _start_nodes(self, instances, sys_service):
         with context.ThreadGroup() as tg:
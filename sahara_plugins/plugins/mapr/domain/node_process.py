@@ -13,17 +13,23 @@
 # under the License.
 
 
+from oslo_log import log as logging
 import oslo_serialization.jsonutils as json
+from oslo_utils import excutils
+import six
 
 from sahara.plugins import utils as plugin_utils
 from sahara_plugins.i18n import _
 import sahara_plugins.plugins.mapr.util.general as util
 
+LOG = logging.getLogger(__name__)
+
 
 WARDEN_MANAGED_CMD = ('sudo -u mapr maprcli node services'
                       ' -name %(service)s'
                       ' -action %(action)s'
                       ' -nodes %(nodes)s')
+NODE_SERVICES_CMD = 'maprcli node list -columns ip,svc -json'
 
 
 class NodeProcess(object):
@@ -66,25 +72,50 @@ class NodeProcess(object):
         command = WARDEN_MANAGED_CMD % args
         with instances[0].remote() as r:
             r.execute_command(command)
-        self._wait_for_status(instances, action.status)
-
-    def _wait_for_status(self, instances, status, sleep=3, timeout=60):
-        def poll_status(instance):
-            operation_name = _('Wait for {node_process} on {instance}'
-                               ' to change status to "{status}"')
-            args = {
-                'node_process': self.ui_name,
-                'instance': instance.instance_name,
-                'status': status.name,
-            }
-            return plugin_utils.poll(
-                get_status=lambda: self.status(instance) == status,
-                operation_name=operation_name.format(**args),
-                timeout=timeout,
-                sleep=sleep,
-            )
-
-        util.execute_on_instances(instances, poll_status)
+            self._wait_for_status(r, instances, action.status)
+
+    def _wait_for_status(self, remote, instances, status, sleep=3,
+                         timeout=60):
+        """Waits until every instance reaches the given status.
+
+        Each poll runs one 'maprcli node list' on the given remote when
+        waiting for RUNNING: a node which does not list the service is not
+        running it, so only the nodes listing it are asked for their exact
+        status. For the other statuses every pending node is asked.
+        """
+        pending = dict((i.internal_ip, i) for i in instances)
+
+        def poll_status():
+            candidates = list(pending.values())
+            if status == Status.RUNNING:
+                services = get_node_services(remote)
+                candidates = [i for i in candidates if
+                              self.name in services.get(i.internal_ip, ())]
+            for ip, current in six.iteritems(self.get_statuses(candidates)):
+                if current == status:
+                    LOG.debug('{node_process} on {instance} changed status'
+                              ' to "{status}"'.format(
+                                  node_process=self.ui_name,
+                                  instance=pending[ip].instance_name,
+                                  status=status.name))
+                    del pending[ip]
+            return not pending
+
+        operation_name = _('Wait for {node_process} to change status to'
+                           ' "{status}"').format(node_process=self.ui_name,
+                                                 status=status.name)
+        try:
+            plugin_utils.poll(get_status=poll_status,
+                              operation_name=operation_name,
+                              timeout=timeout, sleep=sleep)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                LOG.error('{node_process} did not change status to'
+                          ' "{status}" on {instances}'.format(
+                              node_process=self.ui_name, status=status.name,
+                              instances=', '.join(sorted(
+                                  i.instance_name
+                                  for i in pending.values()))))
 
     def status(self, instance):
         command = 'maprcli service list -node %s -json' % instance.internal_ip
@@ -97,6 +128,19 @@ class NodeProcess(object):
 
         return Status.NOT_CONFIGURED
 
+    def get_statuses(self, instances):
+        """Returns the status on each of the instances, by internal IP.
+
+        The instances are queried concurrently.
+        """
+        statuses = {}
+
+        def collect_status(instance):
+            statuses[instance.internal_ip] = self.status(instance)
+
+        util.execute_on_instances(instances, collect_status)
+        return statuses
+
     def is_started(self, instance):
         # At least tried to do it =)
         return self.status(instance) in [Status.RUNNING,
@@ -104,6 +148,23 @@ class NodeProcess(object):
                                          Status.STAND_BY]
 
 
+def get_node_services(remote):
+    """Returns the warden services listed for every cluster node by node IP.
+
+    Issues a single 'maprcli node list' on the given remote. A service
+    which is not listed for a node is not running there. A listed one may
+    be running, on standby or failed, NodeProcess.status tells which.
+    """
+    command = util._run_as('mapr', NODE_SERVICES_CMD)
+    ec, out = remote.execute_command(command, timeout=600)
+    result = {}
+    for node in json.loads(out).get('data', []):
+        services = set(filter(None, node.get('service', '').split(',')))
+        for ip in node.get('ip', '').split(','):
+            result[ip.strip()] = services
+    return result
+
+
 class Status(object):
     class Item(object):
         def __init__(self, name, value):
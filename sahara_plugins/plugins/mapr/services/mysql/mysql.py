@@ -16,10 +16,8 @@
 import collections as c
 
 from oslo_log import log as logging
-import six
 
-import sahara.plugins.utils as u
-import sahara_plugins.plugins.mapr.domain.configuration_file as cf
+import sahara.plugins.exceptions as ex
 import sahara_plugins.plugins.mapr.domain.service as s
 import sahara_plugins.plugins.mapr.util.general as g
 
@@ -36,12 +34,9 @@ class MySQL(s.Service):
     OOZIE_SPECS = db_spec('oozie', 'maproozie', 'mapr')
     SENTRY_SPECS = db_spec('sentry', 'maprsentry', 'mapr')
 
-    SELECT_DATA = 'mysql -uroot --skip-column-names -e "%s"| grep -E "\w+"'
-    GET_DBS_LIST = SELECT_DATA % 'SHOW DATABASES'
-    GET_USERS_HOSTS = (
-        SELECT_DATA %
-        "SELECT Host FROM mysql.user WHERE mysql.user.User='%s'"  # nosec
-    )
+    METRICS_SETUP_SCRIPT = '/opt/mapr/bin/setup.sql'
+    PLAN_SCRIPT = '/tmp/create_databases.sql'
+    SQL_STEP_MARK = 'sahara-sql-step'
 
     DRIVER_CLASS = 'com.mysql.jdbc.Driver'
     MYSQL_SERVER_PORT = 3306
@@ -65,73 +60,103 @@ class MySQL(s.Service):
         return None
 
     @staticmethod
-    def _execute_script(instance, script_path, script_text=None,
-                        user='root', password=None):
-        with instance.remote() as r:
-            if script_text:
-                r.write_file_to(script_path, script_text, run_as_root=True)
-            LOG.debug('Executing SQL script {path}'.format(path=script_path))
-            r.execute_command(("mysql %s %s < %s" %
-                               ('-u' + user if user else '',
-                                '-p' + password if password else '',
-                                script_path)),
-                              run_as_root=True)
-
-    @staticmethod
-    def _create_service_db(instance, specs):
-        f_name = 'create_db_%s.sql' % specs.db_name
-        script = MySQL._create_script_obj(f_name, 'create_database.sql',
-                                          db_name=specs.db_name,
-                                          user=specs.user,
-                                          password=specs.password)
-        MySQL._execute_script(instance, script.remote_path, script.render())
-
-    @staticmethod
-    def _create_metrics_db(instance, databases, instances):
-        if MySQL.METRICS_SPECS.db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.METRICS_SPECS)
-            MySQL._execute_script(instance=instance,
-                                  script_path='/opt/mapr/bin/setup.sql')
-        MySQL._grant_access(instance, MySQL.METRICS_SPECS, instances)
+    def _get_required_specs(cluster_context):
+        specs = [MySQL.METRICS_SPECS, MySQL.HUE_SPECS, MySQL.RDBMS_SPECS,
+                 MySQL.OOZIE_SPECS]
+        if cluster_context.get_instance('HiveMetastore'):
+            specs.append(MySQL.METASTORE_SPECS)
+        if cluster_context.get_instance('Sentry'):
+            specs.append(MySQL.SENTRY_SPECS)
+        return specs
 
     @staticmethod
-    def _create_hue_db(instance, databases, instances):
-        if MySQL.HUE_SPECS.db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.HUE_SPECS)
-        MySQL._grant_access(instance, MySQL.HUE_SPECS, instances)
-
-    @staticmethod
-    def _create_rdbms_db(instance, databases, instances):
-        if MySQL.RDBMS_SPECS.db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.RDBMS_SPECS)
-        MySQL._grant_access(instance, MySQL.RDBMS_SPECS, instances)
-
-    @staticmethod
-    def _create_metastore_db(instance, cluster_context, databases, instances):
-        hive_meta = cluster_context.get_instance('HiveMetastore')
-
-        if not hive_meta:
-            return
-
-        db_name = MySQL.METASTORE_SPECS.db_name
-        if db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.METASTORE_SPECS)
-        MySQL._grant_access(instance, MySQL.METASTORE_SPECS, instances)
+    def build_database_plan(specs, databases, user_hosts, instances):
+        """Returns the SQL statements bringing the databases up to date.
 
-    @staticmethod
-    def _create_oozie_db(instance, databases, instances):
-        if MySQL.OOZIE_SPECS.db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.OOZIE_SPECS)
-        MySQL._grant_access(instance, MySQL.OOZIE_SPECS, instances)
+        :param databases: names of the existing databases
+        :param user_hosts: dict of the existing users and their hosts
+        :param instances: instances which need access to the databases
+        """
+        statements = []
+        ips = [i.internal_ip for i in instances]
+        for spec in specs:
+            hosts = []
+            if spec.db_name not in databases:
+                statements.append(
+                    'CREATE DATABASE IF NOT EXISTS %s' % spec.db_name)
+                hosts.extend(['localhost', '127.0.0.1'])
+                if spec == MySQL.METRICS_SPECS:
+                    statements.append('SOURCE %s' % MySQL.METRICS_SETUP_SCRIPT)
+            hosts.extend(ips)
+
+            # only the hosts the user does not exist for yet are granted,
+            # which are the new instances when scaling
+            granted = set(user_hosts.get(spec.user, []))
+            for host in hosts:
+                if host in granted:
+                    continue
+                granted.add(host)
+                statements.append("CREATE USER %s@'%s' IDENTIFIED BY '%s'" % (
+                    spec.user, host, spec.password))
+                statements.append(
+                    "GRANT ALL PRIVILEGES ON %s.* TO %s@'%s' "
+                    "WITH GRANT OPTION" % (spec.db_name, spec.user, host))
+
+        if statements:
+            statements.extend(['FLUSH PRIVILEGES', 'FLUSH HOSTS'])
+        return statements
+
+    @staticmethod
+    def _get_plan_script(statements):
+        lines = []
+        for index, statement in enumerate(statements):
+            lines.append("SELECT '%s %d';" % (MySQL.SQL_STEP_MARK, index))
+            # SOURCE is a client command, it does not take a semicolon
+            lines.append(statement if statement.startswith('SOURCE ')
+                         else statement + ';')
+        lines.append("SELECT '%s %d';" % (MySQL.SQL_STEP_MARK,
+                                          len(statements)))
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def apply_database_plan(db_instance, statements):
+        """Runs the statements in a single session of the mysql client.
+
+        The client stops at the first failing statement.
+
+        :returns: list of the statements and whether they succeeded
+        :raises PluginRemoteCommandException: if a statement failed
+        """
+        if not statements:
+            LOG.debug('Databases are up to date')
+            return []
 
-    @staticmethod
-    def _create_sentry_db(instance, cluster_context, databases, instances):
-        sentry_instance = cluster_context.get_instance('Sentry')
-        if not sentry_instance:
-            return
-        if MySQL.SENTRY_SPECS.db_name not in databases:
-            MySQL._create_service_db(instance, MySQL.SENTRY_SPECS)
-        MySQL._grant_access(instance, MySQL.SENTRY_SPECS, instances)
+        with db_instance.remote() as r:
+            r.write_file_to(MySQL.PLAN_SCRIPT,
+                            MySQL._get_plan_script(statements),
+                            run_as_root=True)
+            code, out = r.execute_command(
+                'mysql -uroot --skip-column-names < %s' % MySQL.PLAN_SCRIPT,
+                run_as_root=True, raise_when_error=False)
+
+        reached = -1
+        for line in out.splitlines():
+            words = line.split()
+            if len(words) == 2 and words[0] == MySQL.SQL_STEP_MARK:
+                reached = int(words[1])
+
+        results = [(statement, index < reached)
+                   for index, statement in enumerate(statements)
+                   if index <= reached]
+        for statement, succeeded in results:
+            LOG.debug('SQL statement {statement}: {result}'.format(
+                statement=statement, result='OK' if succeeded else 'failed'))
+
+        if code:
+            failed = (statements[reached] if 0 <= reached < len(statements)
+                      else MySQL.PLAN_SCRIPT)
+            raise ex.PluginRemoteCommandException(failed, code, out)
+        return results
 
     @staticmethod
     def start_mysql_server(cluster_context):
@@ -147,20 +172,24 @@ class MySQL(s.Service):
         LOG.debug('MySQL Server successfully started')
 
     @staticmethod
-    def get_databases_list(db_instance):
+    def get_databases_state(db_instance, users):
+        """Returns the existing databases and the hosts of the users."""
+        query = ('SHOW DATABASES; SELECT User, Host FROM mysql.user'
+                 " WHERE User IN (%s)" % ', '.join(
+                     "'%s'" % user for user in users))  # nosec
         with db_instance.remote() as r:
-            ec, out = r.execute_command(MySQL.GET_DBS_LIST)
-            if out:
-                return out.splitlines()
-        return list()
+            ec, out = r.execute_command(
+                'mysql -uroot --skip-column-names -e "%s"' % query)
 
-    @staticmethod
-    def get_user_hosts(db_instance, username):
-        with db_instance.remote() as r:
-            ec, out = r.execute_command(MySQL.GET_USERS_HOSTS % username)
-            if out:
-                return out.splitlines()
-        return list()
+        databases = []
+        user_hosts = c.defaultdict(list)
+        for line in out.splitlines():
+            columns = line.split('\t')
+            if len(columns) == 2:
+                user_hosts[columns[0]].append(columns[1])
+            elif line.strip():
+                databases.append(line.strip())
+        return databases, dict(user_hosts)
 
     @staticmethod
     def get_db_instance(cluster_context):
@@ -168,39 +197,18 @@ class MySQL(s.Service):
 
     @staticmethod
     def create_databases(cluster_context, instances):
-        db_instance = MySQL.get_db_instance(cluster_context)
-        databases = MySQL.get_databases_list(db_instance)
-        MySQL._create_metrics_db(db_instance, databases, instances)
-        MySQL._create_hue_db(db_instance, databases, instances)
-        MySQL._create_rdbms_db(db_instance, databases, instances)
-        MySQL._create_oozie_db(db_instance, databases, instances)
-        MySQL._create_metastore_db(
-            db_instance, cluster_context, databases, instances)
-        MySQL._create_sentry_db(db_instance, cluster_context, databases,
-                                instances)
-
-    @staticmethod
-    def _create_script_obj(filename, template, **kwargs):
-        script = cf.TemplateFile(filename)
-        script.remote_path = '/tmp/'
-        script.parse(u.get_file_text(
-            'plugins/mapr/services/mysql/resources/%s' % template,
-            'sahara_plugins'))
-        for k, v in six.iteritems(kwargs):
-            script.add_property(k, v)
-        return script
+        """Creates the missing databases and grants access to instances.
 
-    @staticmethod
-    def _grant_access(instance, specs, instances):
-        f_name = 'grant_access_%s.sql' % specs.db_name
-        ips = [i.internal_ip for i in instances]
-        user_hosts = MySQL.get_user_hosts(instance, specs.user)
-        script = MySQL._create_script_obj(f_name, 'grant_access.sql',
-                                          hosts=set(ips) - set(user_hosts),
-                                          db_name=specs.db_name,
-                                          user=specs.user,
-                                          password=specs.password)
-        MySQL._execute_script(instance, script.remote_path, script.render())
+        The state of the server is queried once, and the statements needed
+        are applied from a single script.
+        """
+        db_instance = MySQL.get_db_instance(cluster_context)
+        specs = MySQL._get_required_specs(cluster_context)
+        databases, user_hosts = MySQL.get_databases_state(
+            db_instance, [spec.user for spec in specs])
+        statements = MySQL.build_database_plan(specs, databases, user_hosts,
+                                               instances)
+        MySQL.apply_database_plan(db_instance, statements)
 
     @staticmethod
     def install_mysql(instance, distro_name, distro_version):
@@ -12,7 +12,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 
+from sahara.plugins import conductor
+from sahara.plugins import context
+import sahara.plugins.exceptions as ex
 import sahara.plugins.utils as utils
 import sahara_plugins.plugins.mapr.domain.configuration_file as bcf
 import sahara_plugins.plugins.mapr.domain.node_process as np
@@ -26,6 +30,10 @@ import sahara_plugins.plugins.mapr.util.validation_utils as vu
 SPARK_SLAVE_UI_PORT = 8081
 SPARK_HS_UI_PORT = 18080
 
+# cluster extra key of the jars and classpath found on the cluster
+ARTIFACTS_KEY = 'spark_artifacts'
+ARTIFACTS_TIMEOUT = 600
+
 SPARK_HISTORY_SERVER = np.NodeProcess(
     name='spark-historyserver',
     ui_name='Spark HistoryServer',
@@ -44,6 +52,8 @@ class SparkOnYarn(s.Service):
     JAR_FILE_TARGET = '/apps/spark/lib'
     MFS_DIR = '/apps/spark'
     SERVLET_JAR = 'javax.servlet-api.jar'
+    # Spark 2 does not ship an assembly jar anymore
+    HAS_ASSEMBLY_JAR = True
 
     def __init__(self):
         super(SparkOnYarn, self).__init__()
@@ -78,8 +88,8 @@ class SparkOnYarn(s.Service):
         return result
 
     def get_config_files(self, cluster_context, configs, instance=None):
-        hbase_version = self._get_hbase_version(cluster_context)
-        hive_version = self._get_hive_version(cluster_context)
+        hive_service = self._hive(cluster_context)
+        hbase_service = self._hbase(cluster_context)
         # spark-env-sh
         template = 'plugins/mapr/services/' \
                    'spark/resources/spark-env.template'
@@ -96,7 +106,8 @@ class SparkOnYarn(s.Service):
             conf.fetch(instance)
         conf.add_property('spark.yarn.jar', 'maprfs://%s/%s' %
                           (self.JAR_FILE_TARGET,
-                           self._assembly_jar_path(cluster_context)
+                           self._assembly_jar_path(cluster_context,
+                                                   hive_service)
                            .rsplit('/', 1)[1]))
 
         # compatibility.version
@@ -105,15 +116,16 @@ class SparkOnYarn(s.Service):
         if instance:
             versions.fetch(instance)
 
-        if hive_version:
+        if hive_service:
             versions.add_property('hive_versions',
-                                  hive_version + '.0')
-            conf.add_properties(self._hive_properties(cluster_context))
-        if hbase_version:
-            versions.add_property('hbase_versions', hbase_version)
+                                  hive_service.version + '.0')
+            conf.add_properties(self._hive_properties(cluster_context,
+                                                      hive_service))
+        if hbase_service:
+            versions.add_property('hbase_versions', hbase_service.version)
             conf.add_property('spark.executor.extraClassPath',
-                              '%s/lib/*' % self._hbase(cluster_context)
-                              .home_dir(cluster_context))
+                              '%s/lib/*' % hbase_service.home_dir(
+                                  cluster_context))
         return [conf, versions, env_sh]
 
     def update(self, cluster_context, instances=None):
@@ -173,51 +185,84 @@ class SparkOnYarn(s.Service):
             mfs.chmod(r, home, 777, run_as=run_as_user)
             mfs.chmod(r, libs, 777, run_as=run_as_user)
 
-    def _hive_properties(self, cluster_context):
-        hive_version = self._hive(cluster_context).version
-        hive_conf = self._hive(cluster_context).conf_dir(cluster_context)
-        hive_site = hive_conf + '/hive-site.xml'
-        hive_datanucleus_libs = self._hive_datanucleus_libs_path(
-            cluster_context)
-        hive_libs = self._hive_libs_path(cluster_context)
-        hadoop_libs = self._hadoop_libs_path(cluster_context)
-        hive_datanucleus_libs.insert(0, hive_site)
-        mfs_paths = self._hive_datanucleus_libs_path(cluster_context)
+    def _hive_properties(self, cluster_context, hive_service):
+        artifacts = self._get_artifacts(cluster_context, hive_service)
+        hive_libs = artifacts['hive_libs']
         return {
-            'spark.yarn.dist.files': ','.join(mfs_paths),
-            'spark.sql.hive.metastore.version': hive_version + '.0',
-            'spark.sql.hive.metastore.jars': ':'.join(hadoop_libs + hive_libs)
+            'spark.yarn.dist.files': ','.join(
+                self._datanucleus_libs(hive_libs)),
+            'spark.sql.hive.metastore.version': hive_service.version + '.0',
+            'spark.sql.hive.metastore.jars': ':'.join(
+                artifacts['hadoop_libs'] + hive_libs)
         }
 
-    def _hadoop_libs_path(self, cluster_context):
-        cmd = 'echo $(hadoop classpath)'
-        with cluster_context.get_instance(SPARK_HISTORY_SERVER).remote() as r:
-            result = r.execute_command(cmd, run_as_root=True, timeout=600)
-        return result[1].replace('\n', '').split(':')
-
-    def _hive_libs_path(self, cluster_context):
-        cmd = "find %s -name '*.jar'" % (
-            self._hive(cluster_context).home_dir(cluster_context) + '/lib')
-        with cluster_context.get_instance(hive.HIVE_METASTORE).remote() as r:
-            result = r.execute_command(cmd, run_as_root=True, timeout=600)
-        return [x for x in list(result[1].split('\n')) if x]
-
-    def _assembly_jar_path(self, cluster_context):
-        cmd = "find %s -name 'spark-assembly*.jar'" % (
-            self.home_dir(cluster_context) + '/lib')
+    @staticmethod
+    def _datanucleus_libs(hive_libs):
+        return [lib for lib in hive_libs
+                if lib.rsplit('/', 1)[-1].startswith('datanucleus-')]
+
+    def _get_artifacts_script(self, cluster_context, hive_service):
+        sections = []
+        if self.HAS_ASSEMBLY_JAR:
+            sections.append(
+                ('assembly_jar', "find %s/lib -name 'spark-assembly*.jar'" %
+                 self.home_dir(cluster_context)))
+        if hive_service:
+            sections += [
+                ('hive_libs', "find %s/lib -name '*.jar'" %
+                 hive_service.home_dir(cluster_context)),
+                ('hadoop_libs', 'echo $(hadoop classpath) | tr : "\\n"')]
+        return '; '.join("echo '[%s]'; %s" % section for section in sections)
+
+    def _get_artifacts(self, cluster_context, hive_service=None):
+        """Returns the jars and classpath needed by the Spark configs.
+
+        All of them are looked up on the Spark history server by a single
+        command. The result is stored in the cluster extra together with
+        the Spark and Hive versions it was found for.
+        """
+        cmd = self._get_artifacts_script(cluster_context, hive_service)
+        if not cmd:
+            return {}
+
+        ctx = context.ctx()
+        cluster = conductor.cluster_get(ctx, cluster_context.cluster)
+        extra = cluster.extra.to_dict() if cluster.extra else {}
+        versions = [self.version,
+                    hive_service.version if hive_service else None]
+        stored = extra.get(ARTIFACTS_KEY)
+        if stored and stored['versions'] == versions:
+            return stored['artifacts']
+
         with cluster_context.get_instance(SPARK_HISTORY_SERVER).remote() as r:
-            result = r.execute_command(cmd, run_as_root=True, timeout=600)
-        if result[1]:
-            return result[1].strip()
+            code, out = r.execute_command(cmd, run_as_root=True,
+                                          timeout=ARTIFACTS_TIMEOUT)
+
+        artifacts = collections.defaultdict(list)
+        section = None
+        for line in out.splitlines():
+            line = line.strip()
+            if line.startswith('[') and line.endswith(']'):
+                section = artifacts[line[1:-1]]
+            elif line and section is not None:
+                section.append(line)
+        artifacts = dict(artifacts)
+
+        # lookups done before the packages are installed are not kept
+        if all(artifacts.values()):
+            extra[ARTIFACTS_KEY] = {'versions': versions,
+                                    'artifacts': artifacts}
+            conductor.cluster_update(ctx, cluster, {'extra': extra})
+        return artifacts
+
+    def _assembly_jar_path(self, cluster_context, hive_service=None):
+        hive_service = hive_service or self._hive(cluster_context)
+        jars = self._get_artifacts(
+            cluster_context, hive_service).get('assembly_jar')
+        if jars:
+            return jars[0]
         else:
-            raise Exception("no spark-assembly lib found!")
-
-    def _hive_datanucleus_libs_path(self, cluster_context):
-        cmd = "find %s -name 'datanucleus-*.jar'" % (
-            self._hive(cluster_context).home_dir(cluster_context) + '/lib')
-        with cluster_context.get_instance(hive.HIVE_METASTORE).remote() as r:
-            result = r.execute_command(cmd, run_as_root=True, timeout=600)
-        return [x for x in list(result[1].split('\n')) if x]
+            raise ex.HadoopProvisionError("no spark-assembly lib found!")
 
     # hive installed service instance
     def _hive(self, cluster_context):
@@ -236,12 +281,12 @@ class SparkOnYarn(s.Service):
         return cluster_context._find_service_instance('HBase', hbase_version)
 
     def _get_hbase_version(self, cluster_context):
-        return (self._hbase(cluster_context).version
-                if self._hbase(cluster_context) else None)
+        hbase_service = self._hbase(cluster_context)
+        return hbase_service.version if hbase_service else None
 
     def _get_hive_version(self, cluster_context):
-        return (self._hive(cluster_context).version
-                if self._hive(cluster_context) else None)
+        hive_service = self._hive(cluster_context)
+        return hive_service.version if hive_service else None
 
     # hue installed service instance
     def _hue(self, cluster_context):
@@ -257,10 +302,11 @@ class SparkOnYarn(s.Service):
         jar_path = "%s/apps/spark/java-lib/javax.servlet-api-*.jar" % \
                    self._hue(cluster_context).home_dir(cluster_context)
         path = '%s/lib/' % self.home_dir(cluster_context) + self.SERVLET_JAR
-        with cluster_context.get_instance('Hue').remote() as r1:
-            for instance in cluster_context.get_instances(SPARK_SLAVE):
-                with instance.remote() as r2:
-                    mfs.exchange(r1, r2, jar_path, path, 'mapr')
+        hue_instance = cluster_context.get_instance('Hue')
+        jar_path = g.resolve_path(hue_instance, jar_path)
+        g.copy_file_to_instances(jar_path, hue_instance, path,
+                                 cluster_context.get_instances(SPARK_SLAVE),
+                                 run_as='root', owner='mapr')
 
 
 class SparkOnYarnV161(SparkOnYarn):
@@ -271,14 +317,16 @@ class SparkOnYarnV161(SparkOnYarn):
 
 
 class SparkOnYarnV201(SparkOnYarn):
+    HAS_ASSEMBLY_JAR = False
+
     def __init__(self):
         super(SparkOnYarnV201, self).__init__()
         self._version = '2.0.1'
         self._dependencies = [('mapr-spark', self.version)]
 
     def get_config_files(self, cluster_context, configs, instance=None):
-        hbase_version = self._get_hbase_version(cluster_context)
-        hive_version = self._get_hive_version(cluster_context)
+        hive_service = self._hive(cluster_context)
+        hbase_service = self._hbase(cluster_context)
         # spark-env-sh
         template = 'plugins/mapr/services/' \
                    'spark/resources/spark-env.template'
@@ -299,15 +347,16 @@ class SparkOnYarnV201(SparkOnYarn):
         if instance:
             versions.fetch(instance)
 
-        if hive_version:
+        if hive_service:
             versions.add_property('hive_versions',
-                                  hive_version + '.0')
-            conf.add_properties(self._hive_properties(cluster_context))
-        if hbase_version:
-            versions.add_property('hbase_versions', hbase_version)
+                                  hive_service.version + '.0')
+            conf.add_properties(self._hive_properties(cluster_context,
+                                                      hive_service))
+        if hbase_service:
+            versions.add_property('hbase_versions', hbase_service.version)
             conf.add_property('spark.executor.extraClassPath',
-                              '%s/lib/*' % self._hbase(cluster_context)
-                              .home_dir(cluster_context))
+                              '%s/lib/*' % hbase_service.home_dir(
+                                  cluster_context))
         return [conf, versions, env_sh]
 
     def post_start(self, cluster_context, instances):
@@ -18,6 +18,9 @@ from oslo_utils import uuidutils
 from sahara.plugins import context
 from sahara.plugins import objects
 import sahara.plugins.utils as utils
+from sahara_plugins.utils import threads
+
+FAN_OUT_POOL_SIZE = 16
 
 
 def unique_list(iterable, mapper=lambda i: i):
@@ -74,6 +77,25 @@ def copy_file(s_path, s_instance, d_path, d_instance, run_as=None, owner=None):
         write_file(dr, d_path, data, owner=owner)
 
 
+def copy_file_to_instances(s_path, s_instance, d_path, d_instances,
+                           run_as=None, owner=None):
+    """Copies a file from one instance to many instances.
+
+    The file is read from the source only once and written to at most
+    FAN_OUT_POOL_SIZE targets at a time.
+    """
+    with s_instance.remote() as sr:
+        data = sr.read_file_from(s_path, run_as_root=(run_as == 'root'))
+
+    def _write_file(d_instance):
+        with d_instance.remote() as dr:
+            write_file(dr, d_path, data, owner=owner)
+
+    with threads.BoundedThreadGroup(FAN_OUT_POOL_SIZE) as tg:
+        for d_instance in d_instances:
+            tg.spawn('copy-file-%s' % d_instance.id, _write_file, d_instance)
+
+
 def copy_dir(s_path, s_instance, d_path, d_instance, run_as=None):
     s_path = create_archive(s_instance, s_path, run_as=run_as)
     tmp_path = unique_file_name('/tmp')
@@ -141,6 +163,13 @@ def is_directory(remote, path):
     return not ec
 
 
+@remote_command(0)
+def resolve_path(remote, pattern):
+    """Returns the first path matching the shell pattern."""
+    ec, out = remote.execute_command('ls -1d %s' % pattern, True)
+    return out.strip().splitlines()[0]
+
+
 @remote_command(0)
 def chown(remote, owner, path):
     args = {'owner': owner, 'path': path}
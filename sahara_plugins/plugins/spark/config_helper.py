@@ -21,6 +21,7 @@ from sahara.plugins import provisioning as p
 from sahara.plugins import swift_helper as swift
 from sahara.plugins import topology_helper as topology
 from sahara.plugins import utils
+from sahara_plugins.utils import hadoop_xml
 
 
 LOG = logging.getLogger(__name__)
@@ -38,6 +39,12 @@ XML_CONFS = {
     "HDFS": [CORE_DEFAULT, HDFS_DEFAULT, SWIFT_DEFAULTS]
 }
 
+# names of the xml configs of every service, for lookups by name
+XML_CONF_NAMES = dict(
+    (service, frozenset(cfg['name'] for cfg_list in cfg_lists
+                        for cfg in cfg_list))
+    for service, cfg_lists in six.iteritems(XML_CONFS))
+
 _default_executor_classpath = ":".join(
     ['/usr/lib/hadoop-mapreduce/hadoop-openstack.jar'])
 
@@ -165,6 +172,21 @@ DECOMMISSIONING_TIMEOUT = p.Config('Decommissioning Timeout', 'general',
                                                ' decommissioning operation'
                                                ' during scaling, in seconds')
 
+ROLLING_SCALING = p.Config('Rolling scaling', 'general', 'cluster',
+                           config_type='bool', priority=1,
+                           default_value=False, is_optional=True,
+                           description='Start and stop Spark workers one by'
+                                       ' one during scaling, without'
+                                       ' restarting the Spark master')
+
+WORKERS_DRAIN_TIMEOUT = p.Config(
+    'Spark workers drain timeout', 'general', 'cluster', config_type='int',
+    priority=1, is_optional=True,
+    description='Time to wait for executors on removed Spark workers to'
+                ' finish during rolling scaling, in seconds. Defaults to'
+                ' and is capped by the decommissioning timeout. 0 stops'
+                ' the workers right away')
+
 HIDDEN_CONFS = ['fs.defaultFS', 'dfs.namenode.name.dir',
                 'dfs.datanode.data.dir']
 
@@ -223,6 +245,8 @@ def _initialise_configs():
     configs.append(DECOMMISSIONING_TIMEOUT)
     configs.append(ENABLE_SWIFT)
     configs.append(DATANODES_STARTUP_TIMEOUT)
+    configs.append(ROLLING_SCALING)
+    configs.append(WORKERS_DRAIN_TIMEOUT)
     if CONF.enable_data_locality:
         configs.append(ENABLE_DATA_LOCALITY)
 
@@ -236,6 +260,17 @@ def get_plugin_configs():
     return PLUGIN_CONFIGS
 
 
+def get_config_value(service, name, cluster, resolved=None):
+    """Returns the value of an option of the cluster.
+
+    resolved is the cluster_configs.ResolvedConfigs of the running
+    operation, if the caller has one.
+    """
+    if resolved is not None:
+        return resolved.get(service, name)
+    return utils.get_config_value_or_default(service, name, cluster)
+
+
 def generate_cfg_from_general(cfg, configs, general_config,
                               rest_excluded=False):
     if 'general' in configs:
@@ -291,8 +326,8 @@ def generate_xml_configs(configs, storage_path, nn_hostname, hadoop_port):
         core_all += topology.vm_awareness_core_config()
 
     xml_configs = {
-        'core-site': utils.create_hadoop_xml(cfg, core_all),
-        'hdfs-site': utils.create_hadoop_xml(cfg, HDFS_DEFAULT)
+        'core-site': hadoop_xml.create_hadoop_xml(cfg, core_all),
+        'hdfs-site': hadoop_xml.create_hadoop_xml(cfg, HDFS_DEFAULT)
     }
 
     return xml_configs
@@ -305,7 +340,7 @@ def _get_spark_opt_default(opt_name):
     return None
 
 
-def generate_spark_env_configs(cluster):
+def generate_spark_env_configs(cluster, resolved=None):
     configs = []
 
     # master configuration
@@ -317,64 +352,70 @@ def generate_spark_env_configs(cluster):
     # to /opt/spark/conf
     configs.append('HADOOP_CONF_DIR=' + HADOOP_CONF_DIR)
 
-    masterport = utils.get_config_value_or_default("Spark",
-                                                   "Master port",
-                                                   cluster)
+    masterport = get_config_value("Spark",
+                                  "Master port",
+                                  cluster, resolved)
     if masterport and masterport != _get_spark_opt_default("Master port"):
         configs.append('SPARK_MASTER_PORT=' + str(masterport))
 
-    masterwebport = utils.get_config_value_or_default("Spark",
-                                                      "Master webui port",
-                                                      cluster)
+    masterwebport = get_config_value("Spark",
+                                     "Master webui port",
+                                     cluster, resolved)
     if (masterwebport and
             masterwebport != _get_spark_opt_default("Master webui port")):
         configs.append('SPARK_MASTER_WEBUI_PORT=' + str(masterwebport))
 
     # configuration for workers
-    workercores = utils.get_config_value_or_default("Spark",
-                                                    "Worker cores",
-                                                    cluster)
+    workercores = get_config_value("Spark",
+                                   "Worker cores",
+                                   cluster, resolved)
     if workercores and workercores != _get_spark_opt_default("Worker cores"):
         configs.append('SPARK_WORKER_CORES=' + str(workercores))
 
-    workermemory = utils.get_config_value_or_default("Spark",
-                                                     "Worker memory",
-                                                     cluster)
+    workermemory = get_config_value("Spark",
+                                    "Worker memory",
+                                    cluster, resolved)
     if (workermemory and
             workermemory != _get_spark_opt_default("Worker memory")):
         configs.append('SPARK_WORKER_MEMORY=' + str(workermemory))
 
-    workerport = utils.get_config_value_or_default("Spark",
-                                                   "Worker port",
-                                                   cluster)
+    workerport = get_config_value("Spark",
+                                  "Worker port",
+                                  cluster, resolved)
     if workerport and workerport != _get_spark_opt_default("Worker port"):
         configs.append('SPARK_WORKER_PORT=' + str(workerport))
 
-    workerwebport = utils.get_config_value_or_default("Spark",
-                                                      "Worker webui port",
-                                                      cluster)
+    workerwebport = get_config_value("Spark",
+                                     "Worker webui port",
+                                     cluster, resolved)
     if (workerwebport and
             workerwebport != _get_spark_opt_default("Worker webui port")):
         configs.append('SPARK_WORKER_WEBUI_PORT=' + str(workerwebport))
 
-    workerinstances = utils.get_config_value_or_default("Spark",
-                                                        "Worker instances",
-                                                        cluster)
+    workerinstances = get_config_value("Spark",
+                                       "Worker instances",
+                                       cluster, resolved)
     if (workerinstances and
             workerinstances != _get_spark_opt_default("Worker instances")):
         configs.append('SPARK_WORKER_INSTANCES=' + str(workerinstances))
     return '\n'.join(configs)
 
 
+def get_spark_master_url(cluster):
+    sp_master = utils.get_instance(cluster, "master")
+    port = get_config_value("Spark", "Master port", cluster)
+    return 'spark://%s:%s' % (sp_master.hostname(), port)
+
+
 # workernames need to be a list of worker names
 def generate_spark_slaves_configs(workernames):
     return '\n'.join(workernames)
 
 
-def generate_spark_executor_classpath(cluster):
-    cp = utils.get_config_value_or_default("Spark",
-                                           "Executor extra classpath",
-                                           cluster)
+def generate_spark_executor_classpath(cluster, resolved=None):
+    cp = get_config_value("Spark",
+                          "Executor extra classpath",
+                          cluster, resolved)
     if cp:
         return "spark.executor.extraClassPath " + cp
     return "\n"
@@ -388,11 +429,12 @@ def extract_hadoop_environment_confs(configs):
 
     lst = []
     for service, srv_confs in configs.items():
-        if ENV_CONFS.get(service):
+        env_confs = ENV_CONFS.get(service)
+        if env_confs:
             for param_name, param_value in srv_confs.items():
-                for cfg_name, cfg_format_str in ENV_CONFS[service].items():
-                    if param_name == cfg_name and param_value is not None:
-                        lst.append(cfg_format_str % param_value)
+                cfg_format_str = env_confs.get(param_name)
+                if cfg_format_str and param_value is not None:
+                    lst.append(cfg_format_str % param_value)
     return lst
 
 
@@ -405,12 +447,11 @@ def extract_hadoop_xml_confs(configs):
 
     lst = []
     for service, srv_confs in configs.items():
-        if XML_CONFS.get(service):
+        names = XML_CONF_NAMES.get(service)
+        if names:
             for param_name, param_value in srv_confs.items():
-                for cfg_list in XML_CONFS[service]:
-                    names = [cfg['name'] for cfg in cfg_list]
-                    if param_name in names and param_value is not None:
-                        lst.append((param_name, param_value))
+                if param_name in names and param_value is not None:
+                    lst.append((param_name, param_value))
     return lst
 
 
@@ -440,14 +481,14 @@ def generate_hadoop_setup_script(storage_paths, env_configs):
     return "\n".join(script_lines)
 
 
-def generate_job_cleanup_config(cluster):
+def generate_job_cleanup_config(cluster, resolved=None):
     args = {
-        'minimum_cleanup_megabytes': utils.get_config_value_or_default(
-            "Spark", "Minimum cleanup megabytes", cluster),
-        'minimum_cleanup_seconds': utils.get_config_value_or_default(
-            "Spark", "Minimum cleanup seconds", cluster),
-        'maximum_cleanup_seconds': utils.get_config_value_or_default(
-            "Spark", "Maximum cleanup seconds", cluster)
+        'minimum_cleanup_megabytes': get_config_value(
+            "Spark", "Minimum cleanup megabytes", cluster, resolved),
+        'minimum_cleanup_seconds': get_config_value(
+            "Spark", "Minimum cleanup seconds", cluster, resolved),
+        'maximum_cleanup_seconds': get_config_value(
+            "Spark", "Maximum cleanup seconds", cluster, resolved)
     }
     job_conf = {'valid': (args['maximum_cleanup_seconds'] > 0 and
                           (args['minimum_cleanup_megabytes'] > 0
@@ -504,10 +545,23 @@ def is_swift_enabled(configs):
     return _get_general_config_value(configs, ENABLE_SWIFT)
 
 
+def is_rolling_scaling_enabled(cluster):
+    return _get_general_cluster_config_value(cluster, ROLLING_SCALING)
+
+
+def get_workers_drain_timeout(cluster):
+    timeout = get_decommissioning_timeout(cluster)
+    drain_timeout = _get_general_cluster_config_value(cluster,
+                                                      WORKERS_DRAIN_TIMEOUT)
+    if drain_timeout is None:
+        return timeout
+    return min(drain_timeout, timeout)
+
+
 def get_decommissioning_timeout(cluster):
     return _get_general_cluster_config_value(cluster, DECOMMISSIONING_TIMEOUT)
 
 
 def get_port_from_config(service, name, cluster=None):
-    address = utils.get_config_value_or_default(service, name, cluster)
+    address = get_config_value(service, name, cluster)
     return utils.get_port_from_address(address)
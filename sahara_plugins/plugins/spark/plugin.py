@@ -33,6 +33,8 @@ from sahara_plugins.plugins.spark import edp_engine
 from sahara_plugins.plugins.spark import run_scripts as run
 from sahara_plugins.plugins.spark import scaling as sc
 from sahara_plugins.plugins.spark import shell_engine
+from sahara_plugins.utils import cluster_configs
+from sahara_plugins.utils import topology
 
 
 LOG = logging.getLogger(__name__)
@@ -87,9 +89,9 @@ class SparkProvider(p.ProvisioningPluginBase):
             raise ex.InvalidComponentCountException("datanode", _("1 or more"),
                                                     nn_count)
 
-        rep_factor = utils.get_config_value_or_default('HDFS',
-                                                       "dfs.replication",
-                                                       cluster)
+        rep_factor = c_helper.get_config_value('HDFS',
+                                               "dfs.replication",
+                                               cluster)
         if dn_count < rep_factor:
             raise ex.InvalidComponentCountException(
                 'datanode', _('%s or more') % rep_factor, dn_count,
@@ -166,12 +168,12 @@ class SparkProvider(p.ProvisioningPluginBase):
         LOG.info('Cluster has been started successfully')
         self._set_cluster_info(cluster)
 
-    def _spark_home(self, cluster):
-        return utils.get_config_value_or_default("Spark",
-                                                 "Spark home",
-                                                 cluster)
+    def _spark_home(self, cluster, resolved=None):
+        return c_helper.get_config_value("Spark",
+                                         "Spark home",
+                                         cluster, resolved)
 
-    def _extract_configs_to_extra(self, cluster):
+    def _extract_configs_to_extra(self, cluster, resolved=None):
         sp_master = utils.get_instance(cluster, "master")
         sp_slaves = utils.get_instances(cluster, "slave")
 
@@ -179,7 +181,8 @@ class SparkProvider(p.ProvisioningPluginBase):
 
         config_master = config_slaves = ''
         if sp_master is not None:
-            config_master = c_helper.generate_spark_env_configs(cluster)
+            config_master = c_helper.generate_spark_env_configs(cluster,
+                                                                resolved)
 
         if sp_slaves is not None:
             slavenames = []
@@ -191,9 +194,11 @@ class SparkProvider(p.ProvisioningPluginBase):
 
         # Any node that might be used to run spark-submit will need
         # these libs for swift integration
-        config_defaults = c_helper.generate_spark_executor_classpath(cluster)
+        config_defaults = c_helper.generate_spark_executor_classpath(
+            cluster, resolved)
 
-        extra['job_cleanup'] = c_helper.generate_job_cleanup_config(cluster)
+        extra['job_cleanup'] = c_helper.generate_job_cleanup_config(
+            cluster, resolved)
 
         extra['sp_master'] = config_master
         extra['sp_slaves'] = config_slaves
@@ -202,11 +207,19 @@ class SparkProvider(p.ProvisioningPluginBase):
         if c_helper.is_data_locality_enabled(cluster):
             topology_data = th.generate_topology_map(
                 cluster, CONF.enable_hypervisor_awareness)
-            extra['topology_data'] = "\n".join(
-                [k + " " + v for k, v in topology_data.items()]) + "\n"
+            extra['topology_data'] = topology.render_topology_map(
+                topology_data)
 
         return extra
 
+    def _get_instance_ng_related_extra(self, cluster, instance, extra,
+                                       ng_extras):
+        key = (instance.node_group.id, tuple(instance.storage_paths()))
+        if key not in ng_extras:
+            ng_extras.setdefault(key, self._add_instance_ng_related_to_extra(
+                cluster, instance, extra))
+        return ng_extras[key]
+
     def _add_instance_ng_related_to_extra(self, cluster, instance, extra):
         extra = extra.copy()
         ng = instance.node_group
@@ -238,33 +251,65 @@ class SparkProvider(p.ProvisioningPluginBase):
         with instance.remote() as r:
             run.start_processes(r, "datanode")
 
+    def _start_slave_processes(self, cluster, sl_instances):
+        if len(sl_instances) == 0:
+            return
+
+        utils.add_provisioning_step(
+            cluster.id, utils.start_process_event_message("Spark workers"),
+            len(sl_instances))
+
+        master_url = c_helper.get_spark_master_url(cluster)
+        with context.PluginsThreadGroup() as tg:
+            for i in sl_instances:
+                tg.spawn('spark-start-slave-%s' % i.instance_name,
+                         self._start_slave, cluster, i, master_url)
+
+    @utils.event_wrapper(mark_successful_on_exit=True)
+    def _start_slave(self, cluster, instance, master_url):
+        with utils.get_remote(instance) as r:
+            run.start_spark_slave(r, self._spark_home(cluster), master_url)
+
     def _setup_instances(self, cluster, instances=None):
-        extra = self._extract_configs_to_extra(cluster)
+        # option values are resolved once for the whole operation
+        resolved = cluster_configs.ResolvedConfigs(
+            cluster, c_helper.get_plugin_configs())
+        extra = self._extract_configs_to_extra(cluster, resolved)
 
         if instances is None:
             instances = utils.get_instances(cluster)
 
-        self._push_configs_to_nodes(cluster, extra, instances)
+        self._push_configs_to_nodes(cluster, extra, instances, resolved)
 
-    def _push_configs_to_nodes(self, cluster, extra, new_instances):
+    def _push_configs_to_nodes(self, cluster, extra, new_instances,
+                               resolved=None):
         all_instances = utils.get_instances(cluster)
         utils.add_provisioning_step(
             cluster.id, _("Push configs to nodes"), len(all_instances))
+        # configs of new instances are rendered by the workers, instances
+        # of a node group with the same storage layout share them
+        ng_extras = {}
         with context.PluginsThreadGroup() as tg:
             for instance in all_instances:
-                extra = self._add_instance_ng_related_to_extra(
-                    cluster, instance, extra)
                 if instance in new_instances:
                     tg.spawn('spark-configure-%s' % instance.instance_name,
                              self._push_configs_to_new_node, cluster,
-                             extra, instance)
+                             extra, instance, ng_extras, resolved)
                 else:
                     tg.spawn('spark-reconfigure-%s' % instance.instance_name,
                              self._push_configs_to_existing_node, cluster,
-                             extra, instance)
+                             extra, instance, resolved)
+
+        if c_helper.is_data_locality_enabled(cluster):
+            topology.push_topology_data(cluster, all_instances,
+                                        extra['topology_data'],
+                                        self._write_topology_data)
 
     @utils.event_wrapper(mark_successful_on_exit=True)
-    def _push_configs_to_new_node(self, cluster, extra, instance):
+    def _push_configs_to_new_node(self, cluster, extra, instance,
+                                  ng_extras, resolved=None):
+        extra = self._get_instance_ng_related_extra(cluster, instance, extra,
+                                                    ng_extras)
         files_hadoop = {
             os.path.join(c_helper.HADOOP_CONF_DIR,
                          "core-site.xml"): extra['xml']['core-site'],
@@ -272,7 +317,7 @@ class SparkProvider(p.ProvisioningPluginBase):
                          "hdfs-site.xml"): extra['xml']['hdfs-site'],
         }
 
-        sp_home = self._spark_home(cluster)
+        sp_home = self._spark_home(cluster, resolved)
         files_spark = {
             os.path.join(sp_home, 'conf/spark-env.sh'): extra['sp_master'],
             os.path.join(sp_home, 'conf/slaves'): extra['sp_slaves'],
@@ -333,20 +378,19 @@ class SparkProvider(p.ProvisioningPluginBase):
                     'sudo chmod +x /etc/hadoop/topology.sh'
                 )
 
-            self._write_topology_data(r, cluster, extra)
             self._push_master_configs(r, cluster, extra, instance)
             self._push_cleanup_job(r, cluster, extra, instance)
 
     @utils.event_wrapper(mark_successful_on_exit=True)
-    def _push_configs_to_existing_node(self, cluster, extra, instance):
+    def _push_configs_to_existing_node(self, cluster, extra, instance,
+                                       resolved=None):
         node_processes = instance.node_group.node_processes
-        need_update_hadoop = (c_helper.is_data_locality_enabled(cluster) or
-                              'namenode' in node_processes)
+        need_update_hadoop = 'namenode' in node_processes
         need_update_spark = ('master' in node_processes or
                              'slave' in node_processes)
 
         if need_update_spark:
-            sp_home = self._spark_home(cluster)
+            sp_home = self._spark_home(cluster, resolved)
             files = {
                 os.path.join(sp_home,
                              'conf/spark-env.sh'): extra['sp_master'],
@@ -360,12 +404,10 @@ class SparkProvider(p.ProvisioningPluginBase):
             self._push_cleanup_job(r, cluster, extra, instance)
         if need_update_hadoop:
             with utils.get_remote(instance) as r:
-                self._write_topology_data(r, cluster, extra)
                 self._push_master_configs(r, cluster, extra, instance)
 
-    def _write_topology_data(self, r, cluster, extra):
-        if c_helper.is_data_locality_enabled(cluster):
-            topology_data = extra['topology_data']
+    def _write_topology_data(self, instance, topology_data):
+        with utils.get_remote(instance) as r:
             r.write_file_to('/etc/hadoop/topology.data', topology_data)
 
     def _push_master_configs(self, r, cluster, extra, instance):
@@ -398,7 +440,7 @@ class SparkProvider(p.ProvisioningPluginBase):
         info = {}
 
         if nn:
-            address = utils.get_config_value_or_default(
+            address = c_helper.get_config_value(
                 'HDFS', 'dfs.http.address', cluster)
             port = address[address.rfind(':') + 1:]
             info['HDFS'] = {
@@ -407,7 +449,7 @@ class SparkProvider(p.ProvisioningPluginBase):
             info['HDFS']['NameNode'] = 'hdfs://%s:8020' % nn.hostname()
 
         if sp_master:
-            port = utils.get_config_value_or_default(
+            port = c_helper.get_config_value(
                 'Spark', 'Master webui port', cluster)
             if port is not None:
                 info['Spark'] = {
@@ -446,10 +488,11 @@ class SparkProvider(p.ProvisioningPluginBase):
             sc.decommission_dn(nn, instances, dns)
 
     def scale_cluster(self, cluster, instances):
-        master = utils.get_instance(cluster, "master")
-        r_master = utils.get_remote(master)
-
-        run.stop_spark(r_master, self._spark_home(cluster))
+        rolling = c_helper.is_rolling_scaling_enabled(cluster)
+        if not rolling:
+            master = utils.get_instance(cluster, "master")
+            r_master = utils.get_remote(master)
+            run.stop_spark(r_master, self._spark_home(cluster))
 
         self._setup_instances(cluster, instances)
         nn = utils.get_instance(cluster, "namenode")
@@ -459,8 +502,14 @@ class SparkProvider(p.ProvisioningPluginBase):
         self._start_datanode_processes(dn_instances)
 
         swift_helper.install_ssl_certs(instances)
-        run.start_spark_master(r_master, self._spark_home(cluster))
-        LOG.info("Spark master service has been restarted")
+        if rolling:
+            sl_instances = [instance for instance in instances if
+                            'slave' in instance.node_group.node_processes]
+            self._start_slave_processes(cluster, sl_instances)
+            LOG.info("Spark workers have been started")
+        else:
+            run.start_spark_master(r_master, self._spark_home(cluster))
+            LOG.info("Spark master service has been restarted")
 
     def _get_scalable_processes(self):
         return ["datanode", "slave"]
@@ -491,9 +540,9 @@ class SparkProvider(p.ProvisioningPluginBase):
                         ' '.join(ng.node_processes))
 
         dn_amount = len(utils.get_instances(cluster, "datanode"))
-        rep_factor = utils.get_config_value_or_default('HDFS',
-                                                       "dfs.replication",
-                                                       cluster)
+        rep_factor = c_helper.get_config_value('HDFS',
+                                               "dfs.replication",
+                                               cluster)
 
         if dn_to_delete > 0 and dn_amount - dn_to_delete < rep_factor:
             raise ex.ClusterCannotBeScaled(
@@ -539,16 +588,16 @@ class SparkProvider(p.ProvisioningPluginBase):
             'namenode': [8020, 50070, 50470],
             'datanode': [50010, 1004, 50075, 1006, 50020],
             'master': [
-                int(utils.get_config_value_or_default("Spark", "Master port",
-                                                      cluster)),
-                int(utils.get_config_value_or_default("Spark",
-                                                      "Master webui port",
-                                                      cluster)),
+                int(c_helper.get_config_value("Spark", "Master port",
+                                              cluster)),
+                int(c_helper.get_config_value("Spark",
+                                              "Master webui port",
+                                              cluster)),
             ],
             'slave': [
-                int(utils.get_config_value_or_default("Spark",
-                                                      "Worker webui port",
-                                                      cluster))
+                int(c_helper.get_config_value("Spark",
+                                              "Worker webui port",
+                                              cluster))
             ]
         }
 
@@ -16,14 +16,20 @@
 import os
 
 from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
 
 from sahara.plugins import utils
 from sahara_plugins.i18n import _
 from sahara_plugins.plugins.spark import config_helper as c_helper
+from sahara_plugins.utils import hadoop_status
 
 
 LOG = logging.getLogger(__name__)
 
+STATUS_PROVIDER = hadoop_status.StatusProvider(
+    hadoop_status.RestStatusSource(),
+    hadoop_status.CliStatusSource('sudo su -lc "%s" hdfs'))
+
 
 def start_processes(remote, *processes):
     for proc in processes:
@@ -61,6 +67,32 @@ def stop_spark(nn_remote, sp_home):
                                                      "sbin/stop-all.sh"))
 
 
+def start_spark_slave(remote, sp_home, master_url):
+    remote.execute_command("bash %s %s" % (
+        os.path.join(sp_home, "sbin/start-slave.sh"), master_url))
+
+
+def get_spark_workers(master_remote, webui_port):
+    """Returns the workers known to the Spark master, None if unknown.
+
+    The master JSON endpoint is queried on the master instance itself.
+    """
+    code, out = master_remote.execute_command(
+        "curl -s -f 'http://localhost:%s/json/'" % webui_port,
+        raise_when_error=False)
+    if code != 0:
+        return None
+    try:
+        return json.loads(out).get('workers', [])
+    except ValueError:
+        return None
+
+
+def stop_spark_slave(remote, sp_home):
+    remote.execute_command("bash " + os.path.join(sp_home,
+                                                  "sbin/stop-slave.sh"))
+
+
 @utils.event_wrapper(
     True, step=_("Await DataNodes start up"), param=("cluster", 0))
 def await_datanodes(cluster):
@@ -81,10 +113,7 @@ def _check_datanodes_count(remote, count):
         return True
 
     LOG.debug("Checking DataNodes count")
-    ex_code, stdout = remote.execute_command(
-        'sudo su -lc "hdfs dfsadmin -report" hdfs | '
-        'grep \'Live datanodes\|Datanodes available:\' | '
-        'grep -o \'[0-9]\+\' | head -n 1')
-    LOG.debug("DataNodes count='{count}'".format(count=stdout.strip()))
+    live_count = STATUS_PROVIDER.get_live_datanodes_count(remote)
+    LOG.debug("DataNodes count='{count}'".format(count=live_count))
 
-    return stdout and int(stdout) == count
+    return live_count == count
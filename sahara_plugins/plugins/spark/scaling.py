@@ -15,13 +15,21 @@
 
 import os
 
-import six
+from oslo_log import log as logging
+from oslo_utils import excutils
+from oslo_utils import timeutils
 
 from sahara.plugins import context
+from sahara.plugins import exceptions as ex
 from sahara.plugins import utils
 from sahara_plugins.i18n import _
 from sahara_plugins.plugins.spark import config_helper as c_helper
 from sahara_plugins.plugins.spark import run_scripts as run
+from sahara_plugins.utils import hadoop_status
+
+LOG = logging.getLogger(__name__)
+
+DRAIN_POLL_INTERVAL = 10
 
 
 @utils.event_wrapper(True, step=_("Decommission %s") % "Slaves")
@@ -35,74 +43,135 @@ def decommission_sl(master, inst_to_be_deleted, survived_inst):
         slaves_content = "\n"
 
     cluster = master.cluster
-    sp_home = utils.get_config_value_or_default("Spark", "Spark home", cluster)
+    sp_home = c_helper.get_config_value("Spark", "Spark home", cluster)
+    files = {os.path.join(sp_home, 'conf/slaves'): slaves_content}
+    # the master may run a worker as well
+    instances = [master] + [i for i in survived_inst if i.id != master.id]
+
+    if c_helper.is_rolling_scaling_enabled(cluster):
+        # only the removed workers are stopped, the master and running
+        # applications keep going
+        sl_instances = [i for i in inst_to_be_deleted
+                        if 'slave' in i.node_group.node_processes]
+        _await_workers_drained(master, sl_instances)
+        with context.PluginsThreadGroup() as tg:
+            for i in sl_instances:
+                tg.spawn('spark-stop-slave-%s' % i.instance_name,
+                         _stop_slave, i, sp_home)
+        _write_slaves_files(instances, files)
+        return
+
     r_master = utils.get_remote(master)
     run.stop_spark(r_master, sp_home)
+    _write_slaves_files(instances, files)
+    run.start_spark_master(r_master, sp_home)
 
-    # write new slave file to master
-    files = {os.path.join(sp_home, 'conf/slaves'): slaves_content}
-    r_master.write_files_to(files)
 
-    # write new slaves file to each survived slave as well
-    for i in survived_inst:
-        with utils.get_remote(i) as r:
-            r.write_files_to(files)
+def _get_busy_workers(r_master, webui_port, instances):
+    """Returns the instances running executors on their Spark workers."""
+    workers = run.get_spark_workers(r_master, webui_port)
+    if workers is None:
+        return None
 
-    run.start_spark_master(r_master, sp_home)
+    cores_used = {}
+    for worker in workers:
+        if worker.get('state') == 'ALIVE':
+            host = worker.get('host')
+            cores_used[host] = cores_used.get(host, 0) + (
+                worker.get('coresused') or 0)
 
+    return [i for i in instances
+            if any(cores_used.get(host) for host in
+                   (i.hostname(), i.fqdn(), i.internal_ip))]
 
-def _is_decommissioned(r, inst_to_be_deleted):
-    cmd = r.execute_command("sudo -u hdfs hadoop dfsadmin -report")
-    datanodes_info = parse_dfs_report(cmd[1])
-    for i in inst_to_be_deleted:
-        for dn in datanodes_info:
-            if (dn["Name"].startswith(i.internal_ip)) and (
-                    dn["Decommission Status"] != "Decommissioned"):
-                return False
-    return True
+
+def _await_workers_drained(master, instances):
+    """Waits for the executors on the workers of the instances to finish.
+
+    The standalone master has no way to exclude a live worker, so the
+    workers are only stopped once the applications running on them are
+    done or the drain timeout is over. If the master cannot tell which
+    workers are busy until then, the workers are left running and
+    HadoopProvisionError is raised.
+    """
+    cluster = master.cluster
+    timeout = c_helper.get_workers_drain_timeout(cluster)
+    if not instances or not timeout:
+        return
+
+    webui_port = c_helper.get_config_value(
+        "Spark", "Master webui port", cluster)
+    started_at = timeutils.utcnow()
+    with utils.get_remote(master) as r:
+        while True:
+            busy = _get_busy_workers(r, webui_port, instances)
+            if busy is None:
+                LOG.warning("Unable to get the Spark workers from the "
+                            "master")
+            elif not busy:
+                return
+            else:
+                LOG.info("Waiting for executors on Spark workers {names} "
+                         "to finish".format(names=', '.join(
+                             i.instance_name for i in busy)))
+
+            elapsed = timeutils.delta_seconds(started_at,
+                                              timeutils.utcnow())
+            if elapsed >= timeout:
+                break
+            context.sleep(DRAIN_POLL_INTERVAL)
+
+    if busy is None:
+        raise ex.HadoopProvisionError(
+            _("Unable to get the Spark workers from the master, the "
+              "workers to remove are not stopped"))
+    LOG.warning("Executors are still running on Spark workers {names} "
+                "after {timeout}s, stopping them".format(
+                    names=', '.join(i.instance_name for i in busy),
+                    timeout=timeout))
+
+
+def _stop_slave(instance, sp_home):
+    with utils.get_remote(instance) as r:
+        run.stop_spark_slave(r, sp_home)
+
+
+def _write_slaves_files(instances, files):
+    with context.PluginsThreadGroup() as tg:
+        for i in instances:
+            tg.spawn('spark-write-slaves-%s' % i.instance_name,
+                     _write_files, i, files)
+
+
+def _write_files(instance, files):
+    with utils.get_remote(instance) as r:
+        r.write_files_to(files)
 
 
-@utils.event_wrapper(True, step=_("Decommission %s") % "DataNodes")
 def decommission_dn(nn, inst_to_be_deleted, survived_inst):
+    dn_instances = [i for i in inst_to_be_deleted
+                    if 'datanode' in i.node_group.node_processes]
+    utils.add_provisioning_step(
+        nn.cluster_id, _("Decommission %s") % "DataNodes", len(dn_instances))
+    tracker = hadoop_status.DecommissionTracker(
+        run.STATUS_PROVIDER, dn_instances, utils.add_successful_event)
+
     with utils.get_remote(nn) as r:
         r.write_file_to('/etc/hadoop/dn.excl',
                         utils.generate_fqdn_host_names(
                             inst_to_be_deleted))
         run.refresh_nodes(utils.get_remote(nn), "dfsadmin")
-        context.sleep(3)
 
-        utils.plugin_option_poll(
-            nn.cluster, _is_decommissioned, c_helper.DECOMMISSIONING_TIMEOUT,
-            _("Decommission %s") % "DataNodes", 3, {
-                'r': r, 'inst_to_be_deleted': inst_to_be_deleted})
+        try:
+            utils.plugin_option_poll(
+                nn.cluster, tracker.check, c_helper.DECOMMISSIONING_TIMEOUT,
+                _("Decommission %s") % "DataNodes", 1, {'remote': r})
+        except Exception as e:
+            with excutils.save_and_reraise_exception():
+                for instance in tracker.pending.values():
+                    utils.add_fail_event(instance, e)
 
         r.write_files_to({
             '/etc/hadoop/dn.incl': utils.
             generate_fqdn_host_names(survived_inst),
             '/etc/hadoop/dn.excl': ""})
-
-
-def parse_dfs_report(cmd_output):
-    report = cmd_output.rstrip().split(os.linesep)
-    array = []
-    started = False
-    for line in report:
-        if started:
-            array.append(line)
-        if line.startswith("Datanodes available"):
-            started = True
-
-    res = []
-    datanode_info = {}
-    for i in six.moves.xrange(0, len(array)):
-        if array[i]:
-            idx = str.find(array[i], ':')
-            name = array[i][0:idx]
-            value = array[i][idx + 2:]
-            datanode_info[name.strip()] = value.strip()
-        if not array[i] and datanode_info:
-            res.append(datanode_info)
-            datanode_info = {}
-    if datanode_info:
-        res.append(datanode_info)
-    return res
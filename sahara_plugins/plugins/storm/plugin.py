@@ -266,32 +266,23 @@ class StormProvider(p.ProvisioningPluginBase):
     def _push_configs_to_new_node(self, cluster, extra, instance):
         ng_extra = extra[instance.node_group.id]
 
-        files_supervisor = {
-            '/etc/supervisor/supervisord.conf': ng_extra['slave_sv_conf']
-        }
-        files_storm = {
-            '/usr/local/storm/conf/storm.yaml': ng_extra['st_instances']
-        }
-        files_zk = {
-            '/opt/zookeeper/zookeeper/conf/zoo.cfg': ng_extra['zk_conf']
-        }
-        files_supervisor_master = {
-            '/etc/supervisor/supervisord.conf': ng_extra['master_sv_conf']
-        }
-        file_pyleus_conf = {
-            '/home/ubuntu/.pyleus.conf': ng_extra['pyleus_conf']
-        }
-
         with utils.get_remote(instance) as r:
             node_processes = instance.node_group.node_processes
-            r.write_files_to(files_storm, run_as_root=True)
+            batch = run.RemoteBatch(r)
+            batch.write_file('/usr/local/storm/conf/storm.yaml',
+                             ng_extra['st_instances'])
             if 'zookeeper' in node_processes:
-                self._push_zk_configs(r, files_zk)
+                batch.write_file('/opt/zookeeper/zookeeper/conf/zoo.cfg',
+                                 ng_extra['zk_conf'])
             if 'nimbus' in node_processes:
-                self._push_supervisor_configs(r, files_supervisor_master)
-                self._push_supervisor_configs(r, file_pyleus_conf)
+                batch.append_to_file('/etc/supervisor/supervisord.conf',
+                                     ng_extra['master_sv_conf'])
+                batch.append_to_file('/home/ubuntu/.pyleus.conf',
+                                     ng_extra['pyleus_conf'])
             if 'supervisor' in node_processes:
-                self._push_supervisor_configs(r, files_supervisor)
+                batch.append_to_file('/etc/supervisor/supervisord.conf',
+                                     ng_extra['slave_sv_conf'])
+            batch.run()
 
     @utils.event_wrapper(True)
     def _push_configs_to_existing_node(self, cluster, extra, instance):
@@ -301,17 +292,16 @@ class StormProvider(p.ProvisioningPluginBase):
         need_zookeeper_update = 'zookeeper' in node_processes
 
         ng_extra = extra[instance.node_group.id]
-        r = utils.get_remote(instance)
 
-        if need_storm_update:
-            storm_path = '/usr/local/storm/conf/storm.yaml'
-            files_storm = {storm_path: ng_extra['st_instances']}
-            r.write_files_to(files_storm)
-
-        if need_zookeeper_update:
-            zk_path = '/opt/zookeeper/zookeeper/conf/zoo.cfg'
-            files_zookeeper = {zk_path: ng_extra['zk_conf']}
-            self._push_zk_configs(r, files_zookeeper)
+        with utils.get_remote(instance) as r:
+            batch = run.RemoteBatch(r)
+            if need_storm_update:
+                batch.write_file('/usr/local/storm/conf/storm.yaml',
+                                 ng_extra['st_instances'])
+            if need_zookeeper_update:
+                batch.write_file('/opt/zookeeper/zookeeper/conf/zoo.cfg',
+                                 ng_extra['zk_conf'])
+            batch.run()
 
     def _set_cluster_info(self, cluster):
         st_master = utils.get_instance(cluster, "nimbus")
@@ -327,48 +317,27 @@ class StormProvider(p.ProvisioningPluginBase):
         ctx = context.ctx()
         conductor.cluster_update(ctx, cluster, {'info': info})
 
-    def _push_zk_configs(self, r, files):
-        r.write_files_to(files, run_as_root=True)
-
-    def _push_supervisor_configs(self, r, files):
-        r.append_to_files(files, run_as_root=True)
-
     # Scaling
 
-    def _get_running_topologies_names(self, cluster):
-        master = utils.get_instance(cluster, "nimbus")
-
-        cmd = (
-            "%(storm)s -c nimbus.host=%(host)s "
-            "list | grep ACTIVE | awk '{print $1}'") % (
-            {
-                "storm": "/usr/local/storm/bin/storm",
-                "host": master.hostname()
-            })
-
-        with utils.get_remote(master) as r:
-            ret, stdout = r.execute_command(cmd)
-        names = stdout.split('\n')
-        topology_names = names[0:len(names)-1]
-        return topology_names
-
     @utils.event_wrapper(
         True, step=_("Rebalance Topology"), param=('cluster', 1))
-    def rebalance_topology(self, cluster):
-        topology_names = self._get_running_topologies_names(cluster)
+    def rebalance_topology(self, cluster, wait_time=None):
         master = utils.get_instance(cluster, "nimbus")
 
-        for topology_name in topology_names:
-            cmd = (
-                '%(rebalance)s -c nimbus.host=%(host)s %(topology_name)s') % (
-                {
-                    "rebalance": "/usr/local/storm/bin/storm rebalance",
-                    "host": master.hostname(),
-                    "topology_name": topology_name
-                })
-
-            with utils.get_remote(master) as r:
-                ret, stdout = r.execute_command(cmd)
+        with utils.get_remote(master) as r:
+            results = run.rebalance_topologies(r, master.hostname(),
+                                               wait_time=wait_time)
+
+        for topology_name, rebalanced in sorted(six.iteritems(results)):
+            LOG.info("Rebalance of topology {name}: {result}".format(
+                name=topology_name,
+                result='done' if rebalanced else 'failed'))
+
+        failed = sorted(name for name, rebalanced in six.iteritems(results)
+                        if not rebalanced)
+        if failed:
+            raise ex.HadoopProvisionError(
+                _("Unable to rebalance topologies: %s") % ', '.join(failed))
 
     def validate_scaling(self, cluster, existing, additional):
         self._validate_existing_ng_scaling(cluster, existing)
@@ -13,6 +13,112 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from sahara.plugins import exceptions as ex
+
+STORM_BIN = '/usr/local/storm/bin/storm'
+
+# rebalances running at the same time on the nimbus host
+REBALANCE_PARALLELISM = 8
+
+BATCH_SCRIPT = '/tmp/sahara-batch.sh'
+BATCH_STEP_MARK = 'sahara-batch-step'
+
+
+class RemoteBatch(object):
+    """Collects file writes and commands to run on a node at once.
+
+    run() sends all the files in one transfer and runs the commands as
+    root from one generated script, which stops at the first failing
+    command and reports the exit status of every command it ran.
+    """
+
+    def __init__(self, remote):
+        self.remote = remote
+        self.files = {}
+        self.commands = []
+
+    def write_file(self, path, content):
+        self.files[path] = content
+
+    def append_to_file(self, path, content):
+        staged = '/tmp/sahara-batch-append-%d' % len(self.files)
+        self.files[staged] = content
+        self.execute('cat %s >> %s && rm -f %s' % (staged, path, staged))
+
+    def execute(self, cmd):
+        self.commands.append(cmd)
+
+    def _get_script(self):
+        lines = ['#!/bin/bash']
+        for index, cmd in enumerate(self.commands):
+            lines.extend([cmd,
+                          'rc=$?',
+                          'echo "%s %d $rc"' % (BATCH_STEP_MARK, index),
+                          '[ $rc -eq 0 ] || exit $rc'])
+        return '\n'.join(lines) + '\n'
+
+    def run(self):
+        """Runs the batch.
+
+        :returns: list of the commands and their exit statuses
+        :raises PluginRemoteCommandException: if a command failed
+        """
+        files = dict(self.files)
+        if self.commands:
+            files[BATCH_SCRIPT] = self._get_script()
+        if files:
+            self.remote.write_files_to(files, run_as_root=True)
+        if not self.commands:
+            return []
+
+        code, stdout = self.remote.execute_command(
+            'sudo bash %s' % BATCH_SCRIPT, raise_when_error=False)
+
+        statuses = []
+        for line in stdout.splitlines():
+            words = line.split()
+            if len(words) == 3 and words[0] == BATCH_STEP_MARK:
+                statuses.append((self.commands[int(words[1])],
+                                 int(words[2])))
+
+        if code:
+            cmd = statuses[-1][0] if statuses else BATCH_SCRIPT
+            raise ex.PluginRemoteCommandException(cmd, code, stdout)
+        return statuses
+
+
+def rebalance_topologies(remote, nimbus_host, wait_time=None,
+                         parallelism=REBALANCE_PARALLELISM):
+    """Rebalances all the active topologies in a single remote command.
+
+    Topologies are listed and rebalanced on the remote host, up to
+    `parallelism` rebalances at a time.
+
+    :param wait_time: seconds for the topologies to deactivate before
+                      rebalancing, the Storm default when None
+    :returns: dict of topology names and whether they were rebalanced
+    """
+    storm = "%s -c nimbus.host=%s" % (STORM_BIN, nimbus_host)
+    rebalance = '%s rebalance "$0"' % storm
+    if wait_time is not None:
+        rebalance += ' -w %d' % wait_time
+
+    cmd = ("%(storm)s list | awk '$2 == \"ACTIVE\" {print $1}' | "
+           "xargs -r -n 1 -P %(parallelism)d "
+           "sh -c '%(rebalance)s > /dev/null 2>&1; echo \"$? $0\"'") % {
+        "storm": storm,
+        "parallelism": parallelism,
+        "rebalance": rebalance
+    }
+    ret, stdout = remote.execute_command(cmd)
+
+    results = {}
+    for line in stdout.splitlines():
+        code, sep, topology_name = line.strip().partition(' ')
+        if sep:
+            results[topology_name] = code == '0'
+    return results
+
 
 def start_zookeeper(remote):
     remote.execute_command("sudo %s %s" % (
@@ -21,15 +127,11 @@ def start_zookeeper(remote):
 
 
 def start_storm_supervisor(node):
-    _create_supervisor_log_file(node)
-    _stop_supervisor_deamon(node)
-    _start_supervisor_deamon(node)
+    _restart_supervisor_deamon(node)
 
 
 def start_storm_nimbus_and_ui(node):
-    _create_supervisor_log_file(node)
-    _stop_supervisor_deamon(node)
-    _start_supervisor_deamon(node)
+    _restart_supervisor_deamon(node)
 
 
 def stop_storm_nimbus_and_ui(node):
@@ -40,15 +142,19 @@ def stop_storm_supervisor(node):
     _stop_supervisor_deamon(node)
 
 
-def _start_supervisor_deamon(node):
-    node.execute_command("sudo service supervisor start")
+def _restart_supervisor_deamon(node):
+    batch = RemoteBatch(node)
+    _create_supervisor_log_file(batch)
+    batch.execute("service supervisor stop")
+    batch.execute("service supervisor start")
+    batch.run()
 
 
 def _stop_supervisor_deamon(node):
     node.execute_command("sudo service supervisor stop")
 
 
-def _create_supervisor_log_file(node):
-    node.execute_command("sudo mkdir -p /var/log/storm")
-    node.execute_command("sudo chmod -R 777 /var/log/storm")
-    node.execute_command("sudo chown -R storm:storm /var/log/storm")
+def _create_supervisor_log_file(batch):
+    batch.execute("mkdir -p /var/log/storm")
+    batch.execute("chmod -R 777 /var/log/storm")
+    batch.execute("chown -R storm:storm /var/log/storm")
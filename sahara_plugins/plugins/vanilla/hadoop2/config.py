@@ -28,6 +28,8 @@ from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import oozie_helper as o_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import utils as u
 from sahara_plugins.plugins.vanilla import utils as vu
+from sahara_plugins.utils import threads
+from sahara_plugins.utils import topology
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -38,6 +40,10 @@ HIVE_CONF_DIR = '/opt/hive/conf'
 HADOOP_USER = 'hadoop'
 HADOOP_GROUP = 'hadoop'
 
+POST_CONF_SCRIPT = '/tmp/post_conf.sh'
+SPARK_CONF_SCRIPT = '/tmp/spark_conf.sh'
+CONFIGURE_POOL_SIZE = 16
+
 PORTS_MAP = {
     "namenode": [50070, 9000],
     "secondarynamenode": [50090],
@@ -76,9 +82,11 @@ def configure_zookeeper(cluster, instances=None):
 
 def _form_zk_servers_to_quorum(cluster, to_delete_instances=None):
     quorum = []
-    instances = map(vu.get_instance_hostname, vu.get_zk_servers(cluster))
+    instances = [vu.get_instance_hostname(instance)
+                 for instance in vu.get_zk_servers(cluster)]
     if to_delete_instances:
-        delete_instances = map(vu.get_instance_hostname, to_delete_instances)
+        delete_instances = [vu.get_instance_hostname(instance)
+                            for instance in to_delete_instances]
         reserve_instances = list(set(instances) - set(delete_instances))
         # keep the original order of instances
         reserve_instances.sort(key=instances.index)
@@ -95,12 +103,19 @@ def _push_zk_configs_to_nodes(cluster, zk_conf, to_delete_instances=None):
         for instance in to_delete_instances:
             if instance in instances:
                 instances.remove(instance)
-    for index, instance in enumerate(instances):
-        with instance.remote() as r:
-            r.write_file_to('/opt/zookeeper/conf/zoo.cfg', zk_conf,
-                            run_as_root=True)
-            r.execute_command(
-                'sudo su - -c "echo %s > /var/zookeeper/myid" hadoop' % index)
+
+    with threads.BoundedThreadGroup(CONFIGURE_POOL_SIZE) as tg:
+        for index, instance in enumerate(instances):
+            tg.spawn('vanilla-configure-zk-%s' % instance.instance_name,
+                     _push_zk_configs_to_node, instance, zk_conf, index)
+
+
+def _push_zk_configs_to_node(instance, zk_conf, index):
+    with instance.remote() as r:
+        r.write_file_to('/opt/zookeeper/conf/zoo.cfg', zk_conf,
+                        run_as_root=True)
+        r.execute_command(
+            'sudo su - -c "echo %s > /var/zookeeper/myid" hadoop' % index)
 
 
 def configure_spark(cluster):
@@ -113,14 +128,14 @@ def configure_spark(cluster):
 def _push_spark_configs_to_node(cluster, extra):
     spark_master = vu.get_spark_history_server(cluster)
     if spark_master:
-        _push_spark_configs_to_existing_node(spark_master, cluster, extra)
-        _push_cleanup_job(spark_master, extra)
+        files = _get_spark_files(cluster, extra)
+        files[SPARK_CONF_SCRIPT] = _get_spark_conf_script(extra)
         with spark_master.remote() as r:
-            r.execute_command('sudo su - -c "mkdir /tmp/spark-events" hadoop')
+            r.write_files_to(files, run_as_root=True)
+            r.execute_command('sudo bash %s' % SPARK_CONF_SCRIPT)
 
 
-def _push_spark_configs_to_existing_node(spark_master, cluster, extra):
-
+def _get_spark_files(cluster, extra):
     sp_home = c_helper.get_spark_home(cluster)
     files = {
         os.path.join(sp_home,
@@ -128,24 +143,23 @@ def _push_spark_configs_to_existing_node(spark_master, cluster, extra):
         os.path.join(
             sp_home,
             'conf/spark-defaults.conf'): extra['sp_defaults']
-        }
+    }
 
-    with spark_master.remote() as r:
-        r.write_files_to(files, run_as_root=True)
+    if extra['job_cleanup']['valid']:
+        files['/opt/hadoop/tmp-cleanup.sh'] = extra['job_cleanup']['script']
+        files['/etc/cron.d/spark-cleanup'] = (
+            extra['job_cleanup']['cron'] + '\n')
+    return files
 
 
-def _push_cleanup_job(sp_master, extra):
-    with sp_master.remote() as r:
-        if extra['job_cleanup']['valid']:
-            r.write_file_to('/opt/hadoop/tmp-cleanup.sh',
-                            extra['job_cleanup']['script'],
-                            run_as_root=True)
-            r.execute_command("sudo chmod 755 /opt/hadoop/tmp-cleanup.sh")
-            cmd = 'sudo sh -c \'echo "%s" > /etc/cron.d/spark-cleanup\''
-            r.execute_command(cmd % extra['job_cleanup']['cron'])
-        else:
-            r.execute_command("sudo rm -f /opt/hadoop/tmp-cleanup.sh")
-            r.execute_command("sudo rm -f /etc/cron.d/spark-cleanup")
+def _get_spark_conf_script(extra):
+    if extra['job_cleanup']['valid']:
+        script = ['chmod 755 /opt/hadoop/tmp-cleanup.sh']
+    else:
+        script = ['rm -f /opt/hadoop/tmp-cleanup.sh',
+                  'rm -f /etc/cron.d/spark-cleanup']
+    script.append('su - -c "mkdir -p /tmp/spark-events" %s' % HADOOP_USER)
+    return '\n'.join(script) + '\n'
 
 
 def _extract_spark_configs_to_extra(cluster):
@@ -175,44 +189,83 @@ def configure_instances(pctx, instances):
     utils.add_provisioning_step(
         instances[0].cluster_id, _("Configure instances"), len(instances))
 
-    for instance in instances:
-        with context.set_current_instance_id(instance.instance_id):
-            _configure_instance(pctx, instance)
+    # computed once, before the instances are configured concurrently,
+    # so that all of them share the same secrets
+    cluster_confs = _get_cluster_configs(pctx, instances[0].cluster)
+
+    with threads.BoundedThreadGroup(CONFIGURE_POOL_SIZE) as tg:
+        for instance in instances:
+            with context.set_current_instance_id(instance.instance_id):
+                tg.spawn('vanilla-configure-%s' % instance.instance_name,
+                         _configure_instance, pctx, cluster_confs, instance)
 
 
 @utils.event_wrapper(True)
-def _configure_instance(pctx, instance):
-    _provisioning_configs(pctx, instance)
-    _post_configuration(pctx, instance)
+def _configure_instance(pctx, cluster_confs, instance):
+    xmls, env = _generate_configs(pctx, cluster_confs, instance)
+    files = _get_xml_files(xmls)
+    files[POST_CONF_SCRIPT] = _get_post_conf_script(
+        cluster_confs, instance, env)
+    if cluster_confs['data_locality']:
+        files[HADOOP_CONF_DIR + '/topology.sh'] = utils.get_file_text(
+            'plugins/vanilla/hadoop2/resources/topology.sh',
+            'sahara_plugins')
 
+    LOG.debug("Push configs to instance {instance}".format(
+        instance=instance.instance_name))
+    with instance.remote() as r:
+        r.write_files_to(files, run_as_root=True)
+        r.execute_command('sudo bash %s' % POST_CONF_SCRIPT)
 
-def _provisioning_configs(pctx, instance):
-    xmls, env = _generate_configs(pctx, instance)
-    _push_xml_configs(instance, xmls)
-    _push_env_configs(instance, env)
+
+def _get_cluster_configs(pctx, cluster):
+    """Collects the configs which are the same for many instances.
+
+    Contains the Hadoop configs shared by all instances and the user
+    configs of every node group.
+    """
+    data_locality = c_helper.is_data_locality_enabled(pctx, cluster)
+    user_confs = {}
+    for ng in cluster.node_groups:
+        user_confs[ng.id] = _get_user_configs(pctx, ng)
+
+    return {
+        'hadoop': _get_shared_hadoop_configs(pctx, cluster, data_locality),
+        'user': user_confs,
+        'data_locality': data_locality
+    }
 
 
-def _generate_configs(pctx, instance):
-    hadoop_xml_confs = _get_hadoop_configs(pctx, instance)
-    user_xml_confs, user_env_confs = _get_user_configs(
-        pctx, instance.node_group)
+def _generate_configs(pctx, cluster_confs, instance):
+    hadoop_xml_confs = _get_hadoop_configs(cluster_confs, instance)
+    user_xml_confs, user_env_confs = cluster_confs['user'][
+        instance.node_group.id]
     xml_confs = utils.merge_configs(user_xml_confs, hadoop_xml_confs)
     env_confs = utils.merge_configs(pctx['env_confs'], user_env_confs)
 
     return xml_confs, env_confs
 
 
-def _get_hadoop_configs(pctx, instance):
-    cluster = instance.node_group.cluster
-    nn_hostname = vu.get_instance_hostname(vu.get_namenode(cluster))
+def _get_hadoop_configs(cluster_confs, instance):
     dirs = _get_hadoop_dirs(instance)
+    confs = dict(cluster_confs['hadoop'])
+    confs['HDFS'] = dict(confs['HDFS'], **{
+        'dfs.namenode.name.dir': ','.join(dirs['hadoop_name_dirs']),
+        'dfs.datanode.data.dir': ','.join(dirs['hadoop_data_dirs'])
+    })
+
+    return confs
+
+
+def _get_shared_hadoop_configs(pctx, cluster, data_locality):
+    swift_enabled = c_helper.is_swift_enabled(pctx, cluster)
+    mysql_enabled = c_helper.is_mysql_enabled(pctx, cluster)
+    nn_hostname = vu.get_instance_hostname(vu.get_namenode(cluster))
     confs = {
         'Hadoop': {
             'fs.defaultFS': 'hdfs://%s:9000' % nn_hostname
         },
         'HDFS': {
-            'dfs.namenode.name.dir': ','.join(dirs['hadoop_name_dirs']),
-            'dfs.datanode.data.dir': ','.join(dirs['hadoop_data_dirs']),
             'dfs.hosts': '%s/dn-include' % HADOOP_CONF_DIR,
             'dfs.hosts.exclude': '%s/dn-exclude' % HADOOP_CONF_DIR
         }
@@ -245,19 +298,19 @@ def _get_hadoop_configs(pctx, instance):
         confs['Hadoop'].update(hadoop_cfg)
 
         oozie_cfg = o_helper.get_oozie_required_xml_configs(HADOOP_CONF_DIR)
-        if c_helper.is_mysql_enabled(pctx, cluster):
+        if mysql_enabled:
             oozie_cfg.update(o_helper.get_oozie_mysql_configs(cluster))
 
         confs['JobFlow'] = oozie_cfg
 
-    if c_helper.is_swift_enabled(pctx, cluster):
+    if swift_enabled:
         swift_configs = {}
         for config in swift.get_swift_configs():
             swift_configs[config['name']] = config['value']
 
         confs['Hadoop'].update(swift_configs)
 
-    if c_helper.is_data_locality_enabled(pctx, cluster):
+    if data_locality:
         confs['Hadoop'].update(th.TOPOLOGY_CONFIG)
         confs['Hadoop'].update({"topology.script.file.name":
                                 HADOOP_CONF_DIR + "/topology.sh"})
@@ -272,7 +325,7 @@ def _get_hadoop_configs(pctx, instance):
             'jdbc:derby:;databaseName=/opt/hive/metastore_db;create=true'
         }
 
-        if c_helper.is_mysql_enabled(pctx, cluster):
+        if mysql_enabled:
             hive_cfg.update({
                 'javax.jdo.option.ConnectionURL':
                 'jdbc:mysql://%s/metastore' % hive_hostname,
@@ -286,7 +339,7 @@ def _get_hadoop_configs(pctx, instance):
             })
 
         proxy_configs = cluster.cluster_configs.get('proxy_configs')
-        if proxy_configs and c_helper.is_swift_enabled(pctx, cluster):
+        if proxy_configs and swift_enabled:
             hive_cfg.update({
                 swift.HADOOP_SWIFT_USERNAME: proxy_configs['proxy_username'],
                 swift.HADOOP_SWIFT_PASSWORD: key_manager.get_secret(
@@ -336,42 +389,7 @@ def _generate_xml(configs):
     return xml_confs
 
 
-def _push_env_configs(instance, configs):
-    nn_heap = configs['HDFS']['NameNode Heap Size']
-    snn_heap = configs['HDFS']['SecondaryNameNode Heap Size']
-    dn_heap = configs['HDFS']['DataNode Heap Size']
-    rm_heap = configs['YARN']['ResourceManager Heap Size']
-    nm_heap = configs['YARN']['NodeManager Heap Size']
-    hs_heap = configs['MapReduce']['JobHistoryServer Heap Size']
-
-    with instance.remote() as r:
-        r.replace_remote_string(
-            '%s/hadoop-env.sh' % HADOOP_CONF_DIR,
-            'export HADOOP_NAMENODE_OPTS=.*',
-            'export HADOOP_NAMENODE_OPTS="-Xmx%dm"' % nn_heap)
-        r.replace_remote_string(
-            '%s/hadoop-env.sh' % HADOOP_CONF_DIR,
-            'export HADOOP_SECONDARYNAMENODE_OPTS=.*',
-            'export HADOOP_SECONDARYNAMENODE_OPTS="-Xmx%dm"' % snn_heap)
-        r.replace_remote_string(
-            '%s/hadoop-env.sh' % HADOOP_CONF_DIR,
-            'export HADOOP_DATANODE_OPTS=.*',
-            'export HADOOP_DATANODE_OPTS="-Xmx%dm"' % dn_heap)
-        r.replace_remote_string(
-            '%s/yarn-env.sh' % HADOOP_CONF_DIR,
-            '\\#export YARN_RESOURCEMANAGER_HEAPSIZE=.*',
-            'export YARN_RESOURCEMANAGER_HEAPSIZE=%d' % rm_heap)
-        r.replace_remote_string(
-            '%s/yarn-env.sh' % HADOOP_CONF_DIR,
-            '\\#export YARN_NODEMANAGER_HEAPSIZE=.*',
-            'export YARN_NODEMANAGER_HEAPSIZE=%d' % nm_heap)
-        r.replace_remote_string(
-            '%s/mapred-env.sh' % HADOOP_CONF_DIR,
-            'export HADOOP_JOB_HISTORYSERVER_HEAPSIZE=.*',
-            'export HADOOP_JOB_HISTORYSERVER_HEAPSIZE=%d' % hs_heap)
-
-
-def _push_xml_configs(instance, configs):
+def _get_xml_files(configs):
     xmls = _generate_xml(configs)
     service_to_conf_map = {
         'Hadoop': '%s/core-site.xml' % HADOOP_CONF_DIR,
@@ -388,18 +406,10 @@ def _push_xml_configs(instance, configs):
 
         xml_confs[service_to_conf_map[service]] = confs
 
-    _push_configs_to_instance(instance, xml_confs)
-
-
-def _push_configs_to_instance(instance, configs):
-    LOG.debug("Push configs to instance {instance}".format(
-        instance=instance.instance_name))
-    with instance.remote() as r:
-        for fl, data in six.iteritems(configs):
-            r.write_file_to(fl, data, run_as_root=True)
+    return xml_confs
 
 
-def _post_configuration(pctx, instance):
+def _get_post_conf_script(cluster_confs, instance, env_configs):
     dirs = _get_hadoop_dirs(instance)
     args = {
         'hadoop_user': HADOOP_USER,
@@ -410,25 +420,24 @@ def _post_configuration(pctx, instance):
         'hadoop_data_dirs': " ".join(dirs['hadoop_data_dirs']),
         'hadoop_log_dir': dirs['hadoop_log_dir'],
         'hadoop_secure_dn_log_dir': dirs['hadoop_secure_dn_log_dir'],
-        'yarn_log_dir': dirs['yarn_log_dir']
+        'yarn_log_dir': dirs['yarn_log_dir'],
+        'nn_heap': int(env_configs['HDFS']['NameNode Heap Size']),
+        'snn_heap': int(env_configs['HDFS']['SecondaryNameNode Heap Size']),
+        'dn_heap': int(env_configs['HDFS']['DataNode Heap Size']),
+        'rm_heap': int(env_configs['YARN']['ResourceManager Heap Size']),
+        'nm_heap': int(env_configs['YARN']['NodeManager Heap Size']),
+        'hs_heap': int(
+            env_configs['MapReduce']['JobHistoryServer Heap Size'])
     }
     post_conf_script = utils.get_file_text(
         'plugins/vanilla/hadoop2/resources/post_conf.template',
         'sahara_plugins')
     post_conf_script = post_conf_script.format(**args)
 
-    with instance.remote() as r:
-        r.write_file_to('/tmp/post_conf.sh', post_conf_script)
-        r.execute_command('chmod +x /tmp/post_conf.sh')
-        r.execute_command('sudo /tmp/post_conf.sh')
+    if cluster_confs['data_locality']:
+        post_conf_script += '\nchmod +x %s/topology.sh\n' % HADOOP_CONF_DIR
 
-        if c_helper.is_data_locality_enabled(pctx,
-                                             instance.cluster):
-            t_script = HADOOP_CONF_DIR + '/topology.sh'
-            r.write_file_to(t_script, utils.get_file_text(
-                'plugins/vanilla/hadoop2/resources/topology.sh',
-                'sahara_plugins'), run_as_root=True)
-            r.execute_command('chmod +x ' + t_script, run_as_root=True)
+    return post_conf_script
 
 
 def _get_hadoop_dirs(instance):
@@ -459,12 +468,15 @@ def configure_topology_data(pctx, cluster):
         LOG.warning("Node group awareness is not implemented in YARN yet "
                     "so enable_hypervisor_awareness set to False explicitly")
         tpl_map = th.generate_topology_map(cluster, is_node_awareness=False)
-        topology_data = "\n".join(
-            [k + " " + v for k, v in tpl_map.items()]) + "\n"
-        for ng in cluster.node_groups:
-            for i in ng.instances:
-                i.remote().write_file_to(HADOOP_CONF_DIR + "/topology.data",
-                                         topology_data, run_as_root=True)
+        topology_data = topology.render_topology_map(tpl_map)
+        topology.push_topology_data(cluster, utils.get_instances(cluster),
+                                    topology_data, _write_topology_data)
+
+
+def _write_topology_data(instance, topology_data):
+    with instance.remote() as r:
+        r.write_file_to(HADOOP_CONF_DIR + "/topology.data", topology_data,
+                        run_as_root=True)
 
 
 def get_open_ports(node_group):
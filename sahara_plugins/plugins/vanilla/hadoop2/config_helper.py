@@ -150,6 +150,21 @@ ZOOKEEPER_CONFS = {
 PRIORITY_1_CONFS += CLUSTER_WIDE_CONFS
 
 
+_XML_DEFAULTS = {}
+
+
+def load_xml_defaults(file_name):
+    """Returns configs of a Hadoop default XML file.
+
+    The file is parsed on the first call only, so that importing the plugin
+    does not parse the defaults of every supported Hadoop version.
+    """
+    if file_name not in _XML_DEFAULTS:
+        _XML_DEFAULTS[file_name] = utils.load_hadoop_xml_defaults(
+            file_name, plugins=True)
+    return _XML_DEFAULTS[file_name]
+
+
 def init_xml_configs(xml_confs):
     configs = []
     for service, config_lists in six.iteritems(xml_confs):
@@ -210,6 +225,14 @@ DATANODES_STARTUP_TIMEOUT = p.Config(
     description='Timeout for DataNodes startup, in seconds')
 
 
+DISTRIBUTE_HOST_LISTS = p.Config(
+    'Distribute host lists to all nodes', 'general', 'cluster',
+    config_type='bool', priority=2, default_value=False, is_optional=True,
+    description='Write the include and exclude host lists to every node of'
+                ' the cluster during scaling, not only to the NameNode,'
+                ' SecondaryNameNode and ResourceManager which read them')
+
+
 def init_env_configs(env_confs):
     configs = []
     for service, config_items in six.iteritems(env_confs):
@@ -224,7 +247,7 @@ def init_env_configs(env_confs):
 def _init_general_configs():
     configs = [ENABLE_SWIFT, ENABLE_MYSQL, DATANODES_STARTUP_TIMEOUT,
                DATANODES_DECOMMISSIONING_TIMEOUT,
-               NODEMANAGERS_DECOMMISSIONING_TIMEOUT]
+               NODEMANAGERS_DECOMMISSIONING_TIMEOUT, DISTRIBUTE_HOST_LISTS]
     if CONF.enable_data_locality:
         configs.append(ENABLE_DATA_LOCALITY)
     return configs
@@ -232,6 +255,14 @@ def _init_general_configs():
 PLUGIN_GENERAL_CONFIGS = _init_general_configs()
 
 
+def index_configs(configs):
+    """Returns configs indexed by their (applicable target, name)."""
+    index = {}
+    for c in configs:
+        index.setdefault((c.applicable_target, c.name), c)
+    return index
+
+
 def get_config_value(pctx, service, name, cluster=None):
     if cluster:
         for ng in cluster.node_groups:
@@ -239,9 +270,12 @@ def get_config_value(pctx, service, name, cluster=None):
             if cl_param is not None:
                 return cl_param
 
-    for c in pctx['all_confs']:
-        if c.applicable_target == service and c.name == name:
-            return c.default_value
+    index = pctx.get('confs_index')
+    if index is None:
+        index = index_configs(pctx['all_confs'])
+    c = index.get((service, name))
+    if c is not None:
+        return c.default_value
 
     raise ex.PluginNotFoundException(
         {"name": name, "service": service},
@@ -258,6 +292,11 @@ def is_mysql_enabled(pctx, cluster):
         pctx, ENABLE_MYSQL.applicable_target, ENABLE_MYSQL.name, cluster)
 
 
+def is_host_lists_distribution_enabled(pctx, cluster):
+    return get_config_value(pctx, DISTRIBUTE_HOST_LISTS.applicable_target,
+                            DISTRIBUTE_HOST_LISTS.name, cluster)
+
+
 def is_data_locality_enabled(pctx, cluster):
     if not CONF.enable_data_locality:
         return False
@@ -303,7 +342,7 @@ def generate_job_cleanup_config(cluster):
     if job_conf['valid']:
         job_conf['cron'] = utils.get_file_text(
             'plugins/vanilla/hadoop2/resources/spark-cleanup.cron',
-            'sahara_plugins'),
+            'sahara_plugins')
         job_cleanup_script = utils.get_file_text(
             'plugins/vanilla/hadoop2/resources/tmp-cleanup.sh.template',
             'sahara_plugins')
@@ -16,6 +16,7 @@
 import os
 
 from oslo_log import log as logging
+from oslo_utils import excutils
 
 from sahara.plugins import context
 from sahara.plugins import utils
@@ -25,9 +26,13 @@ from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import oozie_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import utils as u
 from sahara_plugins.plugins.vanilla import utils as vu
+from sahara_plugins.utils import hadoop_status
+from sahara_plugins.utils import threads
 
 LOG = logging.getLogger(__name__)
 
+START_POOL_SIZE = 16
+
 
 def start_dn_nm_processes(instances):
     filternames = ['datanode', 'nodemanager']
@@ -41,7 +46,7 @@ def start_dn_nm_processes(instances):
         utils.start_process_event_message("DataNodes, NodeManagers"),
         len(instances))
 
-    with context.PluginsThreadGroup() as tg:
+    with threads.BoundedThreadGroup(START_POOL_SIZE) as tg:
         for instance in instances:
             with context.set_current_instance_id(instance.instance_id):
                 processes = set(instance.node_group.node_processes)
@@ -53,10 +58,14 @@ def start_dn_nm_processes(instances):
 @utils.event_wrapper(True)
 def _start_processes(instance, processes):
     with instance.remote() as r:
-        if 'datanode' in processes:
+        if 'datanode' in processes and 'nodemanager' in processes:
+            r.execute_command(
+                'sudo su - -c "hadoop-daemon.sh start datanode && '
+                'yarn-daemon.sh start nodemanager" hadoop')
+        elif 'datanode' in processes:
             r.execute_command(
                 'sudo su - -c "hadoop-daemon.sh start datanode" hadoop')
-        if 'nodemanager' in processes:
+        elif 'nodemanager' in processes:
             r.execute_command(
                 'sudo su - -c  "yarn-daemon.sh start nodemanager" hadoop')
 
@@ -210,33 +219,26 @@ def _start_oozie(remote):
         'sudo su - -c "/opt/oozie/bin/oozied.sh start" hadoop')
 
 
-@utils.event_wrapper(
-    True, step=_("Await %s start up") % "DataNodes", param=('cluster', 0))
 def await_datanodes(cluster):
-    datanodes_count = len(vu.get_datanodes(cluster))
-    if datanodes_count < 1:
+    datanodes = vu.get_datanodes(cluster)
+    if len(datanodes) < 1:
         return
 
-    l_message = _("Waiting on %s datanodes to start up") % datanodes_count
-    with vu.get_namenode(cluster).remote() as r:
-        utils.plugin_option_poll(
-            cluster, _check_datanodes_count,
-            c_helper.DATANODES_STARTUP_TIMEOUT, l_message, 1, {
-                'remote': r, 'count': datanodes_count})
-
-
-def _check_datanodes_count(remote, count):
-    if count < 1:
-        return True
-
-    LOG.debug("Checking datanode count")
-    exit_code, stdout = remote.execute_command(
-        'sudo su -lc "hdfs dfsadmin -report" hadoop | '
-        'grep \'Live datanodes\|Datanodes available:\' | '
-        'grep -o \'[0-9]\+\' | head -n 1')
-    LOG.debug("Datanode count='{count}'".format(count=stdout.rstrip()))
+    utils.add_provisioning_step(
+        cluster.id, _("Await %s start up") % "DataNodes", len(datanodes))
+    tracker = hadoop_status.StartupTracker(
+        u.STATUS_PROVIDER, datanodes, utils.add_successful_event)
 
-    return exit_code == 0 and stdout and int(stdout) == count
+    l_message = _("Waiting on %s datanodes to start up") % len(datanodes)
+    with vu.get_namenode(cluster).remote() as r:
+        try:
+            utils.plugin_option_poll(
+                cluster, tracker.check, c_helper.DATANODES_STARTUP_TIMEOUT,
+                l_message, 1, {'remote': r})
+        except Exception as e:
+            with excutils.save_and_reraise_exception():
+                for instance in tracker.pending.values():
+                    utils.add_fail_event(instance, e)
 
 
 def _hive_create_warehouse_dir(remote):
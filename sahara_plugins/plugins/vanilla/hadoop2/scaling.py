@@ -21,6 +21,7 @@ from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import run_scripts as run
 from sahara_plugins.plugins.vanilla.hadoop2 import utils as pu
 from sahara_plugins.plugins.vanilla import utils as vu
+from sahara_plugins.utils import threads
 
 
 HADOOP_CONF_DIR = config.HADOOP_CONF_DIR
@@ -28,7 +29,7 @@ HADOOP_CONF_DIR = config.HADOOP_CONF_DIR
 
 def scale_cluster(pctx, cluster, instances):
     config.configure_instances(pctx, instances)
-    _update_include_files(cluster)
+    _update_include_files(pctx, cluster)
     run.refresh_hadoop_nodes(cluster)
     rm = vu.get_resourcemanager(cluster)
     if rm:
@@ -46,34 +47,52 @@ def _get_instances_with_service(instances, service):
             if service in instance.node_group.node_processes]
 
 
+def _get_host_lists_consumers(pctx, cluster):
+    if c_helper.is_host_lists_distribution_enabled(pctx, cluster):
+        return utils.get_instances(cluster)
+
+    consumers = [vu.get_namenode(cluster),
+                 vu.get_secondarynamenode(cluster),
+                 vu.get_resourcemanager(cluster)]
+    return [instance for instance in consumers if instance]
+
+
+def _write_host_lists(pctx, cluster, host_lists):
+    cmd = 'sudo su - -c "%s" hadoop' % '; '.join(
+        "echo '%s' > %s/%s" % (hosts, HADOOP_CONF_DIR, file_name)
+        for file_name, hosts in sorted(host_lists.items()))
+
+    with threads.BoundedThreadGroup(config.CONFIGURE_POOL_SIZE) as tg:
+        for instance in _get_host_lists_consumers(pctx, cluster):
+            tg.spawn('vanilla-write-host-lists-%s' % instance.instance_name,
+                     _execute_command, instance, cmd)
+
+
+def _execute_command(instance, cmd):
+    with instance.remote() as r:
+        r.execute_command(cmd)
+
+
 @utils.event_wrapper(
-    True, step=_("Update include files"), param=('cluster', 0))
-def _update_include_files(cluster, dec_instances=None):
+    True, step=_("Update include files"), param=('cluster', 1))
+def _update_include_files(pctx, cluster, dec_instances=None):
     dec_instances = dec_instances or []
     dec_instances_ids = [instance.id for instance in dec_instances]
 
-    instances = utils.get_instances(cluster)
-
     inst_filter = lambda inst: inst.id not in dec_instances_ids
 
     datanodes = filter(inst_filter, vu.get_datanodes(cluster))
     nodemanagers = filter(inst_filter, vu.get_nodemanagers(cluster))
     dn_hosts = utils.generate_fqdn_host_names(datanodes)
     nm_hosts = utils.generate_fqdn_host_names(nodemanagers)
-    for instance in instances:
-        with instance.remote() as r:
-            r.execute_command(
-                'sudo su - -c "echo \'%s\' > %s/dn-include" hadoop' % (
-                    dn_hosts, HADOOP_CONF_DIR))
-            r.execute_command(
-                'sudo su - -c "echo \'%s\' > %s/nm-include" hadoop' % (
-                    nm_hosts, HADOOP_CONF_DIR))
+    _write_host_lists(pctx, cluster, {'dn-include': dn_hosts,
+                                      'nm-include': nm_hosts})
 
 
 def decommission_nodes(pctx, cluster, instances):
     datanodes = _get_instances_with_service(instances, 'datanode')
     nodemanagers = _get_instances_with_service(instances, 'nodemanager')
-    _update_exclude_files(cluster, instances)
+    _update_exclude_files(pctx, cluster, instances)
 
     run.refresh_hadoop_nodes(cluster)
     rm = vu.get_resourcemanager(cluster)
@@ -83,8 +102,8 @@ def decommission_nodes(pctx, cluster, instances):
     _check_nodemanagers_decommission(cluster, nodemanagers)
     _check_datanodes_decommission(cluster, datanodes)
 
-    _update_include_files(cluster, instances)
-    _clear_exclude_files(cluster)
+    _update_include_files(pctx, cluster, instances)
+    _clear_exclude_files(pctx, cluster)
     run.refresh_hadoop_nodes(cluster)
 
     config.configure_topology_data(pctx, cluster)
@@ -93,34 +112,23 @@ def decommission_nodes(pctx, cluster, instances):
     run.refresh_zk_servers(cluster, instances)
 
 
-def _update_exclude_files(cluster, instances):
+def _update_exclude_files(pctx, cluster, instances):
     datanodes = _get_instances_with_service(instances, 'datanode')
     nodemanagers = _get_instances_with_service(instances, 'nodemanager')
     dn_hosts = utils.generate_fqdn_host_names(datanodes)
     nm_hosts = utils.generate_fqdn_host_names(nodemanagers)
-    for instance in utils.get_instances(cluster):
-        with instance.remote() as r:
-            r.execute_command(
-                'sudo su - -c "echo \'%s\' > %s/dn-exclude" hadoop' % (
-                    dn_hosts, HADOOP_CONF_DIR))
-            r.execute_command(
-                'sudo su - -c "echo \'%s\' > %s/nm-exclude" hadoop' % (
-                    nm_hosts, HADOOP_CONF_DIR))
+    _write_host_lists(pctx, cluster, {'dn-exclude': dn_hosts,
+                                      'nm-exclude': nm_hosts})
 
 
-def _clear_exclude_files(cluster):
-    for instance in utils.get_instances(cluster):
-        with instance.remote() as r:
-            r.execute_command(
-                'sudo su - -c "echo > %s/dn-exclude" hadoop' % HADOOP_CONF_DIR)
-            r.execute_command(
-                'sudo su - -c "echo > %s/nm-exclude" hadoop' % HADOOP_CONF_DIR)
+def _clear_exclude_files(pctx, cluster):
+    _write_host_lists(pctx, cluster, {'dn-exclude': '', 'nm-exclude': ''})
 
 
 def is_decommissioned(cluster, check_func, instances):
     statuses = check_func(cluster)
     for instance in instances:
-        if statuses[instance.fqdn()] != 'decommissioned':
+        if statuses.get(instance.fqdn()) != 'decommissioned':
             return False
     return True
 
@@ -13,54 +13,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import re
-
 from oslo_log import log as logging
 
 from sahara.plugins import castellan_utils as castellan
 from sahara.plugins import conductor
 from sahara.plugins import context
 from sahara_plugins.plugins.vanilla import utils as u
+from sahara_plugins.utils import hadoop_status
 
 
 LOG = logging.getLogger(__name__)
 
+STATUS_PROVIDER = hadoop_status.StatusProvider(
+    hadoop_status.RestStatusSource(),
+    hadoop_status.CliStatusSource('sudo su - -c "%s" hadoop'))
 
-def get_datanodes_status(cluster):
-    statuses = {}
-    namenode = u.get_namenode(cluster)
-    status_regexp = r'^Hostname: (.*)\nDecommission Status : (.*)$'
-    matcher = re.compile(status_regexp, re.MULTILINE)
-    dfs_report = namenode.remote().execute_command(
-        'sudo su - -c "hdfs dfsadmin -report" hadoop')[1]
-
-    for host, status in matcher.findall(dfs_report):
-        statuses[host] = status.lower()
 
-    return statuses
+def get_datanodes_status(cluster):
+    with u.get_namenode(cluster).remote() as r:
+        return STATUS_PROVIDER.get_datanodes_status(r)
 
 
 def get_nodemanagers_status(cluster):
-    statuses = {}
-    resourcemanager = u.get_resourcemanager(cluster)
-    status_regexp = r'^(\S+):\d+\s+(\w+)'
-    matcher = re.compile(status_regexp, re.MULTILINE)
-    yarn_report = resourcemanager.remote().execute_command(
-        'sudo su - -c "yarn node -all -list" hadoop')[1]
-
-    for host, status in matcher.findall(yarn_report):
-        statuses[host] = status.lower()
+    with u.get_resourcemanager(cluster).remote() as r:
+        return STATUS_PROVIDER.get_nodemanagers_status(r)
 
-    return statuses
 
+def _get_secret(cluster, key):
+    """Returns the secret stored under the key of the cluster extra.
 
-def get_oozie_password(cluster):
+    The secret is generated on first use. Callers configuring many
+    instances resolve it once per operation, see
+    config._get_cluster_configs.
+    """
     cluster = conductor.cluster_get(context.ctx(), cluster)
     extra = cluster.extra.to_dict()
-    if 'oozie_pass_id' not in extra:
-        extra['oozie_pass_id'] = u.generate_random_password()
+    if key not in extra:
+        extra[key] = u.generate_random_password()
         conductor.cluster_update(context.ctx(), cluster, {'extra': extra})
-    return castellan.get_secret(extra['oozie_pass_id'])
+    return castellan.get_secret(extra[key])
+
+
+def get_oozie_password(cluster):
+    return _get_secret(cluster, 'oozie_pass_id')
 
 
 def delete_oozie_password(cluster):
@@ -72,12 +67,7 @@ def delete_oozie_password(cluster):
 
 
 def get_hive_password(cluster):
-    cluster = conductor.cluster_get(context.ctx(), cluster)
-    extra = cluster.extra.to_dict()
-    if 'hive_pass_id' not in extra:
-        extra['hive_pass_id'] = u.generate_random_password()
-        conductor.cluster_update(context.ctx(), cluster, {'extra': extra})
-    return castellan.get_secret(extra['hive_pass_id'])
+    return _get_secret(cluster, 'hive_pass_id')
 
 
 def delete_hive_password(cluster):
@@ -19,30 +19,11 @@ from oslo_config import cfg
 import six
 
 from sahara.plugins import provisioning as p
-from sahara.plugins import utils
 from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 
 CONF = cfg.CONF
 CONF.import_opt("enable_data_locality", "sahara.topology.topology_helper")
 
-CORE_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/core-default.xml', plugins=True)
-
-HDFS_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/hdfs-default.xml', plugins=True)
-
-MAPRED_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/mapred-default.xml', plugins=True)
-
-YARN_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/yarn-default.xml', plugins=True)
-
-OOZIE_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/oozie-default.xml', plugins=True)
-
-HIVE_DEFAULT = utils.load_hadoop_xml_defaults(
-    'plugins/vanilla/v2_7_1/resources/hive-default.xml', plugins=True)
-
 _default_executor_classpath = ":".join(
     ['/opt/hadoop/share/hadoop/tools/lib/hadoop-openstack-2.7.1.jar'])
 
@@ -59,13 +40,13 @@ SPARK_CONFS['Spark']['OPTIONS'].append(
     }
 )
 
-XML_CONFS = {
-    "Hadoop": [CORE_DEFAULT],
-    "HDFS": [HDFS_DEFAULT],
-    "YARN": [YARN_DEFAULT],
-    "MapReduce": [MAPRED_DEFAULT],
-    "JobFlow": [OOZIE_DEFAULT],
-    "Hive": [HIVE_DEFAULT]
+XML_DEFAULTS = {
+    "Hadoop": 'plugins/vanilla/v2_7_1/resources/core-default.xml',
+    "HDFS": 'plugins/vanilla/v2_7_1/resources/hdfs-default.xml',
+    "YARN": 'plugins/vanilla/v2_7_1/resources/yarn-default.xml',
+    "MapReduce": 'plugins/vanilla/v2_7_1/resources/mapred-default.xml',
+    "JobFlow": 'plugins/vanilla/v2_7_1/resources/oozie-default.xml',
+    "Hive": 'plugins/vanilla/v2_7_1/resources/hive-default.xml'
 }
 
 ENV_CONFS = {
@@ -87,13 +68,24 @@ ENV_CONFS = {
 }
 
 # Initialise plugin Hadoop configurations
-PLUGIN_XML_CONFIGS = c_helper.init_xml_configs(XML_CONFS)
 PLUGIN_ENV_CONFIGS = c_helper.init_env_configs(ENV_CONFS)
 
+# Hadoop XML configurations are loaded on first use
+_CONFIGS = {}
+
+
+def get_xml_defaults(service):
+    return c_helper.load_xml_defaults(XML_DEFAULTS[service])
+
+
+def _init_xml_configs():
+    return c_helper.init_xml_configs(
+        {service: [get_xml_defaults(service)] for service in XML_DEFAULTS})
+
 
 def _init_all_configs():
     configs = []
-    configs.extend(PLUGIN_XML_CONFIGS)
+    configs.extend(get_xml_configs())
     configs.extend(PLUGIN_ENV_CONFIGS)
     configs.extend(c_helper.PLUGIN_GENERAL_CONFIGS)
     configs.extend(_get_spark_configs())
@@ -136,15 +128,22 @@ def _get_zookeeper_configs():
     return zk_configs
 
 
-PLUGIN_CONFIGS = _init_all_configs()
+def get_plugin_configs():
+    if 'all' not in _CONFIGS:
+        _CONFIGS['all'] = _init_all_configs()
+    return _CONFIGS['all']
 
 
-def get_plugin_configs():
-    return PLUGIN_CONFIGS
+def get_plugin_configs_index():
+    if 'index' not in _CONFIGS:
+        _CONFIGS['index'] = c_helper.index_configs(get_plugin_configs())
+    return _CONFIGS['index']
 
 
 def get_xml_configs():
-    return PLUGIN_XML_CONFIGS
+    if 'xml' not in _CONFIGS:
+        _CONFIGS['xml'] = _init_xml_configs()
+    return _CONFIGS['xml']
 
 
 def get_env_configs():
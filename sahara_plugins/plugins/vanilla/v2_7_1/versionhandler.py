@@ -38,10 +38,22 @@ CONF = cfg.CONF
 
 class VersionHandler(avm.AbstractVersionHandler):
     def __init__(self):
-        self.pctx = {
-            'env_confs': c_helper.get_env_configs(),
-            'all_confs': c_helper.get_plugin_configs()
-        }
+        self._pctx = None
+
+    @property
+    def pctx(self):
+        # configs are built on first use, not when the plugin is loaded
+        if self._pctx is None:
+            self._pctx = {
+                'env_confs': c_helper.get_env_configs(),
+                'all_confs': c_helper.get_plugin_configs(),
+                'confs_index': c_helper.get_plugin_configs_index()
+            }
+        return self._pctx
+
+    @pctx.setter
+    def pctx(self, value):
+        self._pctx = value
 
     def get_plugin_configs(self):
         return self.pctx['all_confs']
@@ -0,0 +1,48 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from sahara.plugins import context
+import sahara_plugins.plugins.mapr.util.general as g
+from sahara_plugins.tests.unit import base as b
+
+
+class TestCopyFileToInstances(b.SaharaTestCase):
+    @mock.patch('sahara.plugins.objects.is_object_instancedt',
+                return_value=False, create=True)
+    @mock.patch.object(g, 'FAN_OUT_POOL_SIZE', 2)
+    def test_bounded_fan_out(self, is_object_instance):
+        source = mock.MagicMock()
+        sr = source.remote.return_value.__enter__.return_value
+        sr.read_file_from.return_value = 'data'
+        running = []
+        peaks = []
+
+        def _write_file_to(path, data, run_as_root=False):
+            running.append(path)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(path)
+
+        targets = [mock.MagicMock(id=i) for i in range(5)]
+        for target in targets:
+            target.remote.return_value.__enter__.return_value.\
+                write_file_to.side_effect = _write_file_to
+
+        g.copy_file_to_instances('/src', source, '/dst', targets)
+
+        sr.read_file_from.assert_called_once_with('/src', run_as_root=False)
+        self.assertEqual(5, len(peaks))
+        self.assertEqual(2, max(peaks))
@@ -0,0 +1,147 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo_serialization import jsonutils as json
+import testtools
+
+from sahara.plugins import health_check_base
+import sahara_plugins.plugins.mapr.base.base_health_checker as hc
+from sahara_plugins.plugins.mapr.domain import node_process as np
+from sahara_plugins.plugins.mapr.services.maprfs import maprfs
+from sahara_plugins.plugins.mapr.services.yarn import yarn
+from sahara_plugins.tests.unit import base as b
+
+
+NODE_LIST = {
+    'status': 'OK',
+    'data': [
+        {'ip': '10.0.0.1', 'service': 'cldb,fileserver,resourcemanager'},
+        {'ip': '10.0.0.2,172.16.0.2', 'service': 'fileserver'},
+    ]
+}
+
+
+def _get_instance(ip, remote=None):
+    instance = mock.Mock(internal_ip=ip, id=ip)
+    instance.remote.return_value.__enter__ = mock.Mock(return_value=remote)
+    instance.remote.return_value.__exit__ = mock.Mock(return_value=False)
+    return instance
+
+
+class TestServicesStatusProvider(b.SaharaTestCase):
+    def setUp(self):
+        super(TestServicesStatusProvider, self).setUp()
+        self.remote = mock.Mock()
+        self.remote.execute_command.return_value = (0, json.dumps(NODE_LIST))
+        self.cldb = _get_instance('10.0.0.1', self.remote)
+        self.node = _get_instance('172.16.0.2')
+        self.context = mock.Mock()
+        self.context.get_instance.return_value = self.cldb
+
+    def test_get_node_services(self):
+        services = np.get_node_services(self.remote)
+        self.assertEqual({'cldb', 'fileserver', 'resourcemanager'},
+                         services['10.0.0.1'])
+        self.assertEqual({'fileserver'}, services['10.0.0.2'])
+        self.assertEqual({'fileserver'}, services['172.16.0.2'])
+
+    def _patch_status(self, states):
+        patcher = mock.patch.object(
+            np.NodeProcess, 'status', autospec=True,
+            side_effect=lambda process, i: states[i.internal_ip])
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_statuses_collected_once(self):
+        status = self._patch_status({'10.0.0.1': np.Status.STAND_BY,
+                                     '172.16.0.2': np.Status.RUNNING})
+        provider = hc.ServicesStatusProvider(self.context)
+        self.assertEqual(
+            {'10.0.0.1': np.Status.STAND_BY, '172.16.0.2': np.Status.STOPPED},
+            provider.get_statuses(yarn.RESOURCE_MANAGER,
+                                  [self.cldb, self.node]))
+        self.assertEqual(
+            {'172.16.0.2': np.Status.RUNNING},
+            provider.get_statuses(maprfs.FILE_SERVER, [self.node]))
+        self.context.get_instance.assert_called_once_with(maprfs.CLDB)
+        self.assertEqual(1, self.remote.execute_command.call_count)
+        # only the nodes listing the service are asked for its state
+        self.assertEqual(
+            [mock.call(yarn.RESOURCE_MANAGER, self.cldb),
+             mock.call(maprfs.FILE_SERVER, self.node)],
+            status.call_args_list)
+
+    def test_node_process_check(self):
+        self._patch_status({'10.0.0.1': np.Status.RUNNING,
+                            '172.16.0.2': np.Status.RUNNING})
+        provider = hc.ServicesStatusProvider(self.context)
+        self.context.get_instances.return_value = [self.cldb, self.node]
+        check = hc.MapRNodeProcessCheck(
+            mock.Mock(), self.context, yarn.RESOURCE_MANAGER, provider)
+        with testtools.ExpectedException(
+                health_check_base.YellowHealthError):
+            check.check_health()
+
+        check = hc.MapRNodeProcessCheck(
+            mock.Mock(), self.context, maprfs.FILE_SERVER, provider)
+        self.assertEqual('FileServer is in running state',
+                         check.check_health())
+        self.assertEqual(1, self.remote.execute_command.call_count)
+
+    def test_node_process_check_standby(self):
+        self._patch_status({'10.0.0.1': np.Status.STAND_BY})
+        provider = hc.ServicesStatusProvider(self.context)
+        self.context.get_instances.return_value = [self.cldb]
+        check = hc.MapRNodeProcessCheck(
+            mock.Mock(), self.context, yarn.RESOURCE_MANAGER, provider)
+        with testtools.ExpectedException(health_check_base.RedHealthError):
+            check.check_health()
+
+    def test_cldb_unavailable(self):
+        self.remote.execute_command.side_effect = Exception('no route')
+        provider = hc.ServicesStatusProvider(self.context)
+        with testtools.ExpectedException(health_check_base.RedHealthError):
+            provider.get_statuses(maprfs.CLDB, [self.cldb])
+        with testtools.ExpectedException(health_check_base.RedHealthError):
+            provider.get_statuses(maprfs.FILE_SERVER, [self.node])
+        self.assertEqual(1, self.remote.execute_command.call_count)
+
+    def test_zookeepers_status(self):
+        self.remote.execute_command.return_value = (
+            0, 'zookeeper running as process 1234')
+        self.node.remote.return_value.__enter__.return_value = mock.Mock(
+            **{'execute_command.return_value': (3, 'inactive (dead)')})
+        self.context.get_instances.return_value = [self.cldb, self.node]
+        provider = hc.ServicesStatusProvider(self.context)
+        self.assertEqual({'10.0.0.1': True, '172.16.0.2': False},
+                         provider.get_zookeepers_status())
+        provider.get_zookeepers_status()
+        self.assertEqual(1, self.remote.execute_command.call_count)
+
+    def test_zookeepers_unavailable(self):
+        self.remote.execute_command.return_value = (
+            0, 'zookeeper running as process 1234')
+        node_remote = mock.Mock()
+        node_remote.execute_command.side_effect = Exception('no route')
+        self.node.remote.return_value.__enter__.return_value = node_remote
+        self.context.get_instances.return_value = [self.cldb, self.node]
+        provider = hc.ServicesStatusProvider(self.context)
+        check = hc.ZookeeperCheck(mock.Mock(), self.context, provider)
+        # no partial result is kept, every check reports the failure
+        for i in range(2):
+            with testtools.ExpectedException(
+                    health_check_base.RedHealthError, ".*no route.*"):
+                check.check_health()
+        self.assertEqual(1, node_remote.execute_command.call_count)
@@ -0,0 +1,133 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from sahara.plugins import exceptions as ex
+from sahara_plugins.plugins.mapr.services.mysql import mysql
+from sahara_plugins.tests.unit import base as b
+
+
+class TestMySQL(b.SaharaTestCase):
+    def setUp(self):
+        super(TestMySQL, self).setUp()
+        self.db_instance = mock.MagicMock()
+        self.remote = (self.db_instance.remote.return_value.
+                       __enter__.return_value)
+        self.instances = [mock.Mock(internal_ip='10.0.0.%d' % i)
+                          for i in range(2)]
+
+    def _step_marks(self, count):
+        return '\n'.join('%s %d' % (mysql.MySQL.SQL_STEP_MARK, index)
+                         for index in range(count))
+
+    def test_get_databases_state(self):
+        self.remote.execute_command.return_value = (
+            0, 'metrics\nmysql\nmaprmetrics\tlocalhost\n'
+               'maprmetrics\t10.0.0.0\nmaprhue\t127.0.0.1\n')
+
+        databases, user_hosts = mysql.MySQL.get_databases_state(
+            self.db_instance, ['maprmetrics', 'maprhue'])
+
+        self.assertEqual(['metrics', 'mysql'], databases)
+        self.assertEqual({'maprmetrics': ['localhost', '10.0.0.0'],
+                          'maprhue': ['127.0.0.1']}, user_hosts)
+        self.assertEqual(1, self.remote.execute_command.call_count)
+        self.assertIn("User IN ('maprmetrics', 'maprhue')",
+                      self.remote.execute_command.call_args[0][0])
+
+    def test_build_database_plan(self):
+        specs = [mysql.MySQL.METRICS_SPECS, mysql.MySQL.HUE_SPECS]
+        statements = mysql.MySQL.build_database_plan(
+            specs, ['metrics'],
+            {'maprmetrics': ['localhost', '127.0.0.1', '10.0.0.0']},
+            self.instances)
+
+        self.assertEqual([
+            "CREATE USER maprmetrics@'10.0.0.1' IDENTIFIED BY 'mapr'",
+            "GRANT ALL PRIVILEGES ON metrics.* TO maprmetrics@'10.0.0.1' "
+            "WITH GRANT OPTION",
+            'CREATE DATABASE IF NOT EXISTS hue',
+        ], statements[:3])
+        self.assertEqual(
+            ['localhost', '127.0.0.1', '10.0.0.0', '10.0.0.1'],
+            [st.split("'")[1] for st in statements
+             if st.startswith('CREATE USER maprhue')])
+        self.assertEqual(['FLUSH PRIVILEGES', 'FLUSH HOSTS'],
+                         statements[-2:])
+
+    def test_build_database_plan_up_to_date(self):
+        self.assertEqual([], mysql.MySQL.build_database_plan(
+            [mysql.MySQL.HUE_SPECS], ['hue'],
+            {'maprhue': ['10.0.0.0', '10.0.0.1']}, self.instances))
+
+    def test_build_database_plan_metrics_setup(self):
+        statements = mysql.MySQL.build_database_plan(
+            [mysql.MySQL.METRICS_SPECS], [], {}, [])
+        self.assertEqual(['CREATE DATABASE IF NOT EXISTS metrics',
+                          'SOURCE /opt/mapr/bin/setup.sql'], statements[:2])
+
+    def test_apply_database_plan(self):
+        statements = ['CREATE DATABASE IF NOT EXISTS hue', 'FLUSH HOSTS']
+        self.remote.execute_command.return_value = (
+            0, self._step_marks(3))
+
+        self.assertEqual(
+            [(statement, True) for statement in statements],
+            mysql.MySQL.apply_database_plan(self.db_instance, statements))
+
+        script = self.remote.write_file_to.call_args[0][1]
+        self.assertEqual(
+            "SELECT 'sahara-sql-step 0';\n"
+            "CREATE DATABASE IF NOT EXISTS hue;\n"
+            "SELECT 'sahara-sql-step 1';\n"
+            "FLUSH HOSTS;\n"
+            "SELECT 'sahara-sql-step 2';\n", script)
+        self.remote.execute_command.assert_called_once_with(
+            'mysql -uroot --skip-column-names < %s' %
+            mysql.MySQL.PLAN_SCRIPT, run_as_root=True,
+            raise_when_error=False)
+
+    def test_apply_database_plan_failure(self):
+        statements = ['CREATE DATABASE IF NOT EXISTS hue',
+                      "CREATE USER maprhue@'localhost' IDENTIFIED BY 'mapr'",
+                      'FLUSH HOSTS']
+        self.remote.execute_command.return_value = (1, self._step_marks(2))
+
+        e = self.assertRaises(ex.PluginRemoteCommandException,
+                              mysql.MySQL.apply_database_plan,
+                              self.db_instance, statements)
+        self.assertIn(statements[1], str(e))
+
+    def test_apply_empty_plan(self):
+        self.assertEqual(
+            [], mysql.MySQL.apply_database_plan(self.db_instance, []))
+        self.db_instance.remote.assert_not_called()
+
+    @mock.patch.object(mysql.MySQL, 'apply_database_plan')
+    @mock.patch.object(mysql.MySQL, 'get_databases_state',
+                       return_value=(['metrics', 'hue', 'rdbms', 'oozie'],
+                                     {}))
+    def test_create_databases(self, get_databases_state,
+                              apply_database_plan):
+        cluster_context = mock.Mock()
+        cluster_context.get_instance.return_value = None
+
+        mysql.MySQL.create_databases(cluster_context, self.instances[:1])
+
+        get_databases_state.assert_called_once_with(
+            cluster_context.oozie_server,
+            ['maprmetrics', 'maprhue', 'maprrdbms', 'maproozie'])
+        statements = apply_database_plan.call_args[0][1]
+        self.assertEqual(10, len(statements))
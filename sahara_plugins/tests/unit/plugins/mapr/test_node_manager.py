@@ -0,0 +1,96 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo_serialization import jsonutils as json
+import testtools
+
+import sahara.plugins.exceptions as ex
+import sahara_plugins.plugins.mapr.base.base_node_manager as nm
+from sahara_plugins.tests.unit import base as b
+
+
+NODE_LIST = {
+    'status': 'OK',
+    'data': [
+        {'id': 1001, 'ip': '10.0.0.1'},
+        {'id': 1002, 'ip': '10.0.0.2,172.16.0.2'},
+        {'id': 1003, 'ip': '10.0.0.3'},
+    ]
+}
+
+
+def _get_instance(ip, remote=None):
+    instance = mock.Mock(internal_ip=ip)
+    instance.fqdn.return_value = 'node-%s.novalocal' % ip
+    instance.remote.return_value.__enter__ = mock.Mock(return_value=remote)
+    instance.remote.return_value.__exit__ = mock.Mock(return_value=False)
+    return instance
+
+
+class TestBaseNodeManager(b.SaharaTestCase):
+    def setUp(self):
+        super(TestBaseNodeManager, self).setUp()
+        self.manager = nm.BaseNodeManager()
+        self.remote = mock.Mock()
+        self.remote.execute_command.return_value = (0, json.dumps(NODE_LIST))
+        self.cldb = _get_instance('10.0.0.1', self.remote)
+        self.instances = [_get_instance('172.16.0.2'),
+                          _get_instance('10.0.0.3')]
+        self.context = mock.Mock()
+        self.context.get_instances.return_value = [self.cldb] + self.instances
+        self.context.filter_instances.return_value = [self.cldb]
+        self.context.get_instance.return_value = self.cldb
+        self.context.get_zookeeper_nodes_ip_with_port.return_value = (
+            '10.0.0.1:5181')
+
+    def test_move_nodes(self):
+        self.manager.move_nodes(self.context, self.instances)
+        self.assertEqual([
+            mock.call(nm.NODE_IDS_CMD, run_as_root=True),
+            mock.call('maprcli node move -serverids 1002,1003'
+                      ' -topology /decommissioned', run_as_root=True),
+        ], self.remote.execute_command.call_args_list)
+
+    def test_move_unknown_nodes(self):
+        instances = self.instances + [_get_instance('10.0.0.4')]
+        with testtools.ExpectedException(ex.HadoopProvisionError,
+                                         '.*10.0.0.4.*'):
+            self.manager.move_nodes(self.context, instances)
+
+    def test_remove_nodes(self):
+        self.manager.remove_nodes(self.context, self.instances)
+        self.remote.execute_command.assert_called_once_with(
+            'maprcli node remove'
+            ' -nodes "node-172.16.0.2.novalocal node-10.0.0.3.novalocal"'
+            ' -zkconnect 10.0.0.1:5181', run_as_root=True)
+
+    @mock.patch('sahara.plugins.context.sleep')
+    def test_await_cldb(self, sleep):
+        self.remote.execute_command.side_effect = [
+            (1, 'CLDB is not running'),
+            (0, json.dumps({'status': 'OK', 'data': NODE_LIST['data'][:1]})),
+            (0, json.dumps(NODE_LIST)),
+        ]
+        self.manager._await_cldb(self.context)
+        self.assertEqual(3, self.remote.execute_command.call_count)
+        self.assertEqual([mock.call(1), mock.call(2)], sleep.call_args_list)
+
+    @mock.patch('sahara.plugins.context.sleep')
+    def test_await_cldb_missing_node(self, sleep):
+        self.remote.execute_command.return_value = (
+            0, json.dumps({'status': 'OK', 'data': NODE_LIST['data'][:2]}))
+        with testtools.ExpectedException(ex.HadoopProvisionError,
+                                         '.*10.0.0.3.*'):
+            self.manager._await_cldb(self.context, timeout=0)
@@ -0,0 +1,90 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from sahara_plugins.plugins.mapr.domain import node_process as np
+from sahara_plugins.tests.unit import base as b
+
+
+def _get_instance(ip, remote=None):
+    instance = mock.Mock(internal_ip=ip, instance_name='instance-%s' % ip)
+    instance.remote.return_value.__enter__ = mock.Mock(return_value=remote)
+    instance.remote.return_value.__exit__ = mock.Mock(return_value=False)
+    return instance
+
+
+class TestNodeProcess(b.SaharaTestCase):
+    def setUp(self):
+        super(TestNodeProcess, self).setUp()
+        self.process = np.NodeProcess('nodemanager', 'NodeManager', 'pkg')
+        self.remote = mock.Mock()
+        self.instances = [_get_instance('10.0.0.1', self.remote),
+                          _get_instance('10.0.0.2')]
+
+    @mock.patch('sahara.context.sleep')
+    @mock.patch('sahara_plugins.plugins.mapr.domain.node_process.'
+                'get_node_services')
+    def test_execute_action(self, get_node_services, sleep):
+        get_node_services.side_effect = [
+            {'10.0.0.1': {'nodemanager'}, '10.0.0.2': set()},
+            {'10.0.0.1': {'nodemanager'}, '10.0.0.2': {'nodemanager'}},
+            {'10.0.0.2': {'nodemanager'}},
+        ]
+        states = {'10.0.0.1': [np.Status.STAND_BY, np.Status.RUNNING],
+                  '10.0.0.2': [np.Status.STAND_BY, np.Status.RUNNING]}
+        with mock.patch.object(np.NodeProcess, 'status', autospec=True,
+                               side_effect=lambda p, i: states[
+                                   i.internal_ip].pop(0)) as status:
+            self.process.start(self.instances)
+
+        self.remote.execute_command.assert_called_once_with(
+            'sudo -u mapr maprcli node services -name nodemanager'
+            ' -action start -nodes 10.0.0.1,10.0.0.2')
+        self.assertEqual(3, get_node_services.call_count)
+        get_node_services.assert_called_with(self.remote)
+        # a listed service on standby is not running yet, nodes which do
+        # not list the service are not asked
+        self.assertEqual(
+            ['10.0.0.1', '10.0.0.1', '10.0.0.2', '10.0.0.2'],
+            sorted(c[0][1].internal_ip for c in status.call_args_list))
+        self.assertEqual([mock.call(3), mock.call(3)], sleep.call_args_list)
+
+    @mock.patch('sahara.context.sleep')
+    @mock.patch('sahara_plugins.plugins.mapr.domain.node_process.'
+                'get_node_services')
+    def test_wait_for_stopped(self, get_node_services, sleep):
+        states = {'10.0.0.1': [np.Status.FAILED, np.Status.STOPPED],
+                  '10.0.0.2': [np.Status.STOPPED]}
+        with mock.patch.object(np.NodeProcess, 'status', autospec=True,
+                               side_effect=lambda p, i: states[
+                                   i.internal_ip].pop(0)) as status:
+            self.process._wait_for_status(self.remote, self.instances,
+                                          np.Status.STOPPED)
+
+        get_node_services.assert_not_called()
+        self.assertEqual(3, status.call_count)
+        sleep.assert_called_once_with(3)
+
+    @mock.patch('sahara.context.sleep')
+    @mock.patch('sahara_plugins.plugins.mapr.domain.node_process.'
+                'get_node_services')
+    def test_wait_for_status_timeout(self, get_node_services, sleep):
+        with mock.patch.object(np.NodeProcess, 'status',
+                               return_value=np.Status.NOT_CONFIGURED):
+            e = self.assertRaises(
+                Exception, self.process._wait_for_status, self.remote,
+                self.instances[:1], np.Status.STOPPED, timeout=0)
+        # the timeout is reported as by the other polls of the plugins
+        self.assertEqual('TimeoutException', type(e).__name__)
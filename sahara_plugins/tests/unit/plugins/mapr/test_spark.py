@@ -0,0 +1,104 @@
+# Copyright (c) 2015, MapR Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from sahara.plugins import exceptions as ex
+from sahara_plugins.plugins.mapr.services.spark import spark
+from sahara_plugins.tests.unit import base as b
+
+
+ARTIFACTS = ('[assembly_jar]\n'
+             '/opt/mapr/spark/spark-1.6.1/lib/spark-assembly-1.6.1.jar\n'
+             '[hive_libs]\n'
+             '/opt/mapr/hive/hive-1.2/lib/hive-exec.jar\n'
+             '/opt/mapr/hive/hive-1.2/lib/datanucleus-core-3.2.10.jar\n'
+             '[hadoop_libs]\n'
+             '/opt/mapr/hadoop/etc\n'
+             '/opt/mapr/hadoop/share/common/*\n')
+
+
+class TestSparkArtifacts(b.SaharaTestCase):
+    def setUp(self):
+        super(TestSparkArtifacts, self).setUp()
+        self.cluster = mock.Mock()
+        self.cluster.extra.to_dict.return_value = {}
+        self.cluster_get = mock.patch('sahara.plugins.conductor.cluster_get',
+                                      return_value=self.cluster).start()
+        self.cluster_update = mock.patch(
+            'sahara.plugins.conductor.cluster_update').start()
+        self.service = spark.SparkOnYarnV161()
+        self.context = mock.Mock()
+        history_server = mock.MagicMock()
+        self.context.get_instance.return_value = history_server
+        self.remote = history_server.remote.return_value.__enter__.return_value
+        self.remote.execute_command.return_value = (0, ARTIFACTS)
+        self.hive = mock.Mock(version='1.2')
+        self.hive.home_dir.return_value = '/opt/mapr/hive/hive-1.2'
+        self.home_dir = mock.patch.object(
+            spark.SparkOnYarn, 'home_dir',
+            return_value='/opt/mapr/spark/spark-1.6.1').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_hive_properties(self):
+        properties = self.service._hive_properties(self.context, self.hive)
+
+        self.assertEqual(
+            '/opt/mapr/hive/hive-1.2/lib/datanucleus-core-3.2.10.jar',
+            properties['spark.yarn.dist.files'])
+        self.assertEqual('1.2.0',
+                         properties['spark.sql.hive.metastore.version'])
+        self.assertEqual(
+            '/opt/mapr/hadoop/etc:/opt/mapr/hadoop/share/common/*:'
+            '/opt/mapr/hive/hive-1.2/lib/hive-exec.jar:'
+            '/opt/mapr/hive/hive-1.2/lib/datanucleus-core-3.2.10.jar',
+            properties['spark.sql.hive.metastore.jars'])
+        self.assertEqual(
+            '/opt/mapr/spark/spark-1.6.1/lib/spark-assembly-1.6.1.jar',
+            self.service._assembly_jar_path(self.context, self.hive))
+        # all the lookups are done by a single command
+        self.remote.execute_command.assert_called_once_with(
+            mock.ANY, run_as_root=True, timeout=spark.ARTIFACTS_TIMEOUT)
+        cmd = self.remote.execute_command.call_args[0][0]
+        self.assertIn("find /opt/mapr/hive/hive-1.2/lib -name '*.jar'", cmd)
+        self.assertIn('hadoop classpath', cmd)
+
+    def test_stored_in_cluster_extra(self):
+        artifacts = self.service._get_artifacts(self.context, self.hive)
+        self.cluster_update.assert_called_once_with(
+            mock.ANY, self.cluster, {'extra': {spark.ARTIFACTS_KEY: {
+                'versions': ['1.6.1', '1.2'], 'artifacts': artifacts}}})
+
+        self.cluster.extra.to_dict.return_value = (
+            self.cluster_update.call_args[0][2]['extra'])
+        self.assertEqual(artifacts, self.service._get_artifacts(
+            self.context, self.hive))
+        self.assertEqual(1, self.remote.execute_command.call_count)
+
+        self.service._get_artifacts(self.context, mock.Mock(version='2.1'))
+        self.assertEqual(2, self.remote.execute_command.call_count)
+
+    def test_not_installed_yet(self):
+        self.remote.execute_command.return_value = (
+            0, '[assembly_jar]\n')
+
+        self.assertRaises(ex.HadoopProvisionError,
+                          self.service._assembly_jar_path, self.context,
+                          self.hive)
+        self.cluster_update.assert_not_called()
+
+    def test_spark2_without_hive(self):
+        service = spark.SparkOnYarnV201()
+        self.assertEqual({}, service._get_artifacts(self.context))
+        self.remote.execute_command.assert_not_called()
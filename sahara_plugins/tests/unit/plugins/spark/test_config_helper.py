@@ -32,8 +32,25 @@ class ConfigHelperUtilsTest(test_base.SaharaTestCase):
         self.assertEqual(expected, paths)
 
     @mock.patch('sahara.plugins.utils.get_config_value_or_default')
+    def test_get_config_value(self, get_config_value_or_default):
+        cluster = mock.Mock()
+        self.assertEqual(
+            get_config_value_or_default.return_value,
+            c_helper.get_config_value('Spark', 'Spark home', cluster))
+        get_config_value_or_default.assert_called_once_with(
+            'Spark', 'Spark home', cluster)
+
+        resolved = mock.Mock()
+        self.assertEqual(
+            resolved.get.return_value,
+            c_helper.get_config_value('Spark', 'Spark home', cluster,
+                                      resolved))
+        resolved.get.assert_called_once_with('Spark', 'Spark home')
+        self.assertEqual(1, get_config_value_or_default.call_count)
+
+    @mock.patch('sahara_plugins.plugins.spark.config_helper.get_config_value')
     def test_cleanup_configs(self, get_config_value):
-        getter = lambda plugin, key, cluster: plugin_configs[key]
+        getter = lambda plugin, key, cluster, resolved: plugin_configs[key]
         get_config_value.side_effect = getter
         plugin_configs = {"Minimum cleanup megabytes": 4096,
                           "Minimum cleanup seconds": 86400,
@@ -62,6 +79,35 @@ class ConfigHelperUtilsTest(test_base.SaharaTestCase):
         self.assertNotIn(configs, 'script')
         self.assertNotIn(configs, 'cron')
 
+    def test_is_rolling_scaling_enabled(self):
+        cluster = mock.Mock(cluster_configs={})
+        self.assertFalse(c_helper.is_rolling_scaling_enabled(cluster))
+
+        cluster.cluster_configs = {'general': {'Rolling scaling': True}}
+        self.assertTrue(c_helper.is_rolling_scaling_enabled(cluster))
+
+    def test_get_workers_drain_timeout(self):
+        cluster = mock.Mock(cluster_configs={})
+        self.assertEqual(86400, c_helper.get_workers_drain_timeout(cluster))
+
+        cluster.cluster_configs = {'general': {
+            'Spark workers drain timeout': 600}}
+        self.assertEqual(600, c_helper.get_workers_drain_timeout(cluster))
+
+        cluster.cluster_configs['general']['Decommissioning Timeout'] = 60
+        self.assertEqual(60, c_helper.get_workers_drain_timeout(cluster))
+
+    def test_extract_hadoop_confs(self):
+        configs = {
+            'HDFS': {'dfs.replication': 2, 'dfs.blocksize': None,
+                     'Data Node Heap Size': 512, 'unknown': 'value'},
+            'Spark': {'dfs.replication': 3}
+        }
+        self.assertEqual([('dfs.replication', 2)],
+                         c_helper.extract_hadoop_xml_confs(configs))
+        self.assertEqual(['HADOOP_DATANODE_OPTS=\\"-Xmx512m\\"'],
+                         c_helper.extract_hadoop_environment_confs(configs))
+
     @mock.patch("sahara.plugins.swift_utils.retrieve_auth_url")
     def test_generate_xml_configs(self, auth_url):
         auth_url.return_value = "http://localhost:5000/v2/"
@@ -213,3 +213,21 @@ class SparkProviderTest(base.SaharaTestCase):
         res = provider.get_edp_config_hints(edp.JOB_TYPE_SHELL, "2.3")
         self.assertEqual({'args': [], 'configs': {}, 'params': {}},
                          res['job_config'])
+
+    @mock.patch('sahara_plugins.plugins.spark.plugin.SparkProvider.'
+                '_add_instance_ng_related_to_extra')
+    def test_get_instance_ng_related_extra(self, add_extra):
+        provider = pl.SparkProvider()
+        ng_extras = {}
+        instances = [mock.Mock() for i in range(3)]
+        for instance, ng_id in zip(instances, ['ng-1', 'ng-1', 'ng-2']):
+            instance.node_group.id = ng_id
+            instance.storage_paths.return_value = ['/mnt/one']
+
+        for instance in instances:
+            provider._get_instance_ng_related_extra(
+                mock.Mock(), instance, {}, ng_extras)
+
+        self.assertEqual(2, add_extra.call_count)
+        self.assertEqual({('ng-1', ('/mnt/one',)), ('ng-2', ('/mnt/one',))},
+                         set(ng_extras))
@@ -0,0 +1,213 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import mock
+from oslo_serialization import jsonutils as json
+from oslo_utils import timeutils
+
+from sahara.plugins import exceptions as ex
+from sahara_plugins.plugins.spark import scaling
+from sahara_plugins.tests.unit import base
+
+
+class DecommissionSlavesTest(base.SaharaTestCase):
+    def setUp(self):
+        super(DecommissionSlavesTest, self).setUp()
+        self.master = self._instance('master', ['master', 'namenode'])
+        self.survived = [self._instance('slave-1', ['slave', 'datanode'])]
+        self.deleted = [self._instance('slave-2', ['slave', 'datanode']),
+                        self._instance('dn-1', ['datanode'])]
+        self.override_config('disable_event_log', True)
+        for name, patcher in [
+                ('get_config_value', mock.patch(
+                    'sahara_plugins.plugins.spark.config_helper.'
+                    'get_config_value', return_value='/opt/spark')),
+                ('get_workers_drain_timeout', mock.patch(
+                    'sahara_plugins.plugins.spark.config_helper.'
+                    'get_workers_drain_timeout', return_value=0)),
+                ('get_remote', mock.patch(
+                    'sahara.plugins.utils.get_remote',
+                    side_effect=lambda i: i.remote()))]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def _instance(self, name, node_processes):
+        instance = mock.MagicMock(id=name, instance_name=name)
+        instance.hostname.return_value = name
+        instance.node_group.node_processes = node_processes
+        return instance
+
+    def _remote(self, instance):
+        return instance.remote.return_value.__enter__.return_value
+
+    @mock.patch('sahara_plugins.plugins.spark.config_helper.'
+                'is_rolling_scaling_enabled', return_value=True)
+    def test_rolling(self, is_rolling_scaling_enabled):
+        scaling.decommission_sl(self.master, self.deleted, self.survived)
+
+        files = {'/opt/spark/conf/slaves': 'slave-1'}
+        self._remote(self.deleted[0]).execute_command.assert_called_once_with(
+            'bash /opt/spark/sbin/stop-slave.sh')
+        self._remote(self.deleted[1]).execute_command.assert_not_called()
+        self._remote(self.master).execute_command.assert_not_called()
+        for instance in [self.master] + self.survived:
+            self._remote(instance).write_files_to.assert_called_once_with(
+                files)
+
+    @mock.patch('sahara_plugins.plugins.spark.config_helper.'
+                'is_rolling_scaling_enabled', return_value=False)
+    def test_restart(self, is_rolling_scaling_enabled):
+        scaling.decommission_sl(self.master, self.deleted, self.survived)
+
+        self.assertEqual(
+            [mock.call('bash /opt/spark/sbin/stop-all.sh'),
+             mock.call('bash /opt/spark/sbin/start-all.sh')],
+            self.master.remote.return_value.execute_command.call_args_list)
+        self._remote(self.deleted[0]).execute_command.assert_not_called()
+
+
+class AwaitWorkersDrainedTest(base.SaharaTestCase):
+    def setUp(self):
+        super(AwaitWorkersDrainedTest, self).setUp()
+        timeutils.set_time_override(datetime.datetime(2018, 1, 1))
+        self.addCleanup(timeutils.clear_time_override)
+        self.master = mock.MagicMock()
+        self.remote = self.master.remote.return_value.__enter__.return_value
+        self.instances = [mock.Mock(internal_ip='10.0.0.%d' % i,
+                                    instance_name='slave-%d' % i)
+                          for i in range(2)]
+        for i, instance in enumerate(self.instances):
+            instance.hostname.return_value = 'slave-%d' % i
+            instance.fqdn.return_value = 'slave-%d.novalocal' % i
+        for name, patcher in [
+                ('get_config_value', mock.patch(
+                    'sahara_plugins.plugins.spark.config_helper.'
+                    'get_config_value', return_value='8080')),
+                ('get_workers_drain_timeout', mock.patch(
+                    'sahara_plugins.plugins.spark.config_helper.'
+                    'get_workers_drain_timeout', return_value=60)),
+                ('get_remote', mock.patch(
+                    'sahara.plugins.utils.get_remote',
+                    side_effect=lambda i: i.remote())),
+                ('sleep', mock.patch(
+                    'sahara.plugins.context.sleep',
+                    side_effect=lambda s: timeutils.advance_time_seconds(s)))]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def _workers(self, *workers):
+        return 0, json.dumps({'workers': [
+            {'host': host, 'state': state, 'coresused': cores}
+            for host, state, cores in workers]})
+
+    def test_wait_for_executors(self):
+        self.remote.execute_command.side_effect = [
+            self._workers(('slave-0', 'ALIVE', 4),
+                          ('10.0.0.1', 'ALIVE', 0),
+                          ('slave-1', 'DEAD', 2)),
+            self._workers(('slave-0.novalocal', 'ALIVE', 0))]
+
+        scaling._await_workers_drained(self.master, self.instances)
+
+        self.assertEqual(2, self.remote.execute_command.call_count)
+        self.remote.execute_command.assert_called_with(
+            "curl -s -f 'http://localhost:8080/json/'",
+            raise_when_error=False)
+        self.sleep.assert_called_once_with(scaling.DRAIN_POLL_INTERVAL)
+
+    def test_timeout(self):
+        self.remote.execute_command.return_value = self._workers(
+            ('slave-1', 'ALIVE', 1))
+
+        scaling._await_workers_drained(self.master, self.instances)
+
+        self.assertEqual(60 // scaling.DRAIN_POLL_INTERVAL,
+                         self.sleep.call_count)
+
+    def test_master_unavailable(self):
+        self.remote.execute_command.return_value = (7, '')
+
+        self.assertRaises(ex.HadoopProvisionError,
+                          scaling._await_workers_drained, self.master,
+                          self.instances)
+
+        self.assertEqual(60 // scaling.DRAIN_POLL_INTERVAL,
+                         self.sleep.call_count)
+
+    def test_master_recovers(self):
+        self.remote.execute_command.side_effect = [
+            (7, ''), self._workers(('slave-0', 'ALIVE', 0))]
+
+        scaling._await_workers_drained(self.master, self.instances)
+
+        self.sleep.assert_called_once_with(scaling.DRAIN_POLL_INTERVAL)
+
+    def test_disabled(self):
+        self.get_workers_drain_timeout.return_value = 0
+
+        scaling._await_workers_drained(self.master, self.instances)
+
+        self.master.remote.assert_not_called()
+
+
+class DecommissionDataNodesTest(base.SaharaTestCase):
+    @mock.patch('sahara.plugins.utils.plugin_option_poll')
+    @mock.patch('sahara.plugins.utils.add_provisioning_step')
+    @mock.patch('sahara.plugins.utils.generate_fqdn_host_names')
+    @mock.patch('sahara.plugins.utils.get_remote')
+    def test_decommission_dn(self, get_remote, generate_fqdn_host_names,
+                             add_provisioning_step, plugin_option_poll):
+        nn = mock.Mock(cluster_id='cluster-id')
+        dn = mock.Mock(internal_ip='10.0.0.1')
+        dn.node_group.node_processes = ['datanode']
+        slave = mock.Mock(internal_ip='10.0.0.2')
+        slave.node_group.node_processes = ['slave']
+        r = get_remote.return_value.__enter__.return_value
+
+        scaling.decommission_dn(nn, [dn, slave], [])
+
+        add_provisioning_step.assert_called_once_with(
+            'cluster-id', 'Decommission DataNodes', 1)
+        tracker = plugin_option_poll.call_args[0][1].__self__
+        self.assertEqual({'10.0.0.1': dn}, tracker.pending)
+        self.assertEqual({'remote': r}, plugin_option_poll.call_args[0][5])
+
+    @mock.patch('sahara.plugins.utils.add_successful_event')
+    @mock.patch('sahara.plugins.utils.plugin_option_poll')
+    @mock.patch('sahara.plugins.utils.add_provisioning_step')
+    @mock.patch('sahara.plugins.utils.generate_fqdn_host_names')
+    @mock.patch('sahara.plugins.utils.get_remote')
+    def test_status_unknown(self, get_remote, generate_fqdn_host_names,
+                            add_provisioning_step, plugin_option_poll,
+                            add_successful_event):
+        nn = mock.Mock(cluster_id='cluster-id')
+        dn = mock.Mock(internal_ip='10.0.0.1')
+        dn.node_group.node_processes = ['datanode']
+        r = get_remote.return_value.__enter__.return_value
+        # neither the JMX bean nor dfsadmin answer
+        r.execute_command.return_value = (1, '')
+        results = []
+        plugin_option_poll.side_effect = (
+            lambda cluster, func, option, msg, sleep, kwargs:
+            results.append(func(**kwargs)))
+
+        scaling.decommission_dn(nn, [dn], [])
+
+        self.assertEqual([False], results)
+        tracker = plugin_option_poll.call_args[0][1].__self__
+        self.assertEqual({'10.0.0.1': dn}, tracker.pending)
+        add_successful_event.assert_not_called()
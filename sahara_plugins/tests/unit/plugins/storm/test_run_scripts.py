@@ -0,0 +1,96 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from sahara.plugins import exceptions as ex
+from sahara_plugins.plugins.storm import run_scripts as run
+from sahara_plugins.tests.unit import base
+
+
+class RunScriptsTest(base.SaharaTestCase):
+    def test_rebalance_topologies(self):
+        remote = mock.Mock()
+        remote.execute_command.return_value = (0, '0 topology1\n'
+                                                  '1 topology2\n')
+
+        self.assertEqual({'topology1': True, 'topology2': False},
+                         run.rebalance_topologies(remote, 'nimbus',
+                                                  wait_time=10))
+
+        cmd = remote.execute_command.call_args[0][0]
+        self.assertEqual(1, remote.execute_command.call_count)
+        self.assertIn('/usr/local/storm/bin/storm -c nimbus.host=nimbus list',
+                      cmd)
+        self.assertIn('xargs -r -n 1 -P %d' % run.REBALANCE_PARALLELISM, cmd)
+        self.assertIn('rebalance "$0" -w 10', cmd)
+
+    def test_rebalance_without_topologies(self):
+        remote = mock.Mock()
+        remote.execute_command.return_value = (0, '')
+        self.assertEqual({}, run.rebalance_topologies(remote, 'nimbus'))
+        self.assertNotIn('-w', remote.execute_command.call_args[0][0])
+
+
+class RemoteBatchTest(base.SaharaTestCase):
+    def setUp(self):
+        super(RemoteBatchTest, self).setUp()
+        self.remote = mock.Mock()
+        self.batch = run.RemoteBatch(self.remote)
+
+    def test_run(self):
+        self.remote.execute_command.return_value = (
+            0, 'sahara-batch-step 0 0\noutput\nsahara-batch-step 1 0\n')
+        self.batch.write_file('/etc/zoo.cfg', 'zk')
+        self.batch.append_to_file('/etc/supervisord.conf', 'sv')
+        self.batch.execute('service supervisor start')
+
+        self.assertEqual(
+            [('cat /tmp/sahara-batch-append-1 >> /etc/supervisord.conf && '
+              'rm -f /tmp/sahara-batch-append-1', 0),
+             ('service supervisor start', 0)],
+            self.batch.run())
+
+        files = self.remote.write_files_to.call_args[0][0]
+        self.assertEqual('zk', files['/etc/zoo.cfg'])
+        self.assertEqual('sv', files['/tmp/sahara-batch-append-1'])
+        self.assertIn('service supervisor start\nrc=$?\n',
+                      files[run.BATCH_SCRIPT])
+        self.remote.execute_command.assert_called_once_with(
+            'sudo bash %s' % run.BATCH_SCRIPT, raise_when_error=False)
+
+    def test_run_files_only(self):
+        self.batch.write_file('/etc/zoo.cfg', 'zk')
+        self.assertEqual([], self.batch.run())
+        self.remote.write_files_to.assert_called_once_with(
+            {'/etc/zoo.cfg': 'zk'}, run_as_root=True)
+        self.remote.execute_command.assert_not_called()
+
+    def test_run_fails(self):
+        self.remote.execute_command.return_value = (
+            1, 'sahara-batch-step 0 0\nsahara-batch-step 1 1\n')
+        self.batch.execute('mkdir -p /var/log/storm')
+        self.batch.execute('service supervisor stop')
+        self.batch.execute('service supervisor start')
+
+        e = self.assertRaises(ex.PluginRemoteCommandException,
+                              self.batch.run)
+        self.assertEqual('service supervisor stop', e.cmd)
+
+    def test_start_storm_supervisor(self):
+        self.remote.execute_command.return_value = (0, '')
+        run.start_storm_supervisor(self.remote)
+        self.assertEqual(1, self.remote.write_files_to.call_count)
+        self.assertEqual(1, self.remote.execute_command.call_count)
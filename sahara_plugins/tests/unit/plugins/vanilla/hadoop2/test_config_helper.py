@@ -62,7 +62,8 @@ class TestConfigHelper(base.SaharaTestCase):
         sample_configs = [c_helper.ENABLE_SWIFT, c_helper.ENABLE_MYSQL,
                           c_helper.DATANODES_STARTUP_TIMEOUT,
                           c_helper.DATANODES_DECOMMISSIONING_TIMEOUT,
-                          c_helper.NODEMANAGERS_DECOMMISSIONING_TIMEOUT]
+                          c_helper.NODEMANAGERS_DECOMMISSIONING_TIMEOUT,
+                          c_helper.DISTRIBUTE_HOST_LISTS]
         self.CONF.enable_data_locality = False
         self.assertEqual(c_helper._init_general_configs(), sample_configs)
 
@@ -73,10 +74,8 @@ class TestConfigHelper(base.SaharaTestCase):
     def test_get_config_value(self):
         cluster = mock.Mock()
         ng = mock.Mock()
-        ng.configuration.return_value = mock.Mock()
-        ng.configuration.return_value.get.return_value = mock.Mock()
         cl = 'test'
-        ng.configuration.return_value.get.return_value.get.return_value = cl
+        ng.configuration.return_value = {'service': {'name': cl}}
         cluster.node_groups = [ng]
         cl_param = c_helper.get_config_value('pctx', 'service',
                                              'name', cluster)
@@ -94,6 +93,11 @@ class TestConfigHelper(base.SaharaTestCase):
         self.assertRaises(ex.PluginNotFoundException,
                           c_helper.get_config_value, pctx, 'service', 'name')
 
+        pctx = {'all_confs': [], 'confs_index': c_helper.index_configs(
+            [all_confs])}
+        value = c_helper.get_config_value(pctx, 'service', 'name')
+        self.assertEqual(value, 'default')
+
     @mock.patch(plugin_path + 'config_helper.get_config_value')
     def test_is_swift_enabled(self, get_config_value):
         target = c_helper.ENABLE_SWIFT.applicable_target
@@ -156,7 +160,7 @@ class TestConfigHelper(base.SaharaTestCase):
                  'MINIMUM_CLEANUP_SECONDS=1;' + \
                  'MAXIMUM_CLEANUP_SECONDS=1;'
         job_conf = {'valid': True,
-                    'cron': (cron,),
+                    'cron': cron,
                     'script': script}
         get_file_text.return_value = cron
         get_config_value_or_default.return_value = 1
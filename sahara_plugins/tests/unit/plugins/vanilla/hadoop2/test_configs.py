@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import mock
+
+from sahara.plugins import context
 from sahara_plugins.plugins.vanilla.hadoop2 import config as c
+from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 from sahara_plugins.tests.unit import base
 
 
@@ -32,6 +36,151 @@ class VanillaTwoConfigTestCase(base.SaharaTestCase):
         }
         self.assertEqual(expected, dirs)
 
+    def test_get_post_conf_script(self):
+        ng = FakeNG(storage_paths=['/vol1'])
+        env = {
+            'HDFS': {'NameNode Heap Size': 1024,
+                     'SecondaryNameNode Heap Size': 1024,
+                     'DataNode Heap Size': 512},
+            'YARN': {'ResourceManager Heap Size': 2048,
+                     'NodeManager Heap Size': 1024},
+            'MapReduce': {'JobHistoryServer Heap Size': 256}
+        }
+        script = c._get_post_conf_script({'data_locality': True}, ng, env)
+        self.assertIn('export HADOOP_DATANODE_OPTS=\\"-Xmx512m\\",', script)
+        self.assertIn('export YARN_RESOURCEMANAGER_HEAPSIZE=2048,', script)
+        self.assertIn('export HADOOP_JOB_HISTORYSERVER_HEAPSIZE=256,',
+                      script)
+        self.assertIn('chmod +x /opt/hadoop/etc/hadoop/topology.sh', script)
+
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config.'
+                '_configure_instance')
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config.'
+                '_get_cluster_configs')
+    @mock.patch('sahara.plugins.utils.add_provisioning_step')
+    def test_configure_instances(self, add_provisioning_step,
+                                 get_cluster_configs, configure_instance):
+        instances = [mock.Mock(instance_name='inst-%d' % i)
+                     for i in range(3)]
+        c.configure_instances({}, instances)
+        get_cluster_configs.assert_called_once_with({}, instances[0].cluster)
+        cluster_confs = get_cluster_configs.return_value
+        self.assertEqual(
+            [mock.call({}, cluster_confs, i) for i in instances],
+            sorted(configure_instance.call_args_list,
+                   key=lambda call: call[0][2].instance_name))
+
+    @mock.patch.object(c, 'CONFIGURE_POOL_SIZE', 2)
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config.'
+                '_configure_instance')
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config.'
+                '_get_cluster_configs')
+    @mock.patch('sahara.plugins.utils.add_provisioning_step')
+    def test_configure_instances_pool_size(self, add_provisioning_step,
+                                           get_cluster_configs,
+                                           configure_instance):
+        running = []
+        peaks = []
+
+        def _configure(pctx, cluster_confs, instance):
+            running.append(instance)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(instance)
+
+        configure_instance.side_effect = _configure
+        instances = [mock.Mock(instance_name='inst-%d' % i)
+                     for i in range(5)]
+        c.configure_instances({}, instances)
+        self.assertEqual(5, len(peaks))
+        self.assertEqual(2, max(peaks))
+
+    def test_get_hadoop_configs(self):
+        cluster_confs = {
+            'hadoop': {
+                'Hadoop': {'fs.defaultFS': 'hdfs://nn:9000'},
+                'HDFS': {'dfs.hosts': '/opt/hadoop/etc/hadoop/dn-include'}
+            }
+        }
+        confs = c._get_hadoop_configs(cluster_confs,
+                                      FakeNG(storage_paths=['/vol1']))
+        self.assertEqual({
+            'dfs.hosts': '/opt/hadoop/etc/hadoop/dn-include',
+            'dfs.namenode.name.dir': '/vol1/hdfs/namenode',
+            'dfs.datanode.data.dir': '/vol1/hdfs/datanode'
+        }, confs['HDFS'])
+        self.assertEqual(cluster_confs['hadoop']['Hadoop'], confs['Hadoop'])
+        self.assertEqual({'dfs.hosts': '/opt/hadoop/etc/hadoop/dn-include'},
+                         cluster_confs['hadoop']['HDFS'])
+
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_zk_servers')
+    def test_push_zk_configs_to_nodes(self, get_zk_servers):
+        instances = [mock.MagicMock(instance_name='zk-%d' % i)
+                     for i in range(3)]
+        remotes = [i.remote.return_value.__enter__.return_value
+                   for i in instances]
+        get_zk_servers.return_value = list(instances)
+
+        c._push_zk_configs_to_nodes(mock.Mock(), 'zk-conf', [instances[0]])
+
+        remotes[0].write_file_to.assert_not_called()
+        for index, remote in enumerate(remotes[1:]):
+            remote.write_file_to.assert_called_once_with(
+                '/opt/zookeeper/conf/zoo.cfg', 'zk-conf', run_as_root=True)
+            remote.execute_command.assert_called_once_with(
+                'sudo su - -c "echo %s > /var/zookeeper/myid" hadoop' % index)
+
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config_helper.'
+                'get_spark_home', return_value='/opt/spark')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.'
+                'get_spark_history_server')
+    def test_push_spark_configs_to_node(self, get_spark_history_server,
+                                        get_spark_home):
+        remote = (get_spark_history_server.return_value.remote.return_value.
+                  __enter__.return_value)
+        extra = {'sp_master': 'env', 'sp_defaults': 'defaults',
+                 'job_cleanup': {'valid': True, 'script': 'cleanup',
+                                 'cron': 'cron'}}
+
+        c._push_spark_configs_to_node(mock.Mock(), extra)
+
+        files = remote.write_files_to.call_args[0][0]
+        self.assertEqual('env', files['/opt/spark/conf/spark-env.sh'])
+        self.assertEqual('defaults',
+                         files['/opt/spark/conf/spark-defaults.conf'])
+        self.assertEqual('cleanup', files['/opt/hadoop/tmp-cleanup.sh'])
+        self.assertEqual('cron\n', files['/etc/cron.d/spark-cleanup'])
+        self.assertIn('chmod 755 /opt/hadoop/tmp-cleanup.sh',
+                      files[c.SPARK_CONF_SCRIPT])
+        self.assertIn('mkdir -p /tmp/spark-events', files[c.SPARK_CONF_SCRIPT])
+        remote.execute_command.assert_called_once_with(
+            'sudo bash %s' % c.SPARK_CONF_SCRIPT)
+
+        extra['job_cleanup'] = {'valid': False}
+        c._push_spark_configs_to_node(mock.Mock(), extra)
+        files = remote.write_files_to.call_args[0][0]
+        self.assertNotIn('/opt/hadoop/tmp-cleanup.sh', files)
+        self.assertIn('rm -f /etc/cron.d/spark-cleanup',
+                      files[c.SPARK_CONF_SCRIPT])
+
+    @mock.patch('sahara_plugins.plugins.vanilla.hadoop2.config_helper.'
+                'get_spark_home', return_value='/opt/spark')
+    @mock.patch('sahara.plugins.utils.get_config_value_or_default',
+                return_value=1)
+    def test_get_spark_files_job_cleanup(self, get_config_value_or_default,
+                                         get_spark_home):
+        extra = {'sp_master': 'env', 'sp_defaults': 'defaults',
+                 'job_cleanup': c_helper.generate_job_cleanup_config(
+                     mock.Mock())}
+
+        files = c._get_spark_files(mock.Mock(), extra)
+
+        cron = files['/etc/cron.d/spark-cleanup']
+        self.assertIn('tmp-cleanup.sh', cron)
+        self.assertTrue(cron.endswith('\n'))
+        self.assertIn('MINIMUM_CLEANUP_SECONDS=1',
+                      files['/opt/hadoop/tmp-cleanup.sh'])
+
 
 class FakeNG(object):
     def __init__(self, storage_paths=None):
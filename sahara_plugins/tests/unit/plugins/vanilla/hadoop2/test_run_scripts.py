@@ -88,10 +88,9 @@ class RunScriptsTest(base.SaharaTestCase):
     def test_start_processes_both(self, check_cluster_exists):
         processes = ['datanode', 'nodemanager']
         rs._start_processes(self.instance, processes)
-        cmd_1 = 'sudo su - -c "hadoop-daemon.sh start datanode" hadoop'
-        cmd_2 = 'sudo su - -c  "yarn-daemon.sh start nodemanager" hadoop'
-        calls = [mock.call(cmd_1), mock.call(cmd_2)]
-        self.r.execute_command.assert_has_calls(calls, any_order=True)
+        self.r.execute_command.assert_called_once_with(
+            'sudo su - -c "hadoop-daemon.sh start datanode && '
+            'yarn-daemon.sh start nodemanager" hadoop')
 
     def test_start_hadoop_process(self):
         process = 'test'
@@ -220,14 +219,13 @@ class RunScriptsTest(base.SaharaTestCase):
 
     @mock.patch('sahara_plugins.plugins.vanilla.utils.get_namenode')
     @mock.patch('sahara_plugins.plugins.vanilla.utils.get_datanodes')
-    @mock.patch('sahara.plugins.utils.check_cluster_exists')
     @mock.patch('sahara.plugins.utils.add_provisioning_step')
     @mock.patch('sahara.plugins.utils.plugin_option_poll')
     def test_await_datanodes(self, plugin_option_poll, add_provisioning_step,
-                             check_cluster_exists, get_datanodes,
-                             get_namenode):
-        cluster = mock.Mock()
-        get_datanodes.return_value = ['node1']
+                             get_datanodes, get_namenode):
+        cluster = mock.Mock(id='cluster-id')
+        datanode = mock.Mock(internal_ip='10.0.0.1')
+        get_datanodes.return_value = [datanode]
         r = mock.Mock()
         remote = mock.Mock(return_value=r)
         remote.__enter__ = remote
@@ -236,24 +234,33 @@ class RunScriptsTest(base.SaharaTestCase):
         namenode.remote.return_value = remote
         get_namenode.return_value = namenode
         mess = _('Waiting on 1 datanodes to start up')
-        test_data = {'remote': r, 'count': 1}
         timeout = c_helper.DATANODES_STARTUP_TIMEOUT
         rs.await_datanodes(cluster)
         get_datanodes.assert_called_once_with(cluster)
         get_namenode.assert_called_once_with(cluster)
-        plugin_option_poll.assert_called_once_with(cluster,
-                                                   rs._check_datanodes_count,
-                                                   timeout, mess, 1, test_data)
+        add_provisioning_step.assert_called_once_with(
+            'cluster-id', _("Await %s start up") % "DataNodes", 1)
+        plugin_option_poll.assert_called_once_with(
+            cluster, mock.ANY, timeout, mess, 1, {'remote': r})
+        tracker = plugin_option_poll.call_args[0][1].__self__
+        self.assertEqual({'10.0.0.1': datanode}, tracker.pending)
 
-    def test_check_datanodes_count(self):
-        self.r.execute_command = mock.Mock(return_value=(0, '1'))
-        self.assertEqual(rs._check_datanodes_count(self.r, 0), True)
+    @mock.patch('sahara.plugins.utils.add_fail_event')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_namenode')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_datanodes')
+    @mock.patch('sahara.plugins.utils.add_provisioning_step')
+    @mock.patch('sahara.plugins.utils.plugin_option_poll')
+    def test_await_datanodes_timeout(self, plugin_option_poll,
+                                     add_provisioning_step, get_datanodes,
+                                     get_namenode, add_fail_event):
+        datanode = mock.Mock(internal_ip='10.0.0.1')
+        get_datanodes.return_value = [datanode]
+        get_namenode.return_value = mock.MagicMock()
+        error = ValueError()
+        plugin_option_poll.side_effect = error
 
-        self.assertEqual(rs._check_datanodes_count(self.r, 1), True)
-        self.r.execute_command.assert_called_once_with(
-            'sudo su -lc "hdfs dfsadmin -report" hadoop | '
-            'grep \'Live datanodes\|Datanodes available:\' | '
-            'grep -o \'[0-9]\+\' | head -n 1')
+        self.assertRaises(ValueError, rs.await_datanodes, mock.Mock())
+        add_fail_event.assert_called_once_with(datanode, error)
 
     def test_hive_create_warehouse_dir(self):
         rs._hive_create_warehouse_dir(self.r)
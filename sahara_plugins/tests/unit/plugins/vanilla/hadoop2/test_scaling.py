@@ -15,6 +15,7 @@
 
 import mock
 
+from sahara.plugins import context
 from sahara_plugins.i18n import _
 from sahara_plugins.plugins.vanilla.hadoop2 import config_helper as c_helper
 from sahara_plugins.plugins.vanilla.hadoop2 import scaling
@@ -60,7 +61,7 @@ class ScalingTest(base.SaharaTestCase):
         pctx = mock.Mock()
         scaling.scale_cluster(pctx, self.cluster, self.instances)
         configure_instances.assert_called_once_with(pctx, self.instances)
-        _update_include_files.assert_called_once_with(self.cluster)
+        _update_include_files.assert_called_once_with(pctx, self.cluster)
         refresh_hadoop_nodes.assert_called_once_with(self.cluster)
         get_resourcemanager.assert_called_once_with(self.cluster)
         refresh_yarn_nodes.assert_called_once_with(self.cluster)
@@ -81,17 +82,17 @@ class ScalingTest(base.SaharaTestCase):
         ret = scaling._get_instances_with_service(instances, service)
         self.assertEqual(ret, [ins_1])
 
+    @mock.patch(PLUGINS_PATH + 'scaling._get_host_lists_consumers')
     @mock.patch('sahara_plugins.plugins.vanilla.utils.get_nodemanagers')
     @mock.patch('sahara_plugins.plugins.vanilla.utils.get_datanodes')
     @mock.patch('sahara.plugins.utils.check_cluster_exists')
     @mock.patch('sahara.plugins.utils.add_provisioning_step')
     @mock.patch('sahara.plugins.utils.generate_fqdn_host_names')
-    @mock.patch('sahara.plugins.utils.get_instances')
-    def test_update_include_files(self, get_instances,
-                                  generate_fqdn_host_names,
+    def test_update_include_files(self, generate_fqdn_host_names,
                                   add_provisioning_step,
                                   check_cluster_exists,
-                                  get_datanodes, get_nodemanagers):
+                                  get_datanodes, get_nodemanagers,
+                                  get_host_lists_consumers):
         DIR = scaling.HADOOP_CONF_DIR
         host = '1.2.3.4'
         ins_1 = mock.Mock()
@@ -103,22 +104,43 @@ class ScalingTest(base.SaharaTestCase):
         ins_4 = mock.Mock()
         ins_4.id = 'instance_4'
         dec_instances = [ins_1, ins_2]
-        get_instances.return_value = [self.instance]
+        get_host_lists_consumers.return_value = [self.instance]
         get_datanodes.return_value = [ins_3]
         get_nodemanagers.return_value = [ins_4]
         generate_fqdn_host_names.return_value = host
-        scaling._update_include_files(self.cluster, dec_instances)
-        get_instances.assert_called_once_with(self.cluster)
+        pctx = mock.Mock()
+        scaling._update_include_files(pctx, self.cluster, dec_instances)
+        get_host_lists_consumers.assert_called_once_with(pctx, self.cluster)
         get_datanodes.assert_called_once_with(self.cluster)
         get_nodemanagers.assert_called_once_with(self.cluster)
         count = generate_fqdn_host_names.call_count
         self.assertEqual(count, 2)
-        command_calls = [mock.call(
-            'sudo su - -c "echo \'%s\' > %s/dn-include" hadoop' % (
-                host, DIR)), mock.call(
-            'sudo su - -c "echo \'%s\' > %s/nm-include" hadoop' % (
-                host, DIR))]
-        self.r.execute_command.assert_has_calls(command_calls, any_order=True)
+        self.r.execute_command.assert_called_once_with(
+            'sudo su - -c "echo \'%s\' > %s/dn-include; '
+            'echo \'%s\' > %s/nm-include" hadoop' % (host, DIR, host, DIR))
+
+    @mock.patch('sahara.plugins.utils.get_instances')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_resourcemanager')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_secondarynamenode')
+    @mock.patch('sahara_plugins.plugins.vanilla.utils.get_namenode')
+    @mock.patch(PLUGINS_PATH + 'config_helper.'
+                'is_host_lists_distribution_enabled')
+    def test_get_host_lists_consumers(self, distribution_enabled,
+                                      get_namenode, get_secondarynamenode,
+                                      get_resourcemanager, get_instances):
+        pctx = mock.Mock()
+        distribution_enabled.return_value = False
+        get_secondarynamenode.return_value = None
+        self.assertEqual(
+            [get_namenode.return_value, get_resourcemanager.return_value],
+            scaling._get_host_lists_consumers(pctx, self.cluster))
+        get_instances.assert_not_called()
+
+        distribution_enabled.return_value = True
+        self.assertEqual(
+            get_instances.return_value,
+            scaling._get_host_lists_consumers(pctx, self.cluster))
+        get_instances.assert_called_once_with(self.cluster)
 
     @mock.patch('sahara_plugins.plugins.vanilla.utils.get_resourcemanager')
     @mock.patch(PLUGINS_PATH + 'run_scripts.refresh_zk_servers')
@@ -147,7 +169,7 @@ class ScalingTest(base.SaharaTestCase):
         scaling.decommission_nodes(pctx, self.cluster, self.instances)
         get_instances_count = _get_instances_with_service.call_count
         self.assertEqual(get_instances_count, 2)
-        _update_exclude_files.assert_called_once_with(self.cluster,
+        _update_exclude_files.assert_called_once_with(pctx, self.cluster,
                                                       self.instances)
         refresh_count = refresh_hadoop_nodes.call_count
         self.assertEqual(refresh_count, 2)
@@ -157,50 +179,68 @@ class ScalingTest(base.SaharaTestCase):
             self.cluster, data)
         _check_datanodes_decommission.assert_called_once_with(
             self.cluster, data)
-        _update_include_files.assert_called_once_with(self.cluster,
+        _update_include_files.assert_called_once_with(pctx, self.cluster,
                                                       self.instances)
-        _clear_exclude_files.assert_called_once_with(self.cluster)
+        _clear_exclude_files.assert_called_once_with(pctx, self.cluster)
         configure_topology_data.assert_called_once_with(pctx, self.cluster)
         configure_zk.assert_called_once_with(self.cluster, self.instances)
         refresh_zk.assert_called_once_with(self.cluster, self.instances)
 
+    @mock.patch(PLUGINS_PATH + 'scaling._get_host_lists_consumers')
     @mock.patch(PLUGINS_PATH + 'scaling._get_instances_with_service')
     @mock.patch('sahara.plugins.utils.generate_fqdn_host_names')
-    @mock.patch('sahara.plugins.utils.get_instances')
-    def test_update_exclude_files(self, get_instances,
-                                  generate_fqdn_host_names,
-                                  get_instances_with_service):
+    def test_update_exclude_files(self, generate_fqdn_host_names,
+                                  get_instances_with_service,
+                                  get_host_lists_consumers):
         node = mock.Mock()
         get_instances_with_service.return_value = node
         host = '1.2.3.4'
         generate_fqdn_host_names.return_value = host
-        get_instances.return_value = [self.instance]
-        scaling._update_exclude_files(self.cluster, self.instances)
+        get_host_lists_consumers.return_value = [self.instance]
+        pctx = mock.Mock()
+        scaling._update_exclude_files(pctx, self.cluster, self.instances)
         service_calls = [mock.call(self.instances, 'datanode'),
                          mock.call(self.instances, 'nodemanager')]
         get_instances_with_service.assert_has_calls(service_calls,
                                                     any_order=True)
         self.assertEqual(generate_fqdn_host_names.call_count, 2)
-        get_instances.assert_called_once_with(self.cluster)
+        get_host_lists_consumers.assert_called_once_with(pctx, self.cluster)
         DIR = scaling.HADOOP_CONF_DIR
-        command_calls = [mock.call(
-            'sudo su - -c "echo \'%s\' > %s/dn-exclude" hadoop' % (
-                host, DIR)), mock.call(
-            'sudo su - -c "echo \'%s\' > %s/nm-exclude" hadoop' % (
-                host, DIR))]
-        self.r.execute_command.assert_has_calls(command_calls, any_order=True)
+        self.r.execute_command.assert_called_once_with(
+            'sudo su - -c "echo \'%s\' > %s/dn-exclude; '
+            'echo \'%s\' > %s/nm-exclude" hadoop' % (host, DIR, host, DIR))
 
-    @mock.patch('sahara.plugins.utils.get_instances')
-    def test_clear_exclude_files(self, get_instances):
-        get_instances.return_value = [self.instance]
-        scaling._clear_exclude_files(self.cluster)
-        get_instances.assert_called_once_with(self.cluster)
+    @mock.patch(PLUGINS_PATH + 'scaling._get_host_lists_consumers')
+    def test_clear_exclude_files(self, get_host_lists_consumers):
+        get_host_lists_consumers.return_value = [self.instance]
+        pctx = mock.Mock()
+        scaling._clear_exclude_files(pctx, self.cluster)
+        get_host_lists_consumers.assert_called_once_with(pctx, self.cluster)
         DIR = scaling.HADOOP_CONF_DIR
-        calls = [mock.call('sudo su - -c "echo > %s/dn-exclude" hadoop' %
-                           DIR),
-                 mock.call('sudo su - -c "echo > %s/nm-exclude" hadoop' %
-                           DIR)]
-        self.r.execute_command.assert_has_calls(calls, any_order=True)
+        self.r.execute_command.assert_called_once_with(
+            'sudo su - -c "echo \'\' > %s/dn-exclude; '
+            'echo \'\' > %s/nm-exclude" hadoop' % (DIR, DIR))
+
+    @mock.patch(PLUGINS_PATH + 'config.CONFIGURE_POOL_SIZE', 2)
+    @mock.patch(PLUGINS_PATH + 'scaling._execute_command')
+    @mock.patch(PLUGINS_PATH + 'scaling._get_host_lists_consumers')
+    def test_write_host_lists_pool_size(self, get_host_lists_consumers,
+                                        execute_command):
+        running = []
+        peaks = []
+
+        def _execute(instance, cmd):
+            running.append(instance)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(instance)
+
+        execute_command.side_effect = _execute
+        get_host_lists_consumers.return_value = [
+            mock.Mock(instance_name='inst-%d' % i) for i in range(5)]
+        scaling._clear_exclude_files(mock.Mock(), self.cluster)
+        self.assertEqual(5, len(peaks))
+        self.assertEqual(2, max(peaks))
 
     def test_is_decommissioned(self):
         def check_func(cluster):
@@ -141,3 +141,14 @@ class UtilsTestCase(base.SaharaTestCase):
 
         u.delete_hive_password(cluster)
         delete_secret.assert_called_once_with("31415926")
+
+    @mock.patch('sahara.plugins.conductor.cluster_get')
+    @mock.patch('sahara.plugins.castellan_utils.get_secret')
+    def test_secrets_not_kept(self, get_secret, conductor):
+        cluster = mock.MagicMock()
+        cluster.extra.to_dict.return_value = {"hive_pass_id": "31415926"}
+        conductor.return_value = cluster
+        get_secret.side_effect = ['first', 'rotated']
+
+        self.assertEqual('first', u.get_hive_password(cluster))
+        self.assertEqual('rotated', u.get_hive_password(cluster))
@@ -30,17 +30,17 @@ class TestConfigHelper(base.SaharaTestCase):
 
     @mock.patch(plugin_hadoop_path + 'config_helper.PLUGIN_GENERAL_CONFIGS')
     @mock.patch(plugin_path + 'config_helper.PLUGIN_ENV_CONFIGS')
-    @mock.patch(plugin_path + 'config_helper.PLUGIN_XML_CONFIGS')
+    @mock.patch(plugin_path + 'config_helper.get_xml_configs')
     @mock.patch(plugin_path + 'config_helper._get_spark_configs')
     @mock.patch(plugin_path + 'config_helper._get_zookeeper_configs')
     def test_init_all_configs(self,
                               _get_zk_configs,
                               _get_spark_configs,
-                              PLUGIN_XML_CONFIGS,
+                              get_xml_configs,
                               PLUGIN_ENV_CONFIGS,
                               PLUGIN_GENERAL_CONFIGS):
         configs = []
-        configs.extend(PLUGIN_XML_CONFIGS)
+        configs.extend(get_xml_configs())
         configs.extend(PLUGIN_ENV_CONFIGS)
         configs.extend(PLUGIN_GENERAL_CONFIGS)
         configs.extend(_get_spark_configs())
@@ -60,13 +60,29 @@ class TestConfigHelper(base.SaharaTestCase):
         for i in spark_configs:
             self.assertIsInstance(i, p.Config)
 
-    def test_get_plugin_configs(self):
+    @mock.patch(plugin_path + 'config_helper._init_all_configs')
+    def test_get_plugin_configs(self, _init_all_configs):
+        self.addCleanup(v_helper._CONFIGS.clear)
+        v_helper._CONFIGS.clear()
         self.assertEqual(v_helper.get_plugin_configs(),
-                         v_helper.PLUGIN_CONFIGS)
+                         _init_all_configs.return_value)
+        v_helper.get_plugin_configs()
+        _init_all_configs.assert_called_once_with()
 
-    def test_get_xml_configs(self):
-        self.assertEqual(v_helper.get_xml_configs(),
-                         v_helper.PLUGIN_XML_CONFIGS)
+    @mock.patch(plugin_hadoop_path + 'config_helper.load_xml_defaults')
+    def test_get_xml_configs(self, load_xml_defaults):
+        self.addCleanup(v_helper._CONFIGS.clear)
+        v_helper._CONFIGS.clear()
+        load_xml_defaults.return_value = [
+            {'name': 'dfs.replication', 'value': '3', 'description': ''}]
+        configs = v_helper.get_xml_configs()
+        self.assertEqual(len(v_helper.XML_DEFAULTS), len(configs))
+        self.assertEqual(3, configs[0].default_value)
+        self.assertIs(configs, v_helper.get_xml_configs())
+        self.assertEqual(len(v_helper.XML_DEFAULTS),
+                         load_xml_defaults.call_count)
+        load_xml_defaults.assert_any_call(
+            'plugins/vanilla/v2_8_2/resources/hdfs-default.xml')
 
     def test_get_env_configs(self):
         self.assertEqual(v_helper.get_env_configs(),
@@ -0,0 +1,48 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from sahara.plugins import provisioning as p
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import cluster_configs
+
+
+class ResolvedConfigsTest(base.SaharaTestCase):
+    def setUp(self):
+        super(ResolvedConfigsTest, self).setUp()
+        self.plugin_configs = [
+            p.Config('Spark home', 'Spark', 'cluster',
+                     default_value='/opt/spark'),
+            p.Config('Master port', 'Spark', 'cluster', default_value='7077'),
+            p.Config('Worker cores', 'Spark', 'cluster', default_value='all')
+        ]
+        ng1 = mock.Mock()
+        ng1.configuration.return_value = {
+            'Spark': {'Master port': '7000', 'Worker cores': None}}
+        ng2 = mock.Mock()
+        ng2.configuration.return_value = {
+            'Spark': {'Master port': '7001', 'Worker cores': 4}}
+        self.cluster = mock.Mock(node_groups=[ng1, ng2], cluster_configs={
+            'Spark': {'Spark home': '/usr/lib/spark'}})
+
+    def test_resolve(self):
+        resolved = cluster_configs.ResolvedConfigs(self.cluster,
+                                                   self.plugin_configs)
+        self.assertEqual('/usr/lib/spark', resolved.get('Spark',
+                                                        'Spark home'))
+        self.assertEqual('7000', resolved.get('Spark', 'Master port'))
+        self.assertEqual(4, resolved.get('Spark', 'Worker cores'))
+        self.assertIsNone(resolved.get('Spark', 'Unknown'))
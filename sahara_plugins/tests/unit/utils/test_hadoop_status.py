@@ -0,0 +1,249 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import mock
+from oslo_serialization import jsonutils as json
+from oslo_utils import timeutils
+
+from sahara.plugins import utils
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import hadoop_status as hs
+
+
+NAMENODE_INFO = {
+    'beans': [{
+        'name': 'Hadoop:service=NameNode,name=NameNodeInfo',
+        'LiveNodes': json.dumps({
+            'worker-1:50010': {'adminState': 'In Service',
+                               'xferaddr': '10.0.0.1:50010'},
+            'worker-2:50010': {'adminState': 'Decommission In Progress',
+                               'xferaddr': '10.0.0.2:50010'},
+        }),
+        'DeadNodes': json.dumps({
+            'worker-3': {'decommissioned': True,
+                         'xferaddr': '10.0.0.3:50010'},
+        }),
+        'DecomNodes': json.dumps({
+            'worker-2:50010': {'underReplicatedBlocks': 42,
+                               'xferaddr': '10.0.0.2:50010'},
+        })
+    }]
+}
+
+CLUSTER_NODES = {
+    'nodes': {
+        'node': [
+            {'nodeHostName': 'worker-1', 'state': 'RUNNING'},
+            {'nodeHostName': 'worker-2', 'state': 'DECOMMISSIONED'},
+        ]
+    }
+}
+
+
+class StatusProviderTest(base.SaharaTestCase):
+    def setUp(self):
+        super(StatusProviderTest, self).setUp()
+        self.remote = mock.Mock()
+        self.provider = hs.StatusProvider(
+            hs.RestStatusSource(),
+            hs.CliStatusSource('sudo su - -c "%s" hadoop'))
+
+    def test_datanodes_from_jmx(self):
+        self.remote.execute_command.return_value = (
+            0, json.dumps(NAMENODE_INFO))
+        self.assertEqual({'worker-1': 'normal',
+                          'worker-2': 'decommission in progress',
+                          'worker-3': 'decommissioned'},
+                         self.provider.get_datanodes_status(self.remote))
+        self.assertEqual(
+            2, self.provider.get_live_datanodes_count(self.remote))
+        self.assertEqual(
+            [None, 42, None],
+            [dn['under_replicated'] for dn in sorted(
+                self.provider.get_datanodes(self.remote),
+                key=lambda dn: dn['host'])])
+        self.remote.execute_command.assert_called_with(
+            "curl -s -f '%s'" % (hs.NAMENODE_INFO_URL % 50070),
+            raise_when_error=False)
+
+    def test_nodemanagers_from_rest(self):
+        self.remote.execute_command.return_value = (
+            0, json.dumps(CLUSTER_NODES))
+        self.assertEqual({'worker-1': 'running',
+                          'worker-2': 'decommissioned'},
+                         self.provider.get_nodemanagers_status(self.remote))
+        self.remote.execute_command.assert_called_once_with(
+            "curl -s -f '%s'" % (hs.CLUSTER_NODES_URL % 8088),
+            raise_when_error=False)
+
+    def test_datanodes_fallback_to_cli(self):
+        report = utils.get_file_text(
+            'tests/unit/plugins/vanilla/hadoop2/resources/dfs-report.txt',
+            'sahara_plugins')
+        self.remote.execute_command.side_effect = [(7, ''), (0, report)]
+        datanodes = self.provider.get_datanodes(self.remote)
+        self.assertEqual(
+            {'host': 'cluster-worker-001.novalocal', 'ip': '10.50.0.22',
+             'status': 'normal', 'live': True, 'under_replicated': None},
+            datanodes[0])
+        self.assertEqual(4, len(datanodes))
+        self.remote.execute_command.assert_called_with(
+            'sudo su - -c "hdfs dfsadmin -report" hadoop',
+            raise_when_error=False)
+
+    def test_no_source_available(self):
+        self.remote.execute_command.return_value = (1, '')
+        self.assertIsNone(self.provider.get_datanodes(self.remote))
+        self.assertEqual(0,
+                         self.provider.get_live_datanodes_count(self.remote))
+        self.assertEqual({},
+                         self.provider.get_nodemanagers_status(self.remote))
+
+    def test_parse_dfs_report_dead_nodes(self):
+        report = ('Live datanodes (1):\n\n'
+                  'Name: 10.0.0.1:50010 (worker-1)\n'
+                  'Hostname: worker-1\n'
+                  'Decommission Status : Normal\n\n'
+                  'Dead datanodes (1):\n\n'
+                  'Name: 10.0.0.2:50010 (worker-2)\n'
+                  'Hostname: worker-2\n'
+                  'Decommission Status : Decommissioned\n')
+        self.assertEqual([
+            {'host': 'worker-1', 'ip': '10.0.0.1', 'status': 'normal',
+             'live': True, 'under_replicated': None},
+            {'host': 'worker-2', 'ip': '10.0.0.2',
+             'status': 'decommissioned', 'live': False,
+             'under_replicated': None},
+        ], hs.parse_dfs_report(report))
+
+
+class DecommissionTrackerTest(base.SaharaTestCase):
+    def setUp(self):
+        super(DecommissionTrackerTest, self).setUp()
+        self.now = datetime.datetime(2018, 1, 1)
+        timeutils.set_time_override(self.now)
+        self.addCleanup(timeutils.clear_time_override)
+        self.provider = mock.Mock()
+        self.instances = [mock.Mock(internal_ip='10.0.0.%d' % i)
+                          for i in range(2)]
+        self.decommissioned = mock.Mock()
+        self.tracker = hs.DecommissionTracker(
+            self.provider, self.instances, self.decommissioned)
+
+    def _report(self, *nodes):
+        self.provider.get_datanodes.return_value = [
+            {'ip': ip, 'status': status, 'under_replicated': blocks}
+            for ip, status, blocks in nodes]
+
+    def _advance(self, seconds):
+        timeutils.advance_time_seconds(seconds)
+
+    def test_progress(self):
+        self._report(('10.0.0.0', 'decommission in progress', 100),
+                     ('10.0.0.1', 'decommission in progress', 100))
+        self.assertFalse(self.tracker.check('remote'))
+        self.assertIsNone(self.tracker.get_eta())
+
+        # no query before the interval is over
+        self._advance(1)
+        self.assertFalse(self.tracker.check('remote'))
+        self.assertEqual(1, self.provider.get_datanodes.call_count)
+
+        self._advance(hs.MIN_POLL_INTERVAL)
+        self._report(('10.0.0.0', 'decommissioned', None),
+                     ('10.0.0.1', 'decommission in progress', 50))
+        self.assertFalse(self.tracker.check('remote'))
+        self.decommissioned.assert_called_once_with(self.instances[0])
+        self.assertEqual(hs.MIN_POLL_INTERVAL, self.tracker.interval)
+        # 150 of 200 blocks were replicated in 4 seconds
+        self.assertEqual(1, self.tracker.get_eta())
+
+        self._advance(hs.MIN_POLL_INTERVAL)
+        self._report(('10.0.0.1', 'decommissioned', None))
+        self.assertTrue(self.tracker.check('remote'))
+        self.assertEqual(2, self.decommissioned.call_count)
+
+    def test_backoff(self):
+        self._report(('10.0.0.0', 'decommission in progress', 10),
+                     ('10.0.0.1', 'decommission in progress', 10))
+        intervals = []
+        for i in range(6):
+            self._advance(hs.MAX_POLL_INTERVAL)
+            self.tracker.check('remote')
+            intervals.append(self.tracker.interval)
+        self.assertEqual([3, 6, 12, 24, 48, 60], intervals)
+        self.decommissioned.assert_not_called()
+
+    def test_failed_query(self):
+        self._report(('10.0.0.0', 'decommission in progress', 10),
+                     ('10.0.0.1', 'decommission in progress', 10))
+        self.assertFalse(self.tracker.check('remote'))
+
+        self.provider.get_datanodes.return_value = None
+        self._advance(hs.MIN_POLL_INTERVAL)
+        self.assertFalse(self.tracker.check('remote'))
+        self.assertEqual(2, len(self.tracker.pending))
+        self.decommissioned.assert_not_called()
+        self.assertEqual(2 * hs.MIN_POLL_INTERVAL, self.tracker.interval)
+
+
+class StartupTrackerTest(base.SaharaTestCase):
+    def setUp(self):
+        super(StartupTrackerTest, self).setUp()
+        timeutils.set_time_override(datetime.datetime(2018, 1, 1))
+        self.addCleanup(timeutils.clear_time_override)
+        self.provider = mock.Mock()
+        self.instances = []
+        for i in range(3):
+            instance = mock.Mock(internal_ip='10.0.0.%d' % i)
+            instance.hostname.return_value = 'worker-%d' % i
+            instance.fqdn.return_value = 'worker-%d.novalocal' % i
+            self.instances.append(instance)
+        self.live = mock.Mock()
+        self.tracker = hs.StartupTracker(
+            self.provider, self.instances, self.live)
+
+    def _report(self, *nodes):
+        self.provider.get_datanodes.return_value = [
+            {'host': host, 'ip': ip, 'live': live}
+            for host, ip, live in nodes]
+
+    def test_matching(self):
+        self._report(('other', '10.0.0.0', True),
+                     ('worker-1', None, True),
+                     ('worker-2.novalocal', '10.0.0.2', False))
+        self.assertFalse(self.tracker.check('remote'))
+        self.assertEqual(
+            [mock.call(self.instances[0]), mock.call(self.instances[1])],
+            self.live.call_args_list)
+
+        timeutils.advance_time_seconds(hs.MIN_POLL_INTERVAL)
+        self._report(('worker-2.novalocal', '10.0.0.2', True))
+        self.assertTrue(self.tracker.check('remote'))
+        self.live.assert_called_with(self.instances[2])
+
+    def test_backoff(self):
+        self._report(('worker-0', '10.0.0.0', False))
+        intervals = []
+        for result in [self.provider.get_datanodes.return_value, None,
+                       None, None]:
+            self.provider.get_datanodes.return_value = result
+            timeutils.advance_time_seconds(hs.MAX_POLL_INTERVAL)
+            self.assertFalse(self.tracker.check('remote'))
+            intervals.append(self.tracker.interval)
+        self.assertEqual([3, 6, 12, 24], intervals)
+        self.assertEqual(3, len(self.tracker.pending))
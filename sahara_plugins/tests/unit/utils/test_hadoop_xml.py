@@ -0,0 +1,34 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from sahara.plugins import utils
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import hadoop_xml
+
+
+class HadoopXmlTest(base.SaharaTestCase):
+    def test_same_as_minidom(self):
+        configs = {'fs.defaultFS': 'hdfs://nn:8020', 'dfs.replication': 3,
+                   'dfs.permissions': False, 'empty': '',
+                   'escaped': 'a"b<c>&d\'\ne'}
+        for config_filter in [None, [], [{'name': 'dfs.replication'},
+                                         {'name': 'escaped'}]]:
+            self.assertEqual(
+                utils.create_hadoop_xml(configs, config_filter),
+                hadoop_xml.create_hadoop_xml(configs, config_filter))
+
+    def test_empty_configuration(self):
+        self.assertEqual(utils.create_hadoop_xml({}),
+                         hadoop_xml.create_hadoop_xml({}))
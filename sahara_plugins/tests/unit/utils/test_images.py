@@ -0,0 +1,141 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import testtools
+
+from sahara.plugins import context
+from sahara.plugins import exceptions as ex
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import images
+
+
+def _make_instance(name, image_id):
+    instance = mock.Mock(instance_name=name, id=name)
+    instance.node_group.get_image_id.return_value = image_id
+    remote = mock.Mock(instance=name)
+    instance.remote.return_value.__enter__ = mock.Mock(return_value=remote)
+    instance.remote.return_value.__exit__ = mock.Mock(return_value=False)
+    return instance
+
+
+class TestValidateClusterImages(base.SaharaTestCase):
+    def setUp(self):
+        super(TestValidateClusterImages, self).setUp()
+        self.instances = [_make_instance('master', 'image-1'),
+                          _make_instance('worker-1', 'image-2'),
+                          _make_instance('worker-2', 'image-2')]
+        self.validator = mock.Mock()
+        patcher = mock.patch('sahara.plugins.utils.get_instances',
+                             return_value=self.instances)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _validated(self):
+        return [c[0][0].instance
+                for c in self.validator.validate.call_args_list]
+
+    def test_validate_all(self):
+        images.validate_cluster_images(self.validator, mock.Mock(),
+                                       image_arguments={'arg': 'value'})
+        validated = self._validated()
+        self.assertEqual(['master', 'worker-1'], sorted(validated[:2]))
+        self.assertEqual(['worker-2'], validated[2:])
+        self.validator.validate.assert_called_with(
+            mock.ANY, test_only=False, image_arguments={'arg': 'value'})
+
+    def test_validate_test_only(self):
+        images.validate_cluster_images(self.validator, mock.Mock(),
+                                       test_only=True)
+        self.assertEqual(['master'], self._validated())
+
+    def test_single_failure(self):
+        def validate(remote, **kwargs):
+            if remote.instance == 'worker-2':
+                raise ex.ImageValidationError('no java')
+
+        self.validator.validate.side_effect = validate
+        with testtools.ExpectedException(ex.ImageValidationError,
+                                         '.*no java'):
+            images.validate_cluster_images(self.validator, mock.Mock())
+
+    def test_failed_image_skipped(self):
+        def validate(remote, **kwargs):
+            if remote.instance != 'master':
+                raise ex.ImageValidationError('no java')
+
+        self.validator.validate.side_effect = validate
+        with testtools.ExpectedException(
+                ex.ImageValidationError,
+                '.*worker-1: no java\nnot validated .*: worker-2'):
+            images.validate_cluster_images(self.validator, mock.Mock())
+        self.assertEqual(2, self.validator.validate.call_count)
+
+    def test_failures_reported_once(self):
+        def validate(remote, **kwargs):
+            raise ex.ImageValidationError('no java on %s' % remote.instance)
+
+        self.validator.validate.side_effect = validate
+        e = self.assertRaises(ex.ImageValidationError,
+                              images.validate_cluster_images,
+                              self.validator, mock.Mock())
+        self.assertEqual(1, e.message.count('Image has failed validation'))
+        self.assertIn('master: no java on master\n'
+                      'worker-1: no java on worker-1\n', e.message)
+
+    def test_multiline_failure_kept(self):
+        def validate(remote, **kwargs):
+            if remote.instance != 'worker-2':
+                raise ex.ImageValidationError(
+                    'script failed\nyum: no package java')
+
+        self.validator.validate.side_effect = validate
+        e = self.assertRaises(ex.ImageValidationError,
+                              images.validate_cluster_images,
+                              self.validator, mock.Mock())
+        self.assertIn('master: script failed\nyum: no package java\n'
+                      'worker-1: script failed\nyum: no package java\n',
+                      e.message)
+
+    def test_other_errors_not_wrapped(self):
+        def validate(remote, **kwargs):
+            if remote.instance == 'worker-1':
+                raise ex.HadoopProvisionError('ssh failed')
+
+        self.validator.validate.side_effect = validate
+        self.assertRaises(ex.HadoopProvisionError,
+                          images.validate_cluster_images,
+                          self.validator, mock.Mock())
+        # the other instances of the image are not validated anymore
+        self.assertEqual(2, self.validator.validate.call_count)
+
+    @mock.patch.object(images, 'VALIDATION_POOL_SIZE', 2)
+    def test_pool_size(self):
+        self.instances[:] = [_make_instance('worker-%d' % i, 'image-1')
+                             for i in range(6)]
+        running = []
+        peaks = []
+
+        def validate(remote, **kwargs):
+            running.append(remote.instance)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(remote.instance)
+
+        self.validator.validate.side_effect = validate
+        images.validate_cluster_images(self.validator, mock.Mock())
+
+        self.assertEqual(6, len(peaks))
+        self.assertEqual(2, max(peaks))
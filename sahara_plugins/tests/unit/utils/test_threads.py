@@ -0,0 +1,49 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from sahara.plugins import context
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import threads
+
+
+class BoundedThreadGroupTest(base.SaharaTestCase):
+    def test_pool_size(self):
+        running = []
+        peaks = []
+
+        def _task(index):
+            running.append(index)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(index)
+
+        with threads.BoundedThreadGroup(3) as tg:
+            for index in range(10):
+                tg.spawn('task-%d' % index, _task, index)
+
+        self.assertEqual(10, len(peaks))
+        self.assertEqual(3, max(peaks))
+
+    def test_failure(self):
+        def _fail():
+            raise ValueError()
+
+        def _spawn():
+            with threads.BoundedThreadGroup(2) as tg:
+                tg.spawn('task-ok', context.sleep, 0)
+                tg.spawn('task-failed', _fail)
+
+        e = self.assertRaises(Exception, _spawn)
+        self.assertIn('task-failed', str(e))
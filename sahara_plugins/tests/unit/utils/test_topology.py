@@ -0,0 +1,93 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+from sahara.plugins import context
+from sahara_plugins.tests.unit import base
+from sahara_plugins.utils import topology
+
+
+class TopologyTest(base.SaharaTestCase):
+    def setUp(self):
+        super(TopologyTest, self).setUp()
+        self.instances = [mock.Mock(instance_id='id-%d' % i,
+                                    instance_name='inst-%d' % i)
+                          for i in range(3)]
+        self.cluster = mock.Mock()
+        self.cluster.extra.to_dict.return_value = {}
+        for name, return_value in [('conductor.cluster_get', self.cluster),
+                                   ('conductor.cluster_update', None),
+                                   ('utils.get_instances', self.instances)]:
+            patcher = mock.patch('sahara.plugins.' + name,
+                                 return_value=return_value)
+            setattr(self, name.split('.')[1], patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_render_topology_map(self):
+        self.assertEqual(
+            "10.0.0.1 /rack1\n10.0.0.2 /rack2\n",
+            topology.render_topology_map({'10.0.0.2': '/rack2',
+                                          '10.0.0.1': '/rack1'}))
+
+    def test_push_to_stale_instances(self):
+        data = "10.0.0.1 /rack1\n"
+        digest = topology._digest(data)
+        self.cluster.extra.to_dict.return_value = {
+            topology.DIGESTS_KEY: {'id-0': digest, 'id-1': 'old',
+                                   'removed': digest}}
+        write = mock.Mock()
+
+        topology.push_topology_data(self.cluster, self.instances, data, write)
+
+        self.assertEqual(
+            ['inst-1', 'inst-2'],
+            sorted(c[0][0].instance_name for c in write.call_args_list))
+        self.cluster_update.assert_called_once_with(
+            mock.ANY, self.cluster, {'extra': {topology.DIGESTS_KEY: {
+                'id-0': digest, 'id-1': digest, 'id-2': digest}}})
+
+    def test_push_up_to_date(self):
+        data = "10.0.0.1 /rack1\n"
+        digest = topology._digest(data)
+        self.cluster.extra.to_dict.return_value = {
+            topology.DIGESTS_KEY: dict(
+                (i.instance_id, digest) for i in self.instances)}
+        write = mock.Mock()
+
+        topology.push_topology_data(self.cluster, self.instances, data, write)
+
+        write.assert_not_called()
+        self.cluster_update.assert_not_called()
+
+    @mock.patch.object(topology, 'TOPOLOGY_POOL_SIZE', 2)
+    def test_push_pool_size(self):
+        self.instances[:] = [mock.Mock(instance_id='id-%d' % i,
+                                       instance_name='inst-%d' % i)
+                             for i in range(5)]
+        running = []
+        peaks = []
+
+        def _write(instance, data):
+            running.append(instance)
+            peaks.append(len(running))
+            context.sleep(0.01)
+            running.remove(instance)
+
+        topology.push_topology_data(self.cluster, self.instances,
+                                    "10.0.0.1 /rack1\n", _write)
+
+        self.assertEqual(5, len(peaks))
+        self.assertEqual(2, max(peaks))
@@ -0,0 +1,50 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import six
+
+
+class ResolvedConfigs(object):
+    """Values of all the options of a cluster, resolved in one pass.
+
+    Values are looked up in the order used by
+    sahara.plugins.utils.get_config_value_or_default: cluster configs,
+    then the first node group setting the option, then the plugin
+    default. Build it once at the start of an operation and pass it to
+    the steps doing the lookups.
+    """
+
+    def __init__(self, cluster, plugin_configs):
+        values = {}
+        for config in plugin_configs:
+            values.setdefault((config.applicable_target, config.name),
+                              config.default_value)
+
+        # the first node group setting an option wins
+        for ng in reversed(cluster.node_groups):
+            for service, params in six.iteritems(ng.configuration()):
+                for name, value in six.iteritems(params or {}):
+                    if value:
+                        values[(service, name)] = value
+
+        for service, params in six.iteritems(cluster.cluster_configs or {}):
+            for name, value in six.iteritems(params or {}):
+                if value is not None:
+                    values[(service, name)] = value
+
+        self.values = values
+
+    def get(self, service, name, default=None):
+        return self.values.get((service, name), default)
@@ -0,0 +1,338 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import datetime
+import re
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils as json
+from oslo_utils import timeutils
+import six
+
+LOG = logging.getLogger(__name__)
+
+NAMENODE_HTTP_PORT = 50070
+RESOURCEMANAGER_HTTP_PORT = 8088
+
+NAMENODE_INFO_URL = ('http://localhost:%d/jmx'
+                     '?qry=Hadoop:service=NameNode,name=NameNodeInfo')
+CLUSTER_NODES_URL = 'http://localhost:%d/ws/v1/cluster/nodes'
+
+# admin states of the NameNode JMX named as dfsadmin reports them
+ADMIN_STATES = {
+    'In Service': 'normal',
+    'Decommission In Progress': 'decommission in progress',
+    'Decommissioned': 'decommissioned'
+}
+
+# bounds of the interval between two queries of a DecommissionTracker
+MIN_POLL_INTERVAL = 3
+MAX_POLL_INTERVAL = 60
+
+
+def _datanode(host, ip, status, live, under_replicated=None):
+    return {'host': host, 'ip': ip, 'status': status, 'live': live,
+            'under_replicated': under_replicated}
+
+
+def parse_dfs_report(report):
+    """Returns the DataNodes of a `dfsadmin -report` output."""
+    datanodes = []
+    live = None
+    for line in report.splitlines():
+        if line.startswith(('Live datanodes', 'Datanodes available')):
+            live = True
+        elif line.startswith('Dead datanodes'):
+            live = False
+        elif live is not None and ':' in line:
+            name, value = [s.strip() for s in line.split(':', 1)]
+            if name == 'Name':
+                datanodes.append(
+                    _datanode(None, value.split(':')[0], None, live))
+            elif datanodes and name == 'Hostname':
+                datanodes[-1]['host'] = value
+            elif datanodes and name == 'Decommission Status':
+                datanodes[-1]['status'] = value.lower()
+
+    return datanodes
+
+
+class RestStatusSource(object):
+    """Reads statuses from the NameNode JMX and ResourceManager REST API.
+
+    The endpoints are queried with curl on the master instance itself, so
+    they do not have to be reachable from outside of the cluster.
+    """
+
+    def __init__(self, namenode_port=NAMENODE_HTTP_PORT,
+                 resourcemanager_port=RESOURCEMANAGER_HTTP_PORT):
+        self.namenode_port = namenode_port
+        self.resourcemanager_port = resourcemanager_port
+
+    def _get(self, remote, url):
+        code, out = remote.execute_command(
+            "curl -s -f '%s'" % url, raise_when_error=False)
+        if code != 0:
+            return None
+        try:
+            return json.loads(out)
+        except ValueError:
+            return None
+
+    def get_datanodes(self, remote):
+        data = self._get(remote, NAMENODE_INFO_URL % self.namenode_port)
+        if not data or not data.get('beans'):
+            return None
+
+        bean = data['beans'][0]
+        # blocks which still have to be replicated off decommissioning nodes
+        blocks = dict(
+            (info.get('xferaddr', '').split(':')[0],
+             info.get('underReplicatedBlocks'))
+            for info in six.itervalues(json.loads(
+                bean.get('DecomNodes') or '{}')))
+        datanodes = []
+        for name, info in six.iteritems(json.loads(bean['LiveNodes'])):
+            status = info.get('adminState', '')
+            ip = info.get('xferaddr', '').split(':')[0]
+            datanodes.append(_datanode(
+                name.split(':')[0], ip,
+                ADMIN_STATES.get(status, status.lower()), True,
+                blocks.get(ip)))
+        for name, info in six.iteritems(json.loads(bean['DeadNodes'])):
+            status = 'decommissioned' if info.get('decommissioned') else (
+                'normal')
+            datanodes.append(_datanode(
+                name.split(':')[0], info.get('xferaddr', '').split(':')[0],
+                status, False))
+
+        return datanodes
+
+    def get_nodemanagers_status(self, remote):
+        data = self._get(remote,
+                         CLUSTER_NODES_URL % self.resourcemanager_port)
+        if data is None:
+            return None
+
+        nodes = (data.get('nodes') or {}).get('node', [])
+        return dict((node['nodeHostName'], node['state'].lower())
+                    for node in nodes)
+
+
+class CliStatusSource(object):
+    """Scrapes statuses from the dfsadmin and yarn CLI reports.
+
+    :param command: template of the command used to run the CLI as
+                    the Hadoop user, e.g. 'sudo su - -c "%s" hadoop'
+    """
+
+    def __init__(self, command, dfsadmin='hdfs dfsadmin -report'):
+        self.command = command
+        self.dfsadmin = dfsadmin
+
+    def get_datanodes(self, remote):
+        code, out = remote.execute_command(
+            self.command % self.dfsadmin, raise_when_error=False)
+        if code != 0:
+            return None
+        return parse_dfs_report(out)
+
+    def get_nodemanagers_status(self, remote):
+        code, out = remote.execute_command(
+            self.command % 'yarn node -all -list', raise_when_error=False)
+        if code != 0:
+            return None
+
+        matcher = re.compile(r'^(\S+):\d+\s+(\w+)', re.MULTILINE)
+        return dict((host, status.lower())
+                    for host, status in matcher.findall(out))
+
+
+class StatusProvider(object):
+    """Reports DataNode and NodeManager statuses of a cluster.
+
+    Sources are tried in order, the first one which is able to query
+    the cluster is used.
+    """
+
+    def __init__(self, *sources):
+        self.sources = sources
+
+    def _query(self, method, remote, default):
+        for source in self.sources:
+            result = getattr(source, method)(remote)
+            if result is not None:
+                return result
+            LOG.debug("{source} is unable to report statuses".format(
+                source=type(source).__name__))
+
+        LOG.warning("Unable to get statuses of the cluster nodes")
+        return default
+
+    def get_datanodes(self, remote):
+        """Returns the DataNodes of the cluster, None if unknown."""
+        return self._query('get_datanodes', remote, None)
+
+    def get_datanodes_status(self, remote):
+        return dict((dn['host'], dn['status'])
+                    for dn in self.get_datanodes(remote) or [])
+
+    def get_live_datanodes_count(self, remote):
+        return len([dn for dn in self.get_datanodes(remote) or []
+                    if dn['live']])
+
+    def get_nodemanagers_status(self, remote):
+        return self._query('get_nodemanagers_status', remote, {})
+
+
+@six.add_metaclass(abc.ABCMeta)
+class _PollingTracker(object):
+    """Base of the trackers polling the NameNode with a backoff.
+
+    check() is cheap to call often: the NameNode is queried only once the
+    current interval has passed. The interval is reset to
+    MIN_POLL_INTERVAL whenever the tracked DataNodes move on and doubled,
+    up to MAX_POLL_INTERVAL, when they do not or when the NameNode cannot
+    be queried.
+    """
+
+    def __init__(self, provider, instances):
+        self.provider = provider
+        self.pending = dict((i.internal_ip, i) for i in instances)
+        self.total = len(self.pending)
+        self.started_at = timeutils.utcnow()
+        self.next_query = self.started_at
+        self.interval = MIN_POLL_INTERVAL
+        self.queried = False
+
+    def check(self, remote):
+        """Returns True once none of the DataNodes is pending."""
+        now = timeutils.utcnow()
+        if now < self.next_query:
+            return False
+
+        report = self.provider.get_datanodes(remote)
+        # nothing is known about the DataNodes when the query failed,
+        # all of them are kept pending
+        moved_on = report is not None and self._update(report, now)
+        # the first successful query always counts as progress
+        if report is not None and not self.queried:
+            self.queried = moved_on = True
+
+        self.interval = MIN_POLL_INTERVAL if moved_on else min(
+            self.interval * 2, MAX_POLL_INTERVAL)
+        self.next_query = now + datetime.timedelta(seconds=self.interval)
+        return not self.pending
+
+    @abc.abstractmethod
+    def _update(self, report, now):
+        """Updates pending from a report, returns True on progress."""
+        return
+
+
+class StartupTracker(_PollingTracker):
+    """Follows DataNodes registering with the NameNode.
+
+    A DataNode is matched by the internal IP of its instance and, for
+    the reports without addresses, by its hostname or FQDN.
+
+    :param provider: StatusProvider used to query the NameNode
+    :param instances: instances of the DataNodes being started
+    :param on_live: function called with every instance once its
+                    DataNode is live
+    """
+
+    def __init__(self, provider, instances, on_live=None):
+        super(StartupTracker, self).__init__(provider, instances)
+        self.on_live = on_live
+
+    def _update(self, report, now):
+        live = set()
+        for dn in report:
+            if dn['live']:
+                live.update([dn['ip'], dn['host']])
+
+        moved_on = False
+        for ip, instance in list(self.pending.items()):
+            if live.intersection([ip, instance.hostname(), instance.fqdn()]):
+                del self.pending[ip]
+                moved_on = True
+                if self.on_live:
+                    self.on_live(instance)
+
+        LOG.info("{live} of {total} DataNodes are live".format(
+            live=self.total - len(self.pending), total=self.total))
+        return moved_on
+
+
+class DecommissionTracker(_PollingTracker):
+    """Follows DataNodes being decommissioned.
+
+    :param provider: StatusProvider used to query the NameNode
+    :param instances: instances of the DataNodes being decommissioned
+    :param on_decommissioned: function called with every instance once
+                              its DataNode is decommissioned
+    """
+
+    def __init__(self, provider, instances, on_decommissioned=None):
+        super(DecommissionTracker, self).__init__(provider, instances)
+        self.on_decommissioned = on_decommissioned
+        self.blocks = None
+        self.max_blocks = 0
+
+    def _update(self, report, now):
+        datanodes = dict((dn['ip'], dn) for dn in report)
+        moved_on = False
+        blocks = 0
+        for ip, instance in list(self.pending.items()):
+            dn = datanodes.get(ip)
+            # a DataNode missing from a complete report is not registered
+            # with the NameNode, so it has no blocks left to move
+            if dn is None or dn['status'] == 'decommissioned':
+                del self.pending[ip]
+                moved_on = True
+                if self.on_decommissioned:
+                    self.on_decommissioned(instance)
+            else:
+                blocks += dn.get('under_replicated') or 0
+
+        if self.blocks is not None and blocks < self.blocks:
+            moved_on = True
+        self.blocks = blocks
+        self.max_blocks = max(self.max_blocks, blocks)
+        self._log_progress(now)
+        return moved_on
+
+    def get_eta(self, now=None):
+        """Returns the estimated seconds left, None if unknown."""
+        now = now or timeutils.utcnow()
+        elapsed = timeutils.delta_seconds(self.started_at, now)
+        if self.max_blocks:
+            done, left = self.max_blocks - self.blocks, self.blocks
+        else:
+            done = self.total - len(self.pending)
+            left = len(self.pending)
+        if not done or elapsed <= 0:
+            return None
+        return int(left * elapsed / done)
+
+    def _log_progress(self, now):
+        eta = self.get_eta(now)
+        LOG.info("Decommissioned {done} of {total} DataNodes, {blocks} "
+                 "under-replicated blocks left, ETA: {eta}".format(
+                     done=self.total - len(self.pending), total=self.total,
+                     blocks=self.blocks,
+                     eta='%ss' % eta if eta is not None else 'unknown'))
@@ -0,0 +1,58 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from xml.sax import saxutils
+
+import six
+
+XML_HEADER = ('<?xml version="1.0" ?>\n'
+              '<?xml-stylesheet type="text/xsl" href="configuration.xsl"?>\n')
+
+_ENTITIES = {'"': '&quot;'}
+
+
+def _escape(value):
+    return saxutils.escape(six.text_type(value), _ENTITIES)
+
+
+def create_hadoop_xml(configs, config_filter=None):
+    """Renders a Hadoop configuration file.
+
+    The output is the same as the one of the minidom based
+    sahara.plugins.utils.create_hadoop_xml, but it is written directly
+    to a buffer, without building a document tree.
+
+    :param configs: dict of config names and values
+    :param config_filter: list of configs as loaded by
+                          load_hadoop_xml_defaults, only configs with
+                          these names are rendered
+    """
+    names = sorted(configs)
+    if config_filter is not None:
+        allowed = set(cfg['name'] for cfg in config_filter)
+        names = [name for name in names if name in allowed]
+
+    if not names:
+        return XML_HEADER + '<configuration/>\n'
+
+    lines = [XML_HEADER, '<configuration>\n']
+    for name in names:
+        lines.append('  <property>\n'
+                     '    <name>%s</name>\n'
+                     '    <value>%s</value>\n'
+                     '  </property>\n' % (_escape(name),
+                                          _escape(configs[name])))
+    lines.append('</configuration>\n')
+    return ''.join(lines)
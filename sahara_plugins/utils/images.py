@@ -0,0 +1,117 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import sys
+
+from oslo_log import log as logging
+import six
+
+from sahara.plugins import exceptions as ex
+from sahara.plugins import utils as plugin_utils
+from sahara_plugins.i18n import _
+from sahara_plugins.utils import threads
+
+LOG = logging.getLogger(__name__)
+
+VALIDATION_POOL_SIZE = 16
+
+
+def validate_cluster_images(validator, cluster, test_only=False,
+                            image_arguments=None):
+    """Validates images of the cluster instances concurrently.
+
+    Instances are grouped by image. One instance of every image is
+    validated first; the remaining instances of an image are validated
+    only if it passed, all on a pool of VALIDATION_POOL_SIZE workers.
+    Failures of all instances are reported in a single error, one
+    instance per line. Errors other than ImageValidationError are raised
+    unchanged, as the validator raised them.
+    """
+    instances = plugin_utils.get_instances(cluster)
+    if test_only:
+        instances = instances[:1]
+
+    by_image = collections.OrderedDict()
+    for instance in instances:
+        image_id = instance.node_group.get_image_id()
+        by_image.setdefault(image_id, []).append(instance)
+
+    failures = collections.OrderedDict()
+    _validate_instances([group[0] for group in by_image.values()],
+                        validator, test_only, image_arguments, failures)
+
+    skipped = []
+    remaining = []
+    for group in by_image.values():
+        if group[0].instance_name in failures:
+            skipped.extend(group[1:])
+        else:
+            remaining.extend(group[1:])
+    _validate_instances(remaining, validator, test_only, image_arguments,
+                        failures)
+
+    if not failures:
+        return
+    if len(failures) == 1 and not skipped:
+        raise list(failures.values())[0]
+
+    report = ['%s: %s' % (name, _get_reason(e))
+              for name, e in failures.items()]
+    if skipped:
+        report.append(_("not validated since their image failed on another"
+                        " instance: %s") % ', '.join(
+            i.instance_name for i in skipped))
+    raise ex.ImageValidationError('\n'.join(report))
+
+
+def _get_reason(error):
+    """Returns the message of an ImageValidationError without its prefix.
+
+    The error id line is dropped too, the rest of the message, e.g. the
+    output of a failed script, is kept.
+    """
+    lines = [line for line in error.message.splitlines()
+             if not line.startswith('Error ID: ')]
+    message = '\n'.join(lines)
+    prefix = ex.ImageValidationError.base_message % ''
+    if message.startswith(prefix):
+        message = message[len(prefix):]
+    return message
+
+
+def _validate_instances(instances, validator, test_only, image_arguments,
+                        failures):
+    def _validate(instance):
+        try:
+            with instance.remote() as r:
+                validator.validate(r, test_only=test_only,
+                                   image_arguments=image_arguments)
+        except ex.ImageValidationError as e:
+            LOG.warning("Image validation failed on instance {name}: "
+                        "{error}".format(name=instance.instance_name,
+                                         error=e.message))
+            failures[instance.instance_name] = e
+        except Exception:
+            LOG.exception("Image validation failed on instance {name}".format(
+                name=instance.instance_name))
+            errors.append(sys.exc_info())
+
+    errors = []
+    with threads.BoundedThreadGroup(VALIDATION_POOL_SIZE) as tg:
+        for instance in instances:
+            tg.spawn('validate-image-%s' % instance.id, _validate, instance)
+    if errors:
+        six.reraise(*errors[0])
@@ -0,0 +1,41 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from eventlet import semaphore
+
+from sahara.plugins import context
+
+
+class BoundedThreadGroup(context.PluginsThreadGroup):
+    """Thread group running at most pool_size of its threads at a time.
+
+    PluginsThreadGroup does not pass its thread_pool_size on, so every
+    spawned thread starts right away. Here the threads are still spawned
+    with the context of the caller, but wait for a free slot before
+    running their function.
+    """
+
+    def __init__(self, pool_size):
+        super(BoundedThreadGroup, self).__init__()
+        self.pool_size = pool_size
+        self._slots = semaphore.Semaphore(pool_size)
+
+    def spawn(self, thread_description, func, *args, **kwargs):
+        super(BoundedThreadGroup, self).spawn(
+            thread_description, self._run, func, *args, **kwargs)
+
+    def _run(self, func, *args, **kwargs):
+        with self._slots:
+            func(*args, **kwargs)
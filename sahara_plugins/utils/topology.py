@@ -0,0 +1,95 @@
+# Copyright (c) 2018 Red Hat, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+
+from oslo_log import log as logging
+import six
+
+from sahara.plugins import conductor
+from sahara.plugins import context
+from sahara.plugins import utils
+from sahara_plugins.utils import threads
+
+LOG = logging.getLogger(__name__)
+
+TOPOLOGY_POOL_SIZE = 16
+
+# cluster extra key of the topology data digest pushed to every instance
+DIGESTS_KEY = 'topology_data_digests'
+
+
+def render_topology_map(topology_map):
+    """Returns the content of topology.data for a topology map."""
+    lines = sorted("%s %s" % item for item in six.iteritems(topology_map))
+    return "\n".join(lines) + "\n"
+
+
+def _digest(data):
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _get_extra(cluster):
+    cluster = conductor.cluster_get(context.ctx(), cluster)
+    return cluster, cluster.extra.to_dict() if cluster.extra else {}
+
+
+def get_stale_instances(cluster, instances, data):
+    """Returns the instances which do not have the given topology data."""
+    cluster, extra = _get_extra(cluster)
+    digests = extra.get(DIGESTS_KEY, {})
+    digest = _digest(data)
+    return [instance for instance in instances
+            if digests.get(instance.instance_id) != digest]
+
+
+def store_digests(cluster, instances, data):
+    """Remembers that the instances have the given topology data.
+
+    Digests of the instances which are not in the cluster anymore are
+    dropped.
+    """
+    cluster, extra = _get_extra(cluster)
+    existing = set(i.instance_id for i in utils.get_instances(cluster))
+    digests = dict((instance_id, digest) for instance_id, digest
+                   in six.iteritems(extra.get(DIGESTS_KEY, {}))
+                   if instance_id in existing)
+    digest = _digest(data)
+    digests.update((instance.instance_id, digest) for instance in instances)
+
+    if digests != extra.get(DIGESTS_KEY):
+        extra[DIGESTS_KEY] = digests
+        conductor.cluster_update(context.ctx(), cluster, {'extra': extra})
+
+
+def push_topology_data(cluster, instances, data, write):
+    """Pushes topology data to the instances which have a stale copy.
+
+    :param write: function writing the data to an instance, called as
+                  write(instance, data) on a pool of TOPOLOGY_POOL_SIZE
+                  workers
+    """
+    stale = get_stale_instances(cluster, instances, data)
+    LOG.debug("Topology data is stale on {count} of {total} instances".format(
+        count=len(stale), total=len(instances)))
+    if not stale:
+        return
+
+    with threads.BoundedThreadGroup(TOPOLOGY_POOL_SIZE) as tg:
+        for instance in stale:
+            tg.spawn('push-topology-data-%s' % instance.instance_name,
+                     write, instance, data)
+
+    store_digests(cluster, stale, data)